@@ -0,0 +1,89 @@
+"""
+benchmark mcxlib.analytics on a bulk option surface (every commodity x expiry, as get_all_option_chains
+returns it) against a per row scalar solve of the same implied volatilities
+
+usage: python benchmarks/bench_analytics.py [strikes_per_chain]
+"""
+import math
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from mcxlib import analytics
+
+sys.path.insert(0, os.path.dirname(__file__))
+from payloads import COMMODITIES, EXPIRIES  # noqa: E402
+
+AS_OF = pd.Timestamp('2023-11-01 10:00', tz=analytics.MCX_TIMEZONE)
+
+
+def bulk_surface(strikes: int = 200) -> pd.DataFrame:
+    rng = np.random.default_rng(5)
+    frames = []
+    for n, commodity in enumerate(COMMODITIES):
+        underlying = 1000.0 * (n + 1)
+        strike = underlying * np.linspace(0.7, 1.3, strikes)
+        for expiry in EXPIRIES:
+            years = analytics._expiry_years(pd.DataFrame({'Expiry': [expiry]}), as_of=AS_OF)[0]
+            sigma = rng.uniform(0.2, 0.6, strikes)
+            frames.append(pd.DataFrame({
+                'Commodity': commodity, 'Expiry': expiry, 'UnderlyingValue': underlying,
+                'CE_StrikePrice': strike, 'PE_StrikePrice': strike,
+                'CE_LTP': analytics.black76_price(underlying, strike, years, sigma, is_call=True),
+                'PE_LTP': analytics.black76_price(underlying, strike, years, sigma, is_call=False),
+                'CE_OpenInterest': rng.integers(0, 20000, strikes),
+                'PE_OpenInterest': rng.integers(0, 20000, strikes),
+            }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def scalar_iv(price, forward, strike, years, is_call):
+    def black76(sigma):
+        d1 = (math.log(forward / strike) + 0.5 * sigma * sigma * years) / (sigma * math.sqrt(years))
+        d2 = d1 - sigma * math.sqrt(years)
+        cdf = lambda x: 0.5 * math.erfc(-x / math.sqrt(2))  # noqa: E731
+        if is_call:
+            return forward * cdf(d1) - strike * cdf(d2)
+        return strike * cdf(-d2) - forward * cdf(-d1)
+
+    low, high = 1e-4, 5.0
+    for _ in range(100):
+        mid = 0.5 * (low + high)
+        if black76(mid) > price:
+            high = mid
+        else:
+            low = mid
+        if high - low < 1e-8:
+            break
+    return 0.5 * (low + high)
+
+
+def main(strikes: int = 200):
+    chains = bulk_surface(strikes)
+    rows = len(chains)
+
+    start = time.perf_counter()
+    surface = analytics.option_surface(chains, as_of=AS_OF)
+    pain = analytics.max_pain(chains)
+    pcr = analytics.put_call_ratio(chains)
+    vector_ms = (time.perf_counter() - start) * 1000
+
+    sample = chains.sample(min(rows, 1000), random_state=0)
+    years = analytics._expiry_years(sample, as_of=AS_OF)
+    start = time.perf_counter()
+    for (_, row), t in zip(sample.iterrows(), years):
+        scalar_iv(row['CE_LTP'], row['UnderlyingValue'], row['CE_StrikePrice'], t, True)
+        scalar_iv(row['PE_LTP'], row['UnderlyingValue'], row['PE_StrikePrice'], t, False)
+    scalar_ms = (time.perf_counter() - start) * 1000 * rows / len(sample)
+
+    solved = surface[['CE_IV', 'PE_IV']].notna().to_numpy().mean()
+    print(f"{rows} strikes across {len(pain)} chains ({len(pcr)} PCR values), {solved:.1%} of legs solved")
+    print(f"  vectorized surface + greeks + max pain + pcr {vector_ms:9.1f} ms")
+    print(f"  per row scalar IV (extrapolated)             {scalar_ms:9.1f} ms")
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,67 @@
+"""
+benchmark contract resolution on one market watch payload: the previous per call column scan against
+the ContractIndex built once per snapshot
+
+usage: python benchmarks/bench_contracts.py [lookups]
+"""
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+from mcxlib.libutil import records_to_frame
+from mcxlib.market_data import _COMMODITY_COLUMNS, _INSTRUMENT_COLUMNS, _contract_indexes, _select_contracts
+from mcxlib.schema import apply_schema
+
+sys.path.insert(0, os.path.dirname(__file__))
+from payloads import COMMODITIES, INSTRUMENTS, market_watch_rows  # noqa: E402
+
+
+def _scan_filter(data_df, filter_value, column_names):
+    value = str(filter_value).strip().upper()
+    if value == 'ALL':
+        return data_df
+    exact_mask = pd.Series(False, index=data_df.index)
+    contains_mask = pd.Series(False, index=data_df.index)
+    for column in [column for column in column_names if column in data_df.columns]:
+        column_data = data_df[column].astype(object).fillna('').astype(str).str.strip().str.upper()
+        exact_mask = exact_mask | (column_data == value)
+        contains_mask = contains_mask | column_data.str.contains(value, regex=False)
+    filtered_df = data_df[exact_mask]
+    return filtered_df if not filtered_df.empty else data_df[contains_mask]
+
+
+def scan_select(data_df, commodity, instrument):
+    data_df = _scan_filter(data_df, commodity, _COMMODITY_COLUMNS)
+    return _scan_filter(data_df, instrument, _INSTRUMENT_COLUMNS).reset_index(drop=True)
+
+
+def main(lookups: int = 300):
+    data_df = apply_schema(records_to_frame(market_watch_rows(5000), drop=['__type']), 'market_watch')
+    rng = random.Random(0)
+    candidates = [(commodity, instrument) for commodity in COMMODITIES + ['CRUDE', 'GOLD17', 'SILVERM']
+                  for instrument in INSTRUMENTS + ['ALL', 'OPT']]
+    candidates = [query for query in candidates if not scan_select(data_df, *query).empty]
+    queries = [rng.choice(candidates) for _ in range(lookups)]
+
+    start = time.perf_counter()
+    scanned = [scan_select(data_df, *query) for query in queries]
+    scan_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    indexes = _contract_indexes(data_df)
+    build_ms = (time.perf_counter() - start) * 1000
+    indexed = [_select_contracts(data_df, *query, indexes=indexes) for query in queries]
+    index_ms = (time.perf_counter() - start) * 1000
+
+    for expected, result in zip(scanned, indexed):
+        pd.testing.assert_frame_equal(expected, result)
+    print(f"{lookups} lookups on {len(data_df)} rows")
+    print(f"  column scan   {scan_ms:8.1f} ms  ({scan_ms / lookups:.2f} ms/lookup)")
+    print(f"  ContractIndex {index_ms:8.1f} ms  ({index_ms / lookups:.2f} ms/lookup, build {build_ms:.1f} ms)")
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
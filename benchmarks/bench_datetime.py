@@ -0,0 +1,35 @@
+"""
+benchmark the vectorized MCX '/Date(...)/' converter against the per value parser
+
+usage: python benchmarks/bench_datetime.py [values]
+"""
+import random
+import sys
+import time
+
+import pandas as pd
+
+from mcxlib.libutil import parse_mcx_datetime_series
+from mcxlib.market_data import _parse_mcx_datetime
+
+
+def main(count: int = 100000):
+    rng = random.Random(0)
+    values = pd.Series([f"/Date({1698800000000 + rng.randint(0, 86400000)}+0530)/" for _ in range(count)])
+
+    start = time.perf_counter()
+    per_row = values.map(_parse_mcx_datetime)
+    per_row_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    vectorized = parse_mcx_datetime_series(values)
+    vectorized_ms = (time.perf_counter() - start) * 1000
+
+    assert (vectorized == pd.to_datetime(per_row.tolist())).all()
+    print(f"{count} values")
+    print(f"  per row    {per_row_ms:8.1f} ms")
+    print(f"  vectorized {vectorized_ms:8.1f} ms  ({per_row_ms / vectorized_ms:.1f}x)")
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
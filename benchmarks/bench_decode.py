@@ -0,0 +1,63 @@
+"""
+benchmark JSON -> DataFrame decoding of large MCX payloads: the old response.json() + from_dict + drop
+path against decode_json + records_to_frame, measuring decode time and peak python memory
+
+usage: python benchmarks/bench_decode.py [recorded_payload.json ...]
+"""
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+from mcxlib.libutil import decode_json, orjson, records_to_frame
+
+sys.path.insert(0, os.path.dirname(__file__))
+from payloads import as_payload, bhav_copy_rows, market_watch_rows  # noqa: E402
+
+DROP = ['__type', 'LTT']
+
+
+def old_path(content: bytes) -> pd.DataFrame:
+    data_df = pd.DataFrame.from_dict(json.loads(content)['d']['Data'])
+    data_df.drop(columns=DROP, inplace=True, errors='ignore')
+    return data_df
+
+
+def new_path(content: bytes) -> pd.DataFrame:
+    return records_to_frame(decode_json(content)['d']['Data'], drop=DROP, errors='ignore')
+
+
+def measure(func, content: bytes, repeat: int = 5):
+    func(content)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(content)
+    elapsed = (time.perf_counter() - start) / repeat
+    tracemalloc.start()
+    func(content)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed * 1000, peak / 2 ** 20
+
+
+def main(paths: list):
+    if paths:
+        payloads = {os.path.basename(path): open(path, 'rb').read() for path in paths}
+    else:
+        payloads = {
+            'market watch (5k rows)': as_payload(market_watch_rows(5000)),
+            'bhav copy (50k rows)': as_payload(bhav_copy_rows(50000)),
+        }
+    print(f"orjson installed: {orjson is not None}")
+    for name, content in payloads.items():
+        print(f"{name}: {len(content) / 2 ** 20:.1f} MiB")
+        for label, func in (('from_dict + drop', old_path), ('records_to_frame', new_path)):
+            elapsed, peak = measure(func, content)
+            print(f"  {label:<18} {elapsed:8.1f} ms  peak {peak:6.1f} MiB")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,121 @@
+"""
+end to end benchmark of every public fetcher (download, JSON / excel parse, DataFrame build and schema)
+against the local replay server, so nothing touches mcxindia.com
+
+modes, each run in a fresh process so its peak RSS is its own:
+  sequential  every fetcher `repeat` times in a row, latency percentiles per fetcher
+  concurrent  all fetchers `repeat` times on `threads` threads, overall percentiles and throughput
+  scale       the large payloads (market watch, bhav copy, history, option chain) at `scale` x the rows
+
+usage: python benchmarks/bench_e2e.py [repeat] [threads] [scale] [fixtures dir]
+"""
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+from replay import ReplayServer  # noqa: E402
+
+import mcxlib  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # windows
+    resource = None
+
+CALLS = {
+    'get_market_watch': (mcxlib.get_market_watch, {}),
+    'get_available_contracts': (mcxlib.get_available_contracts, {'commodity': 'GOLD', 'instrument': 'FUTCOM'}),
+    'get_mcx_datetime': (mcxlib.get_mcx_datetime, {}),
+    'get_heat_map': (mcxlib.get_heat_map, {}),
+    'get_top_gainers': (mcxlib.get_top_gainers, {}),
+    'get_top_losers': (mcxlib.get_top_losers, {}),
+    'get_most_active_contracts': (mcxlib.get_most_active_contracts, {}),
+    'get_most_active_puts_calls': (mcxlib.get_most_active_puts_calls, {}),
+    'get_recent_expires': (mcxlib.get_recent_expires, {}),
+    'get_option_chain': (mcxlib.get_option_chain, {'commodity': 'CRUDEOIL', 'expiry': '17NOV2023'}),
+    'get_all_option_chains': (mcxlib.get_all_option_chains, {}),
+    'get_put_call_ratio': (mcxlib.get_put_call_ratio, {}),
+    'get_bhav_copy': (mcxlib.get_bhav_copy, {'trade_date': '20231102'}),
+    'get_bhav_copy_range': (mcxlib.get_bhav_copy_range, {'start_date': '20231101', 'end_date': '20231110'}),
+    'get_historical_data': (mcxlib.get_historical_data, {'start_date': '20230101', 'end_date': '20231103'}),
+    'get_mcx_icomdex_indices': (mcxlib.get_mcx_icomdex_indices, {}),
+    'get_pro_cli_details': (mcxlib.get_pro_cli_details, {'trade_month': '202301'}),
+    'get_category_wise_turnover': (mcxlib.get_category_wise_turnover, {'year': 2023, 'month_number': 9}),
+    'get_category_wise_oi': (mcxlib.get_category_wise_oi, {'year': 2023, 'month_number': 9}),
+    'get_trading_statistics': (mcxlib.get_trading_statistics, {'year': 2023, 'month_number': 9}),
+    'get_ccl_delivery': (mcxlib.get_ccl_delivery, {'year': 2023, 'month_number': 9}),
+    'get_category_wise_oi_range': (mcxlib.get_category_wise_oi_range,
+                                   {'start_month': '202307', 'end_month': '202309', 'processes': 0}),
+}
+SCALED = ['get_market_watch', 'get_option_chain', 'get_bhav_copy', 'get_historical_data']
+
+
+def percentiles(latencies: list) -> dict:
+    latencies = sorted(latencies)
+
+    def pick(q):
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+
+    return {'p50_ms': pick(0.50), 'p95_ms': pick(0.95), 'p99_ms': pick(0.99)}
+
+
+def peak_rss_mb() -> float:
+    if resource is None:
+        return float('nan')
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def timed_call(name: str) -> float:
+    fetch, kwargs = CALLS[name]
+    start = time.perf_counter()
+    fetch(**kwargs)
+    return time.perf_counter() - start
+
+
+def run_mode(mode: str, base_url: str, repeat: int, threads: int) -> dict:
+    # runs in a fresh process: point the shared client at the replay server and switch the caches off
+    mcxlib.configure_client(base_url=base_url, pool_maxsize=max(threads, 16))
+    mcxlib.disable_rate_limit()
+    mcxlib.disable_report_cache()
+    # download the replayed holidays, kept in memory rather than the persisted calendar
+    mcxlib.configure_trading_calendar(path=None, fetch=True)
+    names = SCALED if mode == 'scale' else list(CALLS)
+    for name in names:
+        timed_call(name)  # warm up imports and connections
+
+    result = {'calls': {}}
+    start = time.perf_counter()
+    if mode == 'concurrent':
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            latencies = list(pool.map(timed_call, names * repeat))
+        result['calls']['all fetchers'] = percentiles(latencies)
+        count = len(latencies)
+    else:
+        for name in names:
+            result['calls'][name] = percentiles([timed_call(name) for _ in range(repeat)])
+        count = len(names) * repeat
+    elapsed = time.perf_counter() - start
+    result.update(count=count, throughput=count / elapsed, peak_rss_mb=peak_rss_mb())
+    return result
+
+
+def main(repeat: int = 5, threads: int = 8, scale: float = 10, fixtures: str = None):
+    context = multiprocessing.get_context('spawn')
+    with ReplayServer(fixtures) as server, ReplayServer(fixtures, scale=scale) as scaled:
+        for mode, url in (('sequential', server.base_url), ('concurrent', server.base_url),
+                          ('scale', scaled.base_url)):
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                result = pool.submit(run_mode, mode, url, repeat, threads).result()
+            print(f"{mode}: {result['count']} calls, {result['throughput']:.1f} calls/s, "
+                  f"peak RSS {result['peak_rss_mb']:.0f} MB" + (f", {scale:g}x rows" if mode == 'scale' else '')
+                  + (f", {threads} threads" if mode == 'concurrent' else ''))
+            for name, stats in result['calls'].items():
+                print(f"  {name:<28} " + "  ".join(f"{key}={value:8.2f}" for key, value in stats.items()))
+
+
+if __name__ == '__main__':
+    arguments = sys.argv[1:]
+    main(*[cast(arg) for cast, arg in zip((int, int, float, str), arguments)])
@@ -0,0 +1,53 @@
+"""
+benchmark parsing the monthly excel reports: pd.read_excel with the layouts applied by hand (old behaviour)
+against mcxlib.excel.parse_report with the automatically chosen engine
+
+usage: python benchmarks/bench_excel.py [rows] [repeats]
+"""
+from io import BytesIO
+import os
+import sys
+import time
+
+import pandas as pd
+
+from mcxlib.excel import REPORT_LAYOUTS, excel_engine, parse_report
+
+sys.path.insert(0, os.path.dirname(__file__))
+from payloads import report_workbook  # noqa: E402
+
+
+def read_excel_by_hand(content, name):
+    layout = REPORT_LAYOUTS[name]
+    data_df = pd.read_excel(BytesIO(content), skiprows=layout.get('skiprows', 0),
+                            skipfooter=layout.get('skipfooter', 0))
+    if layout.get('columns'):
+        data_df.columns = layout['columns']
+    data_df = data_df.rename(columns=layout.get('rename', {}))
+    if layout.get('dropna'):
+        data_df = data_df.dropna().reset_index(drop=True)
+    return data_df
+
+
+def best_ms(func, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings), result
+
+
+def main(rows: int = 2000, repeats: int = 3):
+    print(f"{rows} rows per report, best of {repeats}, engine={excel_engine()}")
+    for name in REPORT_LAYOUTS:
+        content = report_workbook(name, rows)
+        old_ms, expected = best_ms(lambda: read_excel_by_hand(content, name), repeats)
+        new_ms, result = best_ms(lambda: parse_report(content, name), repeats)
+        pd.testing.assert_frame_equal(expected, result)
+        print(f"  {name:<24} read_excel {old_ms:8.1f} ms   parse_report {new_ms:8.1f} ms   "
+              f"{old_ms / new_ms:5.1f}x  ({len(content) / 1024:.0f} KiB)")
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])
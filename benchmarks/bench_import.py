@@ -0,0 +1,59 @@
+"""
+cold start cost of mcxlib in fresh interpreters: the import itself and the first call of a light fetcher
+(get_mcx_datetime, no pandas) and a frame building one (get_market_watch) against the local replay server,
+with pandas / numpy / requests imported up front as the eager package did, and without
+
+usage: python benchmarks/bench_import.py [runs]
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+from replay import ReplayServer  # noqa: E402
+
+BUDGETS = {'import mcxlib': 0.05, 'get_mcx_datetime': 0.4}
+
+SNIPPET = """
+import time
+start = time.perf_counter()
+{preload}
+import mcxlib
+imported = time.perf_counter()
+mcxlib.disable_rate_limit()
+mcxlib.{call}()
+print(imported - start, time.perf_counter() - start)
+"""
+
+
+def cold_start(call: str, preload: str, base_url: str, runs: int) -> tuple:
+    environment = dict(os.environ, MCXLIB_BASE_URL=base_url,
+                       PYTHONPATH=os.pathsep.join([os.getcwd(), os.environ.get('PYTHONPATH', '')]))
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', SNIPPET.format(preload=preload, call=call)],
+                                capture_output=True, text=True, check=True, env=environment).stdout
+        samples.append([float(value) for value in output.split()])
+    return tuple(statistics.median(column) for column in zip(*samples))
+
+
+def main(runs: int = 5):
+    over_budget = []
+    with ReplayServer() as server:
+        for call in ('get_mcx_datetime', 'get_market_watch'):
+            for label, preload in (('eager', 'import numpy, pandas, requests'), ('lazy', '')):
+                imported, called = cold_start(call, preload, server.base_url, runs)
+                print(f"{call:<18} {label:<6} import {imported * 1000:7.1f} ms   import + first call "
+                      f"{called * 1000:7.1f} ms")
+                if label == 'lazy':
+                    for name, seconds in (('import mcxlib', imported), (call, called)):
+                        if seconds > BUDGETS.get(name, float('inf')):
+                            over_budget.append(f"{name} took {seconds:.3f} s, budget {BUDGETS[name]} s")
+    for message in over_budget:
+        print(f"OVER BUDGET: {message}")
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
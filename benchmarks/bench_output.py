@@ -0,0 +1,50 @@
+"""
+benchmark serving the market watch as JSON records: building the DataFrame then df.to_json(orient='records')
+(the old usage) against output='records' / 'numpy' / 'arrow' straight from the decoded payload
+
+usage: python benchmarks/bench_output.py [rows] [repeat]
+"""
+import os
+import sys
+import time
+
+from mcxlib.libutil import decode_json, records_to_frame, records_to_output
+from mcxlib.schema import apply_schema
+
+sys.path.insert(0, os.path.dirname(__file__))
+from payloads import as_payload, market_watch_rows  # noqa: E402
+
+try:
+    from orjson import dumps
+except ImportError:
+    from json import dumps
+
+
+def best_of(repeat: int, func) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main(rows: int = 5000, repeat: int = 10):
+    content = as_payload(market_watch_rows(rows))
+    records = decode_json(content)['d']['Data']
+    cases = {
+        "DataFrame + to_json(orient='records')": lambda: apply_schema(
+            records_to_frame(records, drop=['__type'], errors='ignore'), 'market_watch').to_json(orient='records', date_format='iso'),
+        "output='records' + dumps": lambda: dumps(
+            records_to_output(records, 'records', drop=['__type'], errors='ignore')),
+        "output='numpy'": lambda: records_to_output(records, 'numpy', drop=['__type'], errors='ignore'),
+        "output='arrow'": lambda: records_to_output(records, 'arrow', drop=['__type'], errors='ignore'),
+        "output='records'": lambda: records_to_output(records, 'records', drop=['__type'], errors='ignore'),
+    }
+    print(f"market watch, {rows} rows, best of {repeat}")
+    for name, func in cases.items():
+        print(f"  {name:<40} {best_of(repeat, func):8.2f} ms")
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,84 @@
+"""
+benchmark parallel fetches against a local stub server which answers 429 above a fixed request rate,
+with and without the adaptive per host rate limiter
+
+usage: python benchmarks/bench_ratelimit.py [requests] [threads] [server_rate]
+"""
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import mcxlib
+from mcxlib.libutil import MCXClient, MCXdataNotFound, get_headers, post_json, set_client
+from mcxlib.ratelimit import RateLimiter
+
+PAYLOAD = json.dumps({"d": {"Data": [{"Symbol": "GOLD", "LTP": 72800.0, "Volume": 1200}] * 50}}).encode()
+
+
+def stub_handler(server_rate: float):
+    bucket = RateLimiter(rate=server_rate, burst=max(1, int(server_rate // 10)))
+    lock = threading.Lock()
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length') or 0))
+            with lock:
+                bucket._refill(time.monotonic())
+                allowed = bucket._tokens >= 1
+                if allowed:
+                    bucket._tokens -= 1
+            body = PAYLOAD if allowed else b'Too Many Requests'
+            self.send_response(200 if allowed else 429)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return StubHandler
+
+
+def run(url, count, threads):
+    headers = get_headers()
+
+    def fetch(_):
+        try:
+            post_json(url, headers=headers, payload={})
+            return True
+        except MCXdataNotFound:
+            return False
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        succeeded = sum(pool.map(fetch, range(count)))
+    return succeeded, time.perf_counter() - start
+
+
+def main(count: int = 600, threads: int = 16, server_rate: int = 100):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), stub_handler(server_rate))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/backpage.aspx/GetMarketWatch"
+    print(f"{count} requests, {threads} threads, server allows {server_rate} req/s")
+    try:
+        set_client(MCXClient(pool_maxsize=threads, max_retries=4, backoff_factor=0.05))
+        for name, configure in (('no rate limit', mcxlib.disable_rate_limit),
+                                ('adaptive limiter', lambda: mcxlib.configure_rate_limit(rate=2 * server_rate,
+                                                                                         burst=threads))):
+            configure()
+            succeeded, seconds = run(url, count, threads)
+            stats = mcxlib.rate_limit_stats()
+            print(f"  {name:<17} ok={succeeded}/{count}  {succeeded / seconds:7.1f} ok/s  {seconds:6.2f} s  {stats}")
+    finally:
+        server.shutdown()
+        mcxlib.configure_rate_limit()
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:4]])
@@ -0,0 +1,49 @@
+"""
+benchmark loading many months of a monthly excel report: one get_category_wise_oi call per month (old usage)
+against get_category_wise_oi_range with threaded downloads, parsing in the threads or in a process pool
+
+downloads are simulated by a fixed per request latency so the numbers do not depend on MCX
+
+usage: python benchmarks/bench_report_range.py [months] [latency_ms] [rows]
+"""
+import os
+import sys
+import time
+from unittest.mock import patch
+
+import mcxlib
+import mcxlib.market_data as market_data
+
+sys.path.insert(0, os.path.dirname(__file__))
+from payloads import report_workbook  # noqa: E402
+
+
+def main(months: int = 24, latency_ms: int = 150, rows: int = 2000):
+    content = report_workbook('category_wise_oi', rows)
+
+    def fake_get_content(url, headers=None, timeout=30):
+        time.sleep(latency_ms / 1000)
+        return content
+
+    mcxlib.disable_report_cache()
+    start_month = '202001'
+    end_year, end_month = 2020 + (months - 1) // 12, (months - 1) % 12 + 1
+    end_month = f'{end_year}{end_month:02d}'
+    print(f"{months} months of category_wise_oi ({rows} rows each), {latency_ms} ms per download, "
+          f"{os.cpu_count()} CPUs")
+    with patch.object(market_data, 'get_content', side_effect=fake_get_content):
+        start = time.perf_counter()
+        for year in range(2020, end_year + 1):
+            for month_number in range(1, 13):
+                if f'{year}{month_number:02d}' <= end_month:
+                    mcxlib.get_category_wise_oi(year=year, month_number=month_number)
+        print(f"  one call per month          {time.perf_counter() - start:7.2f} s")
+        for label, processes in (('range, parse in threads', 0), ('range, process pool', None)):
+            start = time.perf_counter()
+            data_df = mcxlib.get_category_wise_oi_range(start_month, end_month, processes=processes)
+            print(f"  {label:<27} {time.perf_counter() - start:7.2f} s  ({len(data_df)} rows)")
+    mcxlib.enable_report_cache()
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:4]])
@@ -0,0 +1,32 @@
+"""
+memory usage of the returned DataFrames before and after applying the endpoint dtype schemas
+
+usage: python benchmarks/bench_schema.py
+"""
+import os
+import sys
+
+from mcxlib.libutil import records_to_frame
+from mcxlib.schema import apply_schema
+
+sys.path.insert(0, os.path.dirname(__file__))
+from payloads import bhav_copy_rows, market_watch_rows, option_chain_rows  # noqa: E402
+
+CASES = [
+    ('market_watch', market_watch_rows(5000), ['__type', 'LTT']),
+    ('bhav_copy', bhav_copy_rows(50000), ['__type']),
+    ('option_chain', option_chain_rows(400), ['ExtensionData', 'PE_LTT', 'CE_LTT', 'LTT', 'Symbol']),
+]
+
+
+def main():
+    for name, rows, drop in CASES:
+        data_df = records_to_frame(rows, drop=drop)
+        before = data_df.memory_usage(deep=True).sum()
+        after = apply_schema(data_df, name).memory_usage(deep=True).sum()
+        print(f"{name:<14} rows={len(data_df):>6}  before={before / 2 ** 20:7.2f} MiB  "
+              f"after={after / 2 ** 20:7.2f} MiB  saved={1 - after / before:6.1%}")
+
+
+if __name__ == '__main__':
+    main()
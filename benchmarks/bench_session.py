@@ -0,0 +1,79 @@
+"""
+benchmark the per request latency of post_json against a local stub server,
+comparing a new requests.Session per call (old behaviour) with the pooled MCXClient
+
+usage: python benchmarks/bench_session.py [requests] [threads]
+"""
+import json
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from mcxlib.libutil import MCXClient, get_headers, post_json, set_client
+
+PAYLOAD = json.dumps({"d": {"Data": [{"Symbol": "GOLD", "LTP": 72800.0, "Volume": 1200}] * 50}}).encode()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(PAYLOAD)))
+        self.end_headers()
+        self.wfile.write(PAYLOAD)
+
+    def log_message(self, *args):
+        pass
+
+
+def post_json_new_session(url, headers, payload, timeout=30):
+    session = requests.Session()
+    session.trust_env = False
+    return session.post(url, headers=headers, data=payload, timeout=timeout).json()
+
+
+def run(fetch, url, count, threads):
+    headers = get_headers()
+
+    def timed(_):
+        start = time.perf_counter()
+        fetch(url, headers=headers, payload={})
+        return (time.perf_counter() - start) * 1000
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = sorted(pool.map(timed, range(count)))
+    return {
+        'mean_ms': statistics.mean(latencies),
+        'p50_ms': latencies[len(latencies) // 2],
+        'p95_ms': latencies[int(len(latencies) * 0.95) - 1],
+    }
+
+
+def main(count: int = 500, threads: int = 1):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/backpage.aspx/GetMarketWatch"
+    try:
+        set_client(MCXClient(pool_maxsize=max(threads, 1)))
+        results = {
+            'new session per call': run(post_json_new_session, url, count, threads),
+            'pooled MCXClient': run(post_json, url, count, threads),
+        }
+    finally:
+        server.shutdown()
+    print(f"{count} requests, {threads} thread(s)")
+    for name, stats in results.items():
+        print(f"{name:<22} " + "  ".join(f"{key}={value:.3f}" for key, value in stats.items()))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])
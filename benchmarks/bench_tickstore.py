@@ -0,0 +1,46 @@
+"""
+write a month of recorded market watch snapshots to a tick store and time loading slices of it
+
+usage: python benchmarks/bench_tickstore.py [snapshots_per_day] [days]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from mcxlib.libutil import records_to_frame
+from mcxlib.schema import apply_schema
+from mcxlib.tickstore import TickStoreWriter, ds, read_ticks
+
+sys.path.insert(0, os.path.dirname(__file__))
+from payloads import market_watch_rows  # noqa: E402
+
+
+def main(snapshots_per_day: int = 20, days: int = 30):
+    board = apply_schema(records_to_frame(market_watch_rows(5000), drop=['__type']), 'market_watch')
+    with tempfile.TemporaryDirectory() as root:
+        start = time.perf_counter()
+        with TickStoreWriter(root, 'market_watch', buffer_rows=200000) as writer:
+            for day in pd.date_range('2023-11-01', periods=days):
+                for snapshot in range(snapshots_per_day):
+                    writer.append(board, snapshot_time=day + pd.Timedelta(hours=9, minutes=snapshot))
+        write_s = time.perf_counter() - start
+        rows = snapshots_per_day * days * len(board)
+        print(f"wrote {rows:,} rows in {write_s:.1f} s")
+
+        slices = {
+            'whole month, 3 columns': dict(columns=['SnapshotTime', 'ContractName', 'LTP']),
+            'one week, GOLD only': dict(start='2023-11-06', end='2023-11-12', commodities=['GOLD']),
+            'whole month, LTP > 70000': dict(columns=['SnapshotTime', 'ContractName', 'LTP'],
+                                             filters=ds.field('LTP') > 70000),
+        }
+        for name, kwargs in slices.items():
+            start = time.perf_counter()
+            data_df = read_ticks(root, 'market_watch', **kwargs)
+            print(f"  {name:<26} {len(data_df):>10,} rows in {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])
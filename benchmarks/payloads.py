@@ -0,0 +1,204 @@
+"""
+synthetic MCX payloads shaped like the recorded backpage.aspx responses and the monthly excel reports,
+used by the benchmarks when no recorded payload files are given
+"""
+from datetime import datetime, timedelta
+from io import BytesIO
+import json
+import random
+
+COMMODITIES = ['ALUMINIUM', 'COPPER', 'CRUDEOIL', 'CRUDEOILM', 'GOLD', 'GOLDGUINEA', 'GOLDM', 'GOLDPETAL',
+               'LEAD', 'LEADMINI', 'NATURALGAS', 'NATGASMINI', 'NICKEL', 'SILVER', 'SILVERM', 'SILVERMIC',
+               'ZINC', 'ZINCMINI', 'MCXBULLDEX', 'MCXMETLDEX']
+INSTRUMENTS = ['FUTCOM', 'OPTFUT', 'FUTIDX', 'OPTCOM']
+EXPIRIES = ['17NOV2023', '15DEC2023', '16JAN2024', '15FEB2024', '15MAR2024']
+
+
+def _mcx_date(rng: random.Random) -> str:
+    return f"/Date({1698800000000 + rng.randint(0, 30 * 86400) * 1000})/"
+
+
+def market_watch_rows(rows: int = 5000, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    data = []
+    for i in range(rows):
+        symbol = COMMODITIES[i % len(COMMODITIES)]
+        instrument = INSTRUMENTS[i % len(INSTRUMENTS)]
+        expiry = EXPIRIES[i % len(EXPIRIES)]
+        strike = float(rng.randrange(100, 80000, 50)) if instrument.startswith('OPT') else 0.0
+        option_type = rng.choice(['CE', 'PE']) if strike else '-'
+        ltp = round(rng.uniform(1, 80000), 2)
+        data.append({
+            '__type': 'MCX.MarketWatch',
+            'Symbol': symbol,
+            'ProductCode': symbol,
+            'ExpiryDate': expiry,
+            'StrikePrice': strike,
+            'OptionType': option_type,
+            'InstrumentName': instrument,
+            'ContractName': f"{symbol}{expiry[:5]}{int(strike) or ''}{option_type if strike else 'FUT'}",
+            'Open': ltp, 'High': round(ltp * 1.01, 2), 'Low': round(ltp * 0.99, 2), 'LTP': ltp,
+            'PreviousClose': round(ltp * 0.995, 2),
+            'AbsoluteChange': round(ltp * 0.005, 2), 'PercentChange': 0.5,
+            'Volume': rng.randint(0, 100000), 'Value': round(rng.uniform(0, 1e6), 2),
+            'OpenInterest': rng.randint(0, 50000),
+            'BuyQuantity': rng.randint(0, 500), 'BuyPrice': ltp, 'SellPrice': ltp, 'SellQuantity': rng.randint(0, 500),
+            'Unit': 'KGS', 'Underlying': symbol, 'LTT': _mcx_date(rng),
+        })
+    return data
+
+
+def bhav_copy_rows(rows: int = 20000, seed: int = 2) -> list:
+    rng = random.Random(seed)
+    data = []
+    for i in range(rows):
+        symbol = COMMODITIES[i % len(COMMODITIES)]
+        close = round(rng.uniform(1, 80000), 2)
+        data.append({
+            '__type': 'MCX.BhavCopy',
+            'Date': '11/02/2023', 'InstrumentName': INSTRUMENTS[i % len(INSTRUMENTS)], 'Symbol': symbol,
+            'ExpiryDate': EXPIRIES[i % len(EXPIRIES)], 'OptionType': rng.choice(['CE', 'PE', '-']),
+            'StrikePrice': float(rng.randrange(0, 80000, 50)),
+            'Open': close, 'High': close, 'Low': close, 'Close': close, 'PreviousClose': close,
+            'Volume': rng.randint(0, 100000), 'VolumeInThousands': f"{rng.randint(0, 100000)}",
+            'Value': round(rng.uniform(0, 1e6), 2), 'OpenInterest': rng.randint(0, 50000),
+            'DateDisplay': '02 Nov 2023',
+        })
+    return data
+
+
+def option_chain_rows(strikes: int = 200, seed: int = 3) -> list:
+    rng = random.Random(seed)
+    data = []
+    for i in range(strikes):
+        row = {'ExtensionData': None, 'Symbol': 'CRUDEOIL', 'LTT': _mcx_date(rng),
+               'ExpiryDate': '17NOV2023', 'UnderlyingValue': 6500.0}
+        for side in ('CE', 'PE'):
+            row.update({
+                f'{side}_OpenInterest': rng.randint(0, 20000), f'{side}_ChangeInOI': rng.randint(-500, 500),
+                f'{side}_Volume': rng.randint(0, 50000), f'{side}_LTP': round(rng.uniform(0.5, 800), 2),
+                f'{side}_AbsoluteChange': round(rng.uniform(-50, 50), 2),
+                f'{side}_BidQty': rng.randint(0, 100), f'{side}_BidPrice': round(rng.uniform(0.5, 800), 2),
+                f'{side}_AskPrice': round(rng.uniform(0.5, 800), 2), f'{side}_AskQty': rng.randint(0, 100),
+                f'{side}_StrikePrice': 5500.0 + 10 * i, f'{side}_LTT': _mcx_date(rng),
+            })
+        data.append(row)
+    return data
+
+
+def as_payload(rows: list) -> bytes:
+    return json.dumps({'d': {'__type': 'MCX.Response', 'Data': rows}}).encode()
+
+
+def report_workbook(name: str, rows: int = 2000, seed: int = 4) -> bytes:
+    """
+    xlsx bytes laid out like the monthly report `name`: title rows, a header row, data rows and footnotes
+    """
+    import openpyxl
+
+    from mcxlib.excel import REPORT_LAYOUTS
+
+    layout = REPORT_LAYOUTS[name]
+    rng = random.Random(seed)
+    width = len(layout.get('columns', [])) or 26
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    for i in range(layout.get('skiprows', 0)):
+        sheet.append([f"MCX {name.replace('_', ' ')} report" if i == 0 else None])
+    header = ['Date', 'Commodity', 'Instrument'] + [f'Column {i}' for i in range(3, width)]
+    if name == 'trading_statistics':
+        header[-2:] = ['Mode of Trading (% of Turnover)', None]
+    sheet.append(header)
+    for i in range(rows):
+        sheet.append([datetime(2023, 9, 1) + timedelta(days=i % 30), rng.choice(COMMODITIES),
+                      rng.choice(INSTRUMENTS)]
+                     + [rng.choice([rng.randint(0, 500000), round(rng.uniform(0, 1e6), 2)])
+                        for _ in range(3, width)])
+    for i in range(layout.get('skipfooter', 0)):
+        sheet.append([f"Note {i + 1}: figures are provisional"])
+    content = BytesIO()
+    workbook.save(content)
+    return content.getvalue()
+
+
+def put_call_ratio_rows(seed: int = 5) -> list:
+    rng = random.Random(seed)
+    data = []
+    for symbol in COMMODITIES[:10]:
+        for expiry in EXPIRIES[:3]:
+            put_oi, call_oi = rng.randint(1, 50000), rng.randint(1, 50000)
+            data.append({'ExtensionData': None, 'Symbol': symbol, 'ExpiryDate': expiry, 'PutOI': put_oi,
+                         'CallOI': call_oi, 'Ratio': round(put_oi / call_oi, 2), 'Date': '/Date(1698800000000)/'})
+    return data
+
+
+def historical_rows(rows: int = 20000, seed: int = 6) -> list:
+    data = bhav_copy_rows(rows, seed)
+    start = datetime(2023, 1, 2)
+    for i, row in enumerate(data):
+        row.update({'Date': (start + timedelta(days=i % 300)).strftime('%m/%d/%Y'), 'Year': 2023, 'Month': 1})
+    return data
+
+
+def icomdex_rows(seed: int = 7) -> list:
+    rng = random.Random(seed)
+    return [{'__type': 'MCX.Index', 'Index': f'MCXICOMDEX{name}', 'IndexName': f'MCX iCOMDEX {name.title()}',
+             'Open': 15000.0, 'High': 15100.0, 'Low': 14900.0, 'Close': round(rng.uniform(14900, 15100), 2),
+             'PreviousClose': 15000.0, 'PercentChange': 0.1}
+            for name in ('COMPOSITE', 'BULLION', 'METAL', 'ENERGY', 'GOLD', 'SILVER', 'CRUDE', 'NATURALGAS')]
+
+
+def pro_cli_rows(rows: int = 500, seed: int = 8) -> list:
+    rng = random.Random(seed)
+    return [{'ExtensionData': None, 'TradingDate': '/Date(1698800000000)/', 'Date': '01 Nov 2023',
+             'Segment': rng.choice(['FUT', 'OPT']), 'CommodityHead': 'BULLION', 'Commodity': COMMODITIES[i % 20],
+             'ProBuy': rng.randint(0, 10 ** 6), 'ProSell': rng.randint(0, 10 ** 6),
+             'CliBuy': rng.randint(0, 10 ** 6), 'CliSell': rng.randint(0, 10 ** 6)} for i in range(rows)]
+
+
+def holiday_rows() -> list:
+    return [{'__type': 'MCX.Holiday', 'Date': date, 'Day': day, 'Description': description,
+             'MorningSession': 'Closed', 'EveningSession': evening}
+            for date, day, description, evening in (('26 Jan 2023', 'Thursday', 'Republic Day', 'Closed'),
+                                                    ('07 Mar 2023', 'Tuesday', 'Holi', 'Open'),
+                                                    ('07 Apr 2023', 'Friday', 'Good Friday', 'Closed'),
+                                                    ('02 Oct 2023', 'Monday', 'Gandhi Jayanti', 'Closed'),
+                                                    ('14 Nov 2023', 'Tuesday', 'Diwali Balipratipada', 'Open'),
+                                                    ('27 Nov 2023', 'Monday', 'Gurunanak Jayanti', 'Open'),
+                                                    ('25 Dec 2023', 'Monday', 'Christmas', 'Closed'))]
+
+
+def endpoint_rows(method: str, scale: float = 1.0) -> list:
+    """
+    synthetic Data rows for a backpage.aspx method, `scale` multiplies the row counts of the large payloads
+    """
+    def size(rows):
+        return max(1, int(rows * scale))
+
+    if method == 'GetMarketWatch':
+        return market_watch_rows(size(5000))
+    if method in ('GetHeatMap', 'GetGainer', 'GetLosers', 'GetMostActiveContractByVolumeFilter',
+                  'GetMostActiveOptionsContractsByVolume'):
+        data = market_watch_rows(50)
+        for row in data:
+            row.update({'ExtensionData': None, 'Date': '/Date(1698800000000)/', 'Dttm': row['LTT']})
+        return data
+    if method in ('GetExpirywisePutCallRatio', 'GetCommoditywisePutCallRatio'):
+        return put_call_ratio_rows()
+    if method == 'GetDateWiseBhavCopy':
+        return bhav_copy_rows(size(2000))
+    if method == 'GetHistoricalDataDetails':
+        return historical_rows(size(20000))
+    if method == 'GetOptionChain':
+        return option_chain_rows(size(200))
+    if method == 'GetMCXIComdexIndicesDetails':
+        return icomdex_rows()
+    if method == 'GetPROClientDetailsSegmentWise':
+        return pro_cli_rows(size(500))
+    if method == 'GetTradingHolidays':
+        return holiday_rows()
+    raise KeyError(f"no synthetic payload for {method}")
+
+
+REPORT_FILES = {'category-wise-turnover': 'category_wise_turnover', 'category-wise-oi': 'category_wise_oi',
+                'ccl_delivery': 'ccl_delivery', 'trading-statistics': 'trading_statistics'}
@@ -0,0 +1,190 @@
+"""
+local stand-in for www.mcxindia.com: answers the backpage.aspx/* methods and the monthly .xlsx reports from
+recorded fixture files, falling back to the synthetic payloads of payloads.py
+
+point mcxlib at it with mcxlib.configure_client(base_url=server.base_url) or the MCXLIB_BASE_URL variable
+
+    with ReplayServer('fixtures/') as server:
+        mcxlib.configure_client(base_url=server.base_url)
+        mcxlib.get_market_watch()
+
+fixtures are named after the metrics endpoint label of the url: GetMarketWatch.json, category-wise-oi.xlsx
+record them from the live site once with
+
+    python benchmarks/replay.py record fixtures/
+
+usage: python benchmarks/replay.py [serve|record] [fixtures dir] [port]
+"""
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import hashlib
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+from payloads import REPORT_FILES, as_payload, endpoint_rows, report_workbook  # noqa: E402
+
+from mcxlib.libutil import get_client  # noqa: E402
+from mcxlib.metrics import endpoint_name  # noqa: E402
+
+
+class ReplayServer:
+    """
+    threaded HTTP/1.1 replay server on 127.0.0.1
+    :param fixtures: directory of recorded responses, None to serve synthetic payloads only
+    :param scale: row count multiplier for the synthetic payloads
+    :param latency: seconds added before every response, to mimic the round trip to MCX
+    :param report_rows: rows of the synthetic excel reports
+    :param port: 0 picks a free port
+    """
+
+    def __init__(self, fixtures: str = None, scale: float = 1.0, latency: float = 0.0, report_rows: int = 2000,
+                 port: int = 0):
+        self.fixtures = fixtures
+        self.scale = scale
+        self.latency = latency
+        self.report_rows = report_rows
+        self.requests = 0
+        self._bodies = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def body(self, path: str):
+        """
+        (content type, body) for a request path, built once and kept in memory
+        """
+        name = endpoint_name(path)
+        with self._lock:
+            if name not in self._bodies:
+                self._bodies[name] = self._load(name, path)
+            return self._bodies[name]
+
+    def _load(self, name: str, path: str):
+        is_report = path.lower().endswith('.xlsx')
+        extension, content_type = (('.xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+                                   if is_report else ('.json', 'application/json; charset=utf-8'))
+        if self.fixtures is not None:
+            fixture = os.path.join(self.fixtures, name + extension)
+            if os.path.exists(fixture):
+                with open(fixture, 'rb') as file:
+                    return content_type, file.read()
+        if is_report:
+            if name not in REPORT_FILES:
+                return None
+            return content_type, report_workbook(REPORT_FILES[name], self.report_rows)
+        try:
+            return content_type, as_payload(endpoint_rows(name, self.scale))
+        except KeyError:
+            return None
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def _reply(self):
+                self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                with server._lock:
+                    server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                found = server.body(self.path)
+                if found is None:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                content_type, body = found
+                etag = '"%s"' % hashlib.sha1(body).hexdigest()
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('ETag', etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = _reply
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> 'ReplayServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, name='mcxlib-replay', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+@contextmanager
+def record_fixtures(directory: str):
+    """
+    save every successful response of the shared MCX client into directory as a replay fixture
+    """
+    os.makedirs(directory, exist_ok=True)
+
+    def save(response, *args, **kwargs):
+        if response.status_code == 200:
+            name = endpoint_name(response.url)
+            extension = '.xlsx' if response.url.lower().endswith('.xlsx') else '.json'
+            with open(os.path.join(directory, name + extension), 'wb') as file:
+                file.write(response.content)
+        return response
+
+    hooks = get_client().session.hooks['response']
+    hooks.append(save)
+    try:
+        yield directory
+    finally:
+        hooks.remove(save)
+
+
+def main(command: str = 'serve', fixtures: str = None, port: int = 8765):
+    if command == 'record':
+        import mcxlib
+        from bench_e2e import CALLS
+
+        mcxlib.disable_report_cache()
+        with record_fixtures(fixtures or 'fixtures'):
+            for name, (fetch, kwargs) in CALLS.items():
+                try:
+                    fetch(**kwargs)
+                except ValueError as e:
+                    print(f"{name} failed : {e}")
+        return
+    with ReplayServer(fixtures, port=int(port)) as server:
+        print(f"serving on {server.base_url}, export MCXLIB_BASE_URL={server.base_url}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:4])
@@ -1,39 +1,188 @@
-from .market_data import (
-    get_bhav_copy,
-    get_available_contracts,
-    get_category_wise_oi,
-    get_category_wise_turnover,
-    get_ccl_delivery,
-    get_heat_map,
-    get_historical_date_wise_data,
-    get_market_watch,
-    get_mcx_datetime,
-    get_mcx_icomdex_indices,
-    get_most_active_contracts,
-    get_most_active_puts_calls,
-    get_option_chain,
-    get_pro_cli_details,
-    get_put_call_ratio,
-    get_recent_expires,
-    get_top_gainers,
-    get_top_losers,
-    get_trading_statistics,
-)
-
-get_historical_data = get_historical_date_wise_data
+"""
+public API of mcxlib, imported on first use: `import mcxlib` only sets up the names below, and the module
+behind a name (with pandas, numpy and requests) is imported when the name is first accessed
+"""
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .market_data import (
+        MarketWatchSnapshot,
+        get_bhav_copy,
+        get_bhav_copy_range,
+        get_all_option_chains,
+        get_available_contracts,
+        get_category_wise_oi,
+        get_category_wise_oi_range,
+        get_category_wise_turnover,
+        get_category_wise_turnover_range,
+        get_ccl_delivery,
+        get_ccl_delivery_range,
+        get_heat_map,
+        get_historical_date_wise_data,
+        get_market_watch,
+        get_mcx_datetime,
+        get_mcx_icomdex_indices,
+        get_most_active_contracts,
+        get_most_active_puts_calls,
+        get_option_chain,
+        get_pro_cli_details,
+        get_put_call_ratio,
+        get_recent_expires,
+        get_top_gainers,
+        get_top_losers,
+        get_trading_statistics,
+        get_trading_statistics_range,
+    )
+    from .cache import (
+        DiskCache,
+        MemoryCache,
+        ReportStore,
+        cache_stats,
+        disable_disk_cache,
+        disable_memory_cache,
+        disable_report_cache,
+        enable_disk_cache,
+        enable_memory_cache,
+        enable_report_cache,
+    )
+    from .poller import MarketWatchPoller
+    from .libutil import (
+        MCXClient,
+        configure_client,
+        get_client,
+        set_client,
+    )
+    from .metrics import (
+        MetricsRegistry,
+        add_metrics_hook,
+        disable_metrics,
+        enable_metrics,
+        export_prometheus,
+        get_metrics,
+        remove_metrics_hook,
+    )
+    from .ratelimit import (
+        RateLimiter,
+        configure_rate_limit,
+        disable_rate_limit,
+        rate_limit_stats,
+    )
+    from .trading_calendar import (
+        TradingCalendar,
+        configure_trading_calendar,
+        get_trading_calendar,
+        set_trading_calendar,
+        trading_holiday_calendar,
+    )
+    from .market_data import get_historical_date_wise_data as get_historical_data
+
+_LAZY_ATTRIBUTES = {
+    "MarketWatchSnapshot": "market_data",
+    "get_bhav_copy": "market_data",
+    "get_bhav_copy_range": "market_data",
+    "get_all_option_chains": "market_data",
+    "get_available_contracts": "market_data",
+    "get_category_wise_oi": "market_data",
+    "get_category_wise_oi_range": "market_data",
+    "get_category_wise_turnover": "market_data",
+    "get_category_wise_turnover_range": "market_data",
+    "get_ccl_delivery": "market_data",
+    "get_ccl_delivery_range": "market_data",
+    "get_heat_map": "market_data",
+    "get_historical_date_wise_data": "market_data",
+    "get_market_watch": "market_data",
+    "get_mcx_datetime": "market_data",
+    "get_mcx_icomdex_indices": "market_data",
+    "get_most_active_contracts": "market_data",
+    "get_most_active_puts_calls": "market_data",
+    "get_option_chain": "market_data",
+    "get_pro_cli_details": "market_data",
+    "get_put_call_ratio": "market_data",
+    "get_recent_expires": "market_data",
+    "get_top_gainers": "market_data",
+    "get_top_losers": "market_data",
+    "get_trading_statistics": "market_data",
+    "get_trading_statistics_range": "market_data",
+    "DiskCache": "cache",
+    "MemoryCache": "cache",
+    "ReportStore": "cache",
+    "cache_stats": "cache",
+    "disable_disk_cache": "cache",
+    "disable_memory_cache": "cache",
+    "disable_report_cache": "cache",
+    "enable_disk_cache": "cache",
+    "enable_memory_cache": "cache",
+    "enable_report_cache": "cache",
+    "MarketWatchPoller": "poller",
+    "MCXClient": "libutil",
+    "configure_client": "libutil",
+    "get_client": "libutil",
+    "set_client": "libutil",
+    "MetricsRegistry": "metrics",
+    "add_metrics_hook": "metrics",
+    "disable_metrics": "metrics",
+    "enable_metrics": "metrics",
+    "export_prometheus": "metrics",
+    "get_metrics": "metrics",
+    "remove_metrics_hook": "metrics",
+    "RateLimiter": "ratelimit",
+    "configure_rate_limit": "ratelimit",
+    "disable_rate_limit": "ratelimit",
+    "rate_limit_stats": "ratelimit",
+    "TradingCalendar": "trading_calendar",
+    "configure_trading_calendar": "trading_calendar",
+    "get_trading_calendar": "trading_calendar",
+    "set_trading_calendar": "trading_calendar",
+    "trading_holiday_calendar": "trading_calendar",
+}
+_ALIASES = {
+    "get_historical_data": ("market_data", "get_historical_date_wise_data"),
+}
 
 __all__ = [
+    "DiskCache",
+    "MCXClient",
+    "MarketWatchPoller",
+    "MarketWatchSnapshot",
+    "MemoryCache",
+    "MetricsRegistry",
+    "RateLimiter",
+    "ReportStore",
+    "TradingCalendar",
+    "add_metrics_hook",
+    "cache_stats",
+    "configure_client",
+    "configure_rate_limit",
+    "configure_trading_calendar",
+    "disable_disk_cache",
+    "disable_memory_cache",
+    "disable_metrics",
+    "disable_rate_limit",
+    "disable_report_cache",
+    "enable_disk_cache",
+    "enable_memory_cache",
+    "enable_metrics",
+    "enable_report_cache",
+    "export_prometheus",
+    "get_all_option_chains",
     "get_available_contracts",
     "get_bhav_copy",
+    "get_bhav_copy_range",
     "get_category_wise_oi",
+    "get_category_wise_oi_range",
     "get_category_wise_turnover",
+    "get_category_wise_turnover_range",
     "get_ccl_delivery",
+    "get_ccl_delivery_range",
+    "get_client",
     "get_heat_map",
     "get_historical_data",
     "get_historical_date_wise_data",
     "get_market_watch",
     "get_mcx_datetime",
     "get_mcx_icomdex_indices",
+    "get_metrics",
     "get_most_active_contracts",
     "get_most_active_puts_calls",
     "get_option_chain",
@@ -42,7 +191,30 @@ __all__ = [
     "get_recent_expires",
     "get_top_gainers",
     "get_top_losers",
+    "get_trading_calendar",
     "get_trading_statistics",
+    "get_trading_statistics_range",
+    "rate_limit_stats",
+    "remove_metrics_hook",
+    "set_client",
+    "set_trading_calendar",
+    "trading_holiday_calendar",
 ]
 
 __version__ = "0.4"
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRIBUTES:
+        module_name, attribute = _LAZY_ATTRIBUTES[name], name
+    elif name in _ALIASES:
+        module_name, attribute = _ALIASES[name]
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module_name}"), attribute)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,5 @@
+import sys
+
+from mcxlib.cli import main
+
+sys.exit(main())
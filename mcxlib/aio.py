@@ -0,0 +1,189 @@
+"""
+asyncio versions of every mcxlib fetcher
+
+each coroutine runs the blocking fetcher on a shared worker pool which goes through the shared
+MCXClient connection pool, so dozens of calls can be fanned out with asyncio.gather while at most
+`max_concurrency` requests are in flight against MCX at once. the range and bulk fetchers (those taking
+`workers`) hold one slot per inner worker, and their workers are capped at the limit. a fetcher returning a
+generator (eg: get_bhav_copy_range(as_generator=True)) is drained on the worker pool while the slots are held,
+the coroutine returns its items as a list.
+
+    import asyncio
+    from mcxlib import aio
+
+    async def main():
+        return await asyncio.gather(aio.get_heat_map(), aio.get_top_gainers(),
+                                    aio.get_option_chain('CRUDEOIL', '17NOV2023'))
+"""
+import asyncio
+import contextlib
+import functools
+import inspect
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from mcxlib import market_data
+from mcxlib.libutil import get_client
+
+_max_concurrency = 8
+_executor = None
+_semaphores = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def set_concurrency(limit: int):
+    """
+    set the maximum number of MCX requests in flight across all coroutines
+    :param limit: positive int
+    """
+    global _max_concurrency, _executor
+    if limit < 1:
+        raise ValueError(" concurrency limit should be at least 1")
+    with _lock:
+        _max_concurrency = limit
+        previous, _executor = _executor, None
+        _semaphores.clear()
+    if previous is not None:
+        previous.shutdown(wait=False)
+    client = get_client()
+    if client.pool_maxsize < limit:
+        client.resize_pool(limit)
+
+
+def get_concurrency() -> int:
+    return _max_concurrency
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=_max_concurrency, thread_name_prefix='mcxlib-aio')
+        return _executor
+
+
+def _get_semaphore(loop) -> tuple:
+    with _lock:
+        entry = _semaphores.get(loop)
+        if entry is None:
+            entry = _semaphores[loop] = (asyncio.Semaphore(_max_concurrency), asyncio.Lock())
+        return entry
+
+
+@contextlib.asynccontextmanager
+async def _slots(count: int):
+    semaphore, gate = _get_semaphore(asyncio.get_running_loop())
+    acquired = 0
+    try:
+        if count == 1:
+            await semaphore.acquire()
+            acquired = 1
+        else:
+            # one multi slot caller gathers at a time, so two bulk calls never wait on each other's half
+            async with gate:
+                for _ in range(count):
+                    await semaphore.acquire()
+                    acquired += 1
+        yield
+    finally:
+        for _ in range(acquired):
+            semaphore.release()
+
+
+async def run(func, *args, **kwargs):
+    """
+    run any blocking mcxlib function on the shared pool under the concurrency limit
+    """
+    return await _run(1, func, *args, **kwargs)
+
+
+def _call(func, *args, **kwargs):
+    result = func(*args, **kwargs)
+    # a lazy result would download on the event loop thread and outside the limit once the slots are released
+    return list(result) if inspect.isgenerator(result) else result
+
+
+async def _run(slots: int, func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    async with _slots(slots):
+        return await loop.run_in_executor(_get_executor(), functools.partial(_call, func, *args, **kwargs))
+
+
+def _awaitable(func):
+    signature = inspect.signature(func)
+    if 'workers' not in signature.parameters:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            return await run(func, *args, **kwargs)
+        return wrapper
+
+    @functools.wraps(func)
+    async def bulk_wrapper(*args, **kwargs):
+        # the inner pool of a range / bulk fetcher counts against the limit like separate calls would
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        workers = max(1, min(bound.arguments['workers'], _max_concurrency))
+        bound.arguments['workers'] = workers
+        return await _run(workers, func, *bound.args, **bound.kwargs)
+    return bulk_wrapper
+
+
+get_available_contracts = _awaitable(market_data.get_available_contracts)
+get_bhav_copy = _awaitable(market_data.get_bhav_copy)
+get_bhav_copy_range = _awaitable(market_data.get_bhav_copy_range)
+get_category_wise_oi = _awaitable(market_data.get_category_wise_oi)
+get_category_wise_oi_range = _awaitable(market_data.get_category_wise_oi_range)
+get_category_wise_turnover = _awaitable(market_data.get_category_wise_turnover)
+get_category_wise_turnover_range = _awaitable(market_data.get_category_wise_turnover_range)
+get_ccl_delivery = _awaitable(market_data.get_ccl_delivery)
+get_ccl_delivery_range = _awaitable(market_data.get_ccl_delivery_range)
+get_all_option_chains = _awaitable(market_data.get_all_option_chains)
+get_heat_map = _awaitable(market_data.get_heat_map)
+get_historical_date_wise_data = _awaitable(market_data.get_historical_date_wise_data)
+get_historical_data = get_historical_date_wise_data
+get_market_watch = _awaitable(market_data.get_market_watch)
+get_mcx_datetime = _awaitable(market_data.get_mcx_datetime)
+get_mcx_icomdex_indices = _awaitable(market_data.get_mcx_icomdex_indices)
+get_most_active_contracts = _awaitable(market_data.get_most_active_contracts)
+get_most_active_puts_calls = _awaitable(market_data.get_most_active_puts_calls)
+get_option_chain = _awaitable(market_data.get_option_chain)
+get_pro_cli_details = _awaitable(market_data.get_pro_cli_details)
+get_put_call_ratio = _awaitable(market_data.get_put_call_ratio)
+get_recent_expires = _awaitable(market_data.get_recent_expires)
+get_top_gainers = _awaitable(market_data.get_top_gainers)
+get_top_losers = _awaitable(market_data.get_top_losers)
+get_trading_statistics = _awaitable(market_data.get_trading_statistics)
+get_trading_statistics_range = _awaitable(market_data.get_trading_statistics_range)
+
+__all__ = [
+    "get_all_option_chains",
+    "get_available_contracts",
+    "get_bhav_copy",
+    "get_bhav_copy_range",
+    "get_category_wise_oi",
+    "get_category_wise_oi_range",
+    "get_category_wise_turnover",
+    "get_category_wise_turnover_range",
+    "get_ccl_delivery",
+    "get_ccl_delivery_range",
+    "get_concurrency",
+    "get_heat_map",
+    "get_historical_data",
+    "get_historical_date_wise_data",
+    "get_market_watch",
+    "get_mcx_datetime",
+    "get_mcx_icomdex_indices",
+    "get_most_active_contracts",
+    "get_most_active_puts_calls",
+    "get_option_chain",
+    "get_pro_cli_details",
+    "get_put_call_ratio",
+    "get_recent_expires",
+    "get_top_gainers",
+    "get_top_losers",
+    "get_trading_statistics",
+    "get_trading_statistics_range",
+    "run",
+    "set_concurrency",
+]
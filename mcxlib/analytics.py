@@ -0,0 +1,236 @@
+"""
+vectorized option analytics for the frames returned by get_option_chain / get_all_option_chains
+
+MCX options are options on futures, so prices and greeks follow Black-76 on the underlying future.
+every computation is a NumPy array operation across all strikes and expiries at once.
+
+    import mcxlib
+    from mcxlib import analytics
+
+    chains = mcxlib.get_all_option_chains()
+    surface = analytics.option_surface(chains, rate=0.065)
+    analytics.max_pain(chains)
+    analytics.put_call_ratio(chains)
+"""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from mcxlib.libutil import MCX_TIMEZONE
+
+_SQRT_2PI = np.sqrt(2 * np.pi)
+_EXPIRY_TIME = pd.Timedelta(hours=23, minutes=30)
+_MIN_YEARS = 1 / (365 * 24 * 60)
+
+
+def norm_pdf(x):
+    x = np.asarray(x, dtype='float64')
+    return np.exp(-0.5 * x * x) / _SQRT_2PI
+
+
+def norm_cdf(x):
+    """
+    standard normal cdf to double precision (Hart 1968 / West 2005), without scipy
+    """
+    x = np.asarray(x, dtype='float64')
+    z = np.abs(x)
+    e = np.exp(-0.5 * z * z)
+    n = ((((((0.0352624965998911 * z + 0.700383064443688) * z + 6.37396220353165) * z + 33.912866078383) * z
+           + 112.079291497871) * z + 221.213596169931) * z + 220.206867912376)
+    d = (((((((0.0883883476483184 * z + 1.75566716318264) * z + 16.064177579207) * z + 86.7807322029461) * z
+            + 296.564248779674) * z + 637.333633378831) * z + 793.826512519948) * z + 440.413735824752)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tail = e / ((z + 1 / (z + 2 / (z + 3 / (z + 4 / (z + 0.65))))) * 2.506628274631)
+        c = np.where(z < 7.07106781186547, e * n / d, tail)
+    c = np.where(z > 37, 0.0, c)
+    return np.where(x > 0, 1 - c, c)
+
+
+def _d1_d2(forward, strike, years, sigma):
+    sigma_sqrt_t = sigma * np.sqrt(years)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d1 = (np.log(forward / strike) + 0.5 * sigma_sqrt_t * sigma_sqrt_t) / sigma_sqrt_t
+    return d1, d1 - sigma_sqrt_t
+
+
+def black76_price(forward, strike, years, sigma, rate=0.0, is_call=True):
+    """
+    Black-76 price of european options on a future
+    :param forward: future price
+    :param strike: strike price
+    :param years: time to expiry in years
+    :param sigma: annualised volatility
+    :param rate: continuously compounded risk free rate
+    :param is_call: bool or bool array, False for puts
+    """
+    forward, strike, years, sigma = np.broadcast_arrays(*(np.asarray(a, dtype='float64')
+                                                          for a in (forward, strike, years, sigma)))
+    discount = np.exp(-rate * years)
+    d1, d2 = _d1_d2(forward, strike, years, sigma)
+    call = discount * (forward * norm_cdf(d1) - strike * norm_cdf(d2))
+    put = discount * (strike * norm_cdf(-d2) - forward * norm_cdf(-d1))
+    return np.where(is_call, call, put)
+
+
+def greeks(forward, strike, years, sigma, rate=0.0, is_call=True) -> dict:
+    """
+    Black-76 greeks
+    :return: dict of arrays: delta, gamma, vega (per 1 vol point), theta (per calendar day)
+    """
+    forward, strike, years, sigma = np.broadcast_arrays(*(np.asarray(a, dtype='float64')
+                                                          for a in (forward, strike, years, sigma)))
+    discount = np.exp(-rate * years)
+    d1, d2 = _d1_d2(forward, strike, years, sigma)
+    pdf_d1 = norm_pdf(d1)
+    sqrt_t = np.sqrt(years)
+    price = black76_price(forward, strike, years, sigma, rate=rate, is_call=is_call)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gamma = discount * pdf_d1 / (forward * sigma * sqrt_t)
+        decay = -discount * forward * pdf_d1 * sigma / (2 * sqrt_t)
+    return {
+        'delta': np.where(is_call, discount * norm_cdf(d1), -discount * norm_cdf(-d1)),
+        'gamma': gamma,
+        'vega': discount * forward * pdf_d1 * sqrt_t / 100,
+        'theta': (decay + rate * price) / 365,
+    }
+
+
+def implied_volatility(price, forward, strike, years, rate=0.0, is_call=True, tol: float = 1e-8,
+                       max_iter: int = 100, low: float = 1e-4, high: float = 5.0):
+    """
+    solve Black-76 implied volatility for whole arrays at once with safeguarded Newton steps
+    (bisection whenever a Newton step leaves the bracket)
+    :return: array of implied volatility, NaN where the price is outside the no-arbitrage bounds
+    """
+    price, forward, strike, years = np.broadcast_arrays(*(np.asarray(a, dtype='float64')
+                                                          for a in (price, forward, strike, years)))
+    is_call = np.broadcast_to(np.asarray(is_call, dtype=bool), price.shape)
+    discount = np.exp(-rate * years)
+    intrinsic = discount * np.where(is_call, np.maximum(forward - strike, 0), np.maximum(strike - forward, 0))
+    upper = discount * np.where(is_call, forward, strike)
+    valid = (np.isfinite(price) & np.isfinite(forward) & np.isfinite(strike) & (years > 0) & (forward > 0)
+             & (strike > 0) & (price > intrinsic) & (price < upper))
+
+    sigma = np.full(price.shape, np.nan)
+    # iterate on the unsolved legs only; the arrays shrink as strikes converge
+    rows = np.flatnonzero(valid.ravel())
+    price, forward, strike, years, is_call, discount = (np.ravel(a)[rows] for a in (
+        price, forward, strike, years, is_call, np.broadcast_to(discount, sigma.shape)))
+    low = np.full(rows.shape, low)
+    high = np.full(rows.shape, high)
+    guess = np.full(rows.shape, 0.3)
+    for _ in range(max_iter):
+        if not rows.size:
+            break
+        d1, d2 = _d1_d2(forward, strike, years, guess)
+        # puts via put-call parity so every leg needs a single pair of cdf evaluations
+        model = discount * (forward * norm_cdf(d1) - strike * norm_cdf(d2) - np.where(is_call, 0, forward - strike))
+        diff = model - price
+        done = np.abs(diff) <= tol
+        sigma.ravel()[rows[done]] = guess[done]
+        keep = ~done
+        rows, price, forward, strike, years, is_call, discount, low, high, guess, diff, d1 = (
+            a[keep] for a in (rows, price, forward, strike, years, is_call, discount, low, high, guess, diff, d1))
+        # price increases with sigma, so the sign of diff tells which side of the root guess is on
+        high = np.where(diff > 0, guess, high)
+        low = np.where(diff < 0, guess, low)
+        vega = discount * forward * norm_pdf(d1) * np.sqrt(years)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton = guess - diff / vega
+        inside = np.isfinite(newton) & (newton > low) & (newton < high)
+        guess = np.where(inside, newton, 0.5 * (low + high))
+    sigma.ravel()[rows] = guess
+    return sigma
+
+
+def _column(data_df: pd.DataFrame, names, default=None):
+    for name in names:
+        if name in data_df.columns:
+            return data_df[name]
+    if default is not None:
+        return pd.Series(default, index=data_df.index)
+    raise ValueError(f" option chain has none of the columns {names}")
+
+
+def _expiry_years(data_df: pd.DataFrame, expiry=None, as_of=None) -> np.ndarray:
+    expiry = _column(data_df, ['Expiry', 'ExpiryDate'], default=expiry)
+    expiry_time = pd.to_datetime(expiry.astype(str), format='%d%b%Y').dt.tz_localize(MCX_TIMEZONE) + _EXPIRY_TIME
+    as_of = pd.Timestamp(as_of or datetime.now(MCX_TIMEZONE))
+    as_of = as_of.tz_localize(MCX_TIMEZONE) if as_of.tzinfo is None else as_of
+    years = (expiry_time - as_of).dt.total_seconds().to_numpy() / (365 * 86400)
+    return np.where(years > 0, np.maximum(years, _MIN_YEARS), np.nan)
+
+
+def option_surface(chain_df: pd.DataFrame, rate: float = 0.0, as_of=None, underlying=None,
+                   expiry=None) -> pd.DataFrame:
+    """
+    implied volatility and greeks of both legs for every strike and expiry of an option chain frame
+    :param chain_df: frame from get_option_chain or get_all_option_chains (CE_/PE_ columns)
+    :param rate: continuously compounded risk free rate
+    :param as_of: valuation time, defaults to now (IST)
+    :param underlying: future price when chain_df has no UnderlyingValue column
+    :param expiry: 'DDMMMYYYY' expiry when chain_df has no Expiry / ExpiryDate column
+    :return: panda dataframe with Strike, Underlying, Years, CE_/PE_ IV, Delta, Gamma, Vega, Theta and StrikePCR
+    """
+    strike = _column(chain_df, ['CE_StrikePrice', 'PE_StrikePrice', 'StrikePrice']).to_numpy(dtype='float64')
+    forward = _column(chain_df, ['UnderlyingValue', 'Underlying'], default=underlying).to_numpy(dtype='float64')
+    years = _expiry_years(chain_df, expiry=expiry, as_of=as_of)
+
+    key_columns = [column for column in ('Commodity', 'Expiry') if column in chain_df.columns]
+    surface_df = chain_df[key_columns].copy()
+    surface_df['Strike'] = strike
+    surface_df['Underlying'] = forward
+    surface_df['Years'] = years
+    for side, is_call in (('CE', True), ('PE', False)):
+        price = _column(chain_df, [f'{side}_LTP']).to_numpy(dtype='float64')
+        sigma = implied_volatility(price, forward, strike, years, rate=rate, is_call=is_call)
+        surface_df[f'{side}_IV'] = sigma
+        for name, values in greeks(forward, strike, years, sigma, rate=rate, is_call=is_call).items():
+            surface_df[f'{side}_{name.capitalize()}'] = values
+    ce_oi = _column(chain_df, ['CE_OpenInterest']).to_numpy(dtype='float64')
+    pe_oi = _column(chain_df, ['PE_OpenInterest']).to_numpy(dtype='float64')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        surface_df['StrikePCR'] = np.where(ce_oi > 0, pe_oi / ce_oi, np.nan)
+    return surface_df.reset_index(drop=True)
+
+
+def _group_keys(chain_df: pd.DataFrame) -> list:
+    return [column for column in ('Commodity', 'Expiry') if column in chain_df.columns]
+
+
+def max_pain(chain_df: pd.DataFrame):
+    """
+    strike at which the total payout to option holders is smallest, per commodity / expiry
+    :return: float for a single chain, panda series indexed by (Commodity, Expiry) for a bulk frame
+    """
+    def _max_pain(strike, ce_oi, pe_oi):
+        # payout[i] = total value of all open contracts if the future settles at strike[i]
+        settle = strike[:, None]
+        payout = (np.maximum(settle - strike, 0) * ce_oi + np.maximum(strike - settle, 0) * pe_oi).sum(axis=1)
+        return float(strike[np.argmin(payout)])
+
+    strike = _column(chain_df, ['CE_StrikePrice', 'PE_StrikePrice', 'StrikePrice']).to_numpy(dtype='float64')
+    ce_oi = _column(chain_df, ['CE_OpenInterest']).to_numpy(dtype='float64')
+    pe_oi = _column(chain_df, ['PE_OpenInterest']).to_numpy(dtype='float64')
+    keys = _group_keys(chain_df)
+    if not keys:
+        return _max_pain(strike, ce_oi, pe_oi)
+    groups = chain_df.groupby(keys, sort=False, observed=True).indices
+    return pd.Series({key: _max_pain(strike[rows], ce_oi[rows], pe_oi[rows]) for key, rows in groups.items()},
+                     name='MaxPain').rename_axis(keys)
+
+
+def put_call_ratio(chain_df: pd.DataFrame):
+    """
+    open interest weighted put call ratio (total PE OI / total CE OI), per commodity / expiry
+    :return: float for a single chain, panda series indexed by (Commodity, Expiry) for a bulk frame
+    """
+    keys = _group_keys(chain_df)
+    oi_df = pd.DataFrame({'CE': _column(chain_df, ['CE_OpenInterest']).astype('float64'),
+                          'PE': _column(chain_df, ['PE_OpenInterest']).astype('float64')})
+    if not keys:
+        total = oi_df.sum()
+        return float(total['PE'] / total['CE']) if total['CE'] else float('nan')
+    totals = oi_df.groupby([chain_df[key] for key in keys], sort=False, observed=True).sum()
+    return (totals['PE'] / totals['CE'].where(totals['CE'] > 0)).rename('PCR')
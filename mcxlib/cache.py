@@ -0,0 +1,569 @@
+"""
+opt-in caches for mcxlib fetchers
+
+disk cache for MCX datasets which never change once published (past bhav copies, historical windows,
+PRO/CLI months and the monthly excel reports)
+
+    import mcxlib
+    mcxlib.enable_disk_cache('~/.cache/mcxlib', max_bytes=2 * 1024 ** 3)
+
+entries are stored as parquet when pyarrow/fastparquet is installed (pickle otherwise), keyed by
+endpoint and parameters, and evicted least recently used first once max_bytes is exceeded.
+
+in-memory TTL cache for the live endpoints, concurrent callers of the same request share one fetch
+
+    mcxlib.enable_memory_cache(default_ttl=1.0, ttls={'option_chain': 2.0})
+    mcxlib.cache_stats()
+
+report store for the monthly excel reports: a local copy of each file with its ETag / Last-Modified validators
+and the frame parsed from it, so an unchanged report costs a conditional GET (HTTP 304)
+
+    mcxlib.enable_report_cache('~/.cache/mcxlib/reports')
+"""
+from __future__ import annotations
+
+from collections import OrderedDict, defaultdict
+from concurrent.futures import Future
+from datetime import datetime
+import functools
+import hashlib
+import importlib.util
+import inspect
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from mcxlib.lazy import lazy_module
+from mcxlib.libutil import MCX_TIMEZONE, MCXdataNotFound, _response_excerpt, frame_to_output, get_client
+
+pd = lazy_module('pandas')
+
+DEFAULT_CACHE_DIR = os.path.join('~', '.cache', 'mcxlib')
+DEFAULT_REPORT_DIR = os.path.join(DEFAULT_CACHE_DIR, 'reports')
+DEFAULT_MAX_BYTES = 1024 ** 3
+DEFAULT_MAX_FRAMES = 32
+
+logger = logging.getLogger(__name__)
+
+
+def _parquet_available() -> bool:
+    return any(importlib.util.find_spec(name) is not None for name in ('pyarrow', 'fastparquet'))
+
+
+class DiskCache:
+    """
+    size capped LRU cache of DataFrames on local disk
+    :param path: cache directory, created if missing
+    :param max_bytes: total size above which least recently used entries are evicted, checked against a running
+                      total so writes below the cap never scan the cache directory
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = os.path.abspath(os.path.expanduser(path))
+        self.max_bytes = max_bytes
+        self.use_parquet = _parquet_available()
+        # running total of the entry sizes, counted from disk on the first write and again on every eviction
+        self._size = None
+        self._lock = threading.Lock()
+        os.makedirs(self.path, exist_ok=True)
+
+    @staticmethod
+    def key(endpoint: str, params: dict) -> str:
+        raw = json.dumps({'endpoint': endpoint, 'params': params}, sort_keys=True, default=str)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def _entry_paths(self, endpoint: str, params: dict) -> list:
+        base = os.path.join(self.path, endpoint, self.key(endpoint, params))
+        return [base + '.parquet', base + '.pkl']
+
+    def get(self, endpoint: str, params: dict):
+        """
+        :return: cached panda dataframe or None
+        """
+        for entry_path in self._entry_paths(endpoint, params):
+            try:
+                if entry_path.endswith('.parquet'):
+                    data_df = pd.read_parquet(entry_path)
+                else:
+                    data_df = pd.read_pickle(entry_path)
+            except (FileNotFoundError, ImportError):
+                continue
+            except Exception:
+                # a truncated or unreadable entry is treated as a miss and rewritten later
+                self._remove(entry_path)
+                continue
+            self._touch(entry_path)
+            return data_df
+        return None
+
+    def set(self, endpoint: str, params: dict, data_df: pd.DataFrame):
+        parquet_path, pickle_path = self._entry_paths(endpoint, params)
+        os.makedirs(os.path.dirname(parquet_path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(parquet_path), suffix='.tmp')
+        os.close(fd)
+        try:
+            entry_path = pickle_path
+            if self.use_parquet:
+                try:
+                    data_df.to_parquet(tmp_path)
+                    entry_path = parquet_path
+                except Exception:
+                    # mixed type columns (eg: from excel reports) cannot always be written as parquet
+                    pass
+            if entry_path == pickle_path:
+                data_df.to_pickle(tmp_path)
+            replaced = self._file_size(entry_path)
+            os.replace(tmp_path, entry_path)
+            added = self._file_size(entry_path) - replaced
+        finally:
+            self._remove(tmp_path)
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._entries())
+            else:
+                self._size += added
+            over_limit = self._size > self.max_bytes
+        if over_limit:
+            self.evict()
+
+    def _entries(self) -> list:
+        entries = []
+        for root, _, files in os.walk(self.path):
+            for name in files:
+                if name.endswith(('.parquet', '.pkl')):
+                    entry_path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(entry_path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry_path))
+        return entries
+
+    @property
+    def size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """
+        remove least recently used entries until the cache fits in max_bytes
+        """
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, entry_path in entries:
+                if total <= self.max_bytes:
+                    break
+                self._remove(entry_path)
+                total -= size
+            self._size = total
+
+    def clear(self):
+        with self._lock:
+            for _, _, entry_path in self._entries():
+                self._remove(entry_path)
+            self._size = 0
+
+    @staticmethod
+    def _file_size(entry_path: str) -> int:
+        try:
+            return os.path.getsize(entry_path)
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _touch(entry_path: str):
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _remove(entry_path: str):
+        try:
+            os.remove(entry_path)
+        except OSError:
+            pass
+
+
+_disk_cache = None
+
+
+def enable_disk_cache(path: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES) -> DiskCache:
+    """
+    serve past dated historical requests from a local cache
+    :param path: cache directory
+    :param max_bytes: cache size cap in bytes
+    :return: DiskCache
+    """
+    global _disk_cache
+    _disk_cache = DiskCache(path=path, max_bytes=max_bytes)
+    return _disk_cache
+
+
+def disable_disk_cache():
+    global _disk_cache
+    _disk_cache = None
+
+
+def get_disk_cache():
+    return _disk_cache
+
+
+class ReportStore:
+    """
+    local copies of downloaded reports kept with their ETag / Last-Modified validators and parsed frames
+    :param path: directory for the copies, created on first write
+    :param max_frames: parsed frames kept in memory, least recently used first out (the rest are reloaded from disk)
+    """
+
+    def __init__(self, path: str = DEFAULT_REPORT_DIR, max_frames: int = DEFAULT_MAX_FRAMES):
+        self.path = os.path.abspath(os.path.expanduser(path))
+        self.max_frames = max_frames
+        self._frames = OrderedDict()
+        self._stats = {'not_modified': 0, 'downloaded': 0, 'unchanged': 0, 'parsed': 0}
+        self._url_locks = defaultdict(threading.Lock)
+        self._lock = threading.Lock()
+
+    def _base(self, url: str) -> str:
+        return os.path.join(self.path, hashlib.sha1(url.encode('utf-8')).hexdigest())
+
+    def _count(self, counter: str):
+        with self._lock:
+            self._stats[counter] += 1
+
+    def _read_meta(self, base: str) -> dict:
+        try:
+            with open(base + '.json', encoding='utf-8') as meta_file:
+                meta = json.load(meta_file)
+        except (OSError, ValueError):
+            return {}
+        return meta if os.path.exists(base + '.bin') else {}
+
+    @staticmethod
+    def _write_atomic(target: str, content: bytes):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as tmp_file:
+                tmp_file.write(content)
+            os.replace(tmp_path, target)
+        finally:
+            DiskCache._remove(tmp_path)
+
+    def _get_frame(self, key: tuple):
+        with self._lock:
+            data_df = self._frames.get(key)
+            if data_df is not None:
+                self._frames.move_to_end(key)
+            return data_df
+
+    def _keep_frame(self, key: tuple, data_df: pd.DataFrame):
+        with self._lock:
+            self._frames[key] = data_df
+            self._frames.move_to_end(key)
+            while len(self._frames) > self.max_frames:
+                self._frames.popitem(last=False)
+
+    def _load_frame(self, base: str, name: str, parse):
+        data_df = self._get_frame((base, name))
+        if data_df is None:
+            try:
+                data_df = pd.read_pickle(f'{base}.{name}.frame')
+            except Exception:
+                with open(base + '.bin', 'rb') as content_file:
+                    data_df = parse(content_file.read())
+                self._count('parsed')
+                self._save_frame(base, name, data_df)
+            self._keep_frame((base, name), data_df)
+        return data_df
+
+    def _save_frame(self, base: str, name: str, data_df: pd.DataFrame):
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+            os.close(fd)
+            try:
+                data_df.to_pickle(tmp_path)
+                os.replace(tmp_path, f'{base}.{name}.frame')
+            finally:
+                DiskCache._remove(tmp_path)
+        except OSError as e:
+            logger.warning("could not store parsed report %s: %s", base, e)
+
+    def _save(self, base: str, content: bytes, meta: dict):
+        # drop frames parsed from the previous copy before the new copy becomes visible
+        with self._lock:
+            for entry in [entry for entry in self._frames if entry[0] == base]:
+                self._frames.pop(entry, None)
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            prefix = os.path.basename(base) + '.'
+            for file_name in os.listdir(self.path):
+                if file_name.startswith(prefix) and file_name.endswith('.frame'):
+                    DiskCache._remove(os.path.join(self.path, file_name))
+            self._write_atomic(base + '.bin', content)
+        except OSError as e:
+            logger.warning("could not store report %s: %s", meta.get('url'), e)
+            return
+        self._save_meta(base, meta)
+
+    def _save_meta(self, base: str, meta: dict):
+        try:
+            self._write_atomic(base + '.json', json.dumps(meta).encode('utf-8'))
+        except OSError as e:
+            logger.warning("could not store report %s: %s", meta.get('url'), e)
+
+    def fetch(self, url: str, name: str, parse, timeout: int = None) -> pd.DataFrame:
+        """
+        download url unless the local copy is still current, and return the frame parsed from it
+        :param url: report url
+        :param name: parser name, frames are cached per url and parser
+        :param parse: function turning the file content (bytes) into a panda dataframe
+        :return: panda dataframe (a copy)
+        """
+        base = self._base(url)
+        with self._lock:
+            url_lock = self._url_locks[base]
+        # one download per report at a time, different reports are fetched concurrently
+        with url_lock:
+            meta = self._read_meta(base)
+            headers = {}
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+            response = get_client().get(url, headers=headers or None, timeout=timeout)
+            if response.status_code == 304 and headers:
+                self._count('not_modified')
+                return self._load_frame(base, name, parse).copy()
+            if not response.ok:
+                raise MCXdataNotFound(f"HTTP {response.status_code} for {url}: {_response_excerpt(response)}")
+            self._count('downloaded')
+            content = response.content
+            new_meta = {'url': url, 'etag': response.headers.get('ETag'),
+                        'last_modified': response.headers.get('Last-Modified'),
+                        'sha1': hashlib.sha1(content).hexdigest()}
+            if meta.get('sha1') == new_meta['sha1']:
+                # servers without validators still resend the same bytes, skip the parse
+                self._count('unchanged')
+                if new_meta != meta:
+                    self._save_meta(base, new_meta)
+                return self._load_frame(base, name, parse).copy()
+            data_df = parse(content)
+            self._count('parsed')
+            self._save(base, content, new_meta)
+            if os.path.exists(base + '.bin'):
+                self._save_frame(base, name, data_df)
+            self._keep_frame((base, name), data_df)
+            return data_df.copy()
+
+    def stats(self) -> dict:
+        """
+        not_modified (HTTP 304), downloaded, unchanged (same bytes downloaded again) and parsed counters
+        """
+        with self._lock:
+            return dict(self._stats)
+
+
+_report_store = None
+
+
+def enable_report_cache(path: str = DEFAULT_REPORT_DIR, max_frames: int = DEFAULT_MAX_FRAMES) -> ReportStore:
+    """
+    keep the monthly excel reports locally and revalidate them with conditional GETs
+    :param path: directory for the report copies
+    :param max_frames: parsed frames kept in memory
+    :return: ReportStore
+    """
+    global _report_store
+    _report_store = ReportStore(path=path, max_frames=max_frames)
+    return _report_store
+
+
+def disable_report_cache():
+    global _report_store
+    _report_store = None
+
+
+def get_report_store():
+    return _report_store
+
+
+def is_past_date(value: str, date_format: str = '%Y%m%d') -> bool:
+    """
+    True when value is strictly before the current MCX (IST) date / month
+    """
+    now = datetime.now(MCX_TIMEZONE)
+    try:
+        value = datetime.strptime(str(value), date_format)
+    except ValueError:
+        return False
+    if '%d' in date_format:
+        return value.date() < now.date()
+    return (value.year, value.month) < (now.year, now.month)
+
+
+def is_past_month(year: int, month_number: int) -> bool:
+    now = datetime.now(MCX_TIMEZONE)
+    return (int(year), int(month_number)) < (now.year, now.month)
+
+
+def disk_cached(endpoint: str, is_immutable):
+    """
+    decorator serving a fetcher from the disk cache (when enabled) for immutable requests
+    frames are cached, other output formats are converted from the cached frame
+    :param endpoint: name of the cached dataset
+    :param is_immutable: callable taking the bound arguments dict, True when the result can never change
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            disk_cache = _disk_cache
+            if disk_cache is None:
+                return func(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            params = dict(bound.arguments)
+            if not is_immutable(params):
+                return func(*args, **kwargs)
+            output = params.pop('output', 'pandas')
+            data_df = disk_cache.get(endpoint, params)
+            if data_df is None:
+                data_df = func(**params)
+                disk_cache.set(endpoint, params, data_df)
+            return frame_to_output(data_df, output)
+        return wrapper
+    return decorator
+
+
+class MemoryCache:
+    """
+    process wide TTL cache which coalesces concurrent requests for the same key into one fetch
+    :param default_ttl: seconds an entry stays fresh
+    :param ttls: optional dict of endpoint -> ttl overriding default_ttl, 0 disables caching of that endpoint
+    """
+
+    def __init__(self, default_ttl: float = 1.0, ttls: dict = None):
+        self.default_ttl = default_ttl
+        self.ttls = dict(ttls or {})
+        self._entries = {}
+        self._in_flight = {}
+        self._stats = defaultdict(lambda: {'hits': 0, 'misses': 0, 'coalesced': 0})
+        self._lock = threading.Lock()
+
+    def ttl_for(self, endpoint: str) -> float:
+        return self.ttls.get(endpoint, self.default_ttl)
+
+    @staticmethod
+    def _copy(value):
+        # callers get their own frame so mutating a result never changes the cached one
+        if isinstance(value, list):
+            return [dict(row) if isinstance(row, dict) else row for row in value]
+        return value.copy() if hasattr(value, 'copy') else value
+
+    def get_or_fetch(self, endpoint: str, key, fetch):
+        """
+        :param endpoint: endpoint name used for ttl lookup and stats
+        :param key: hashable request key
+        :param fetch: zero argument callable performing the upstream request
+        """
+        ttl = self.ttl_for(endpoint)
+        if ttl <= 0:
+            return fetch()
+        key = (endpoint, key)
+        with self._lock:
+            stats = self._stats[endpoint]
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                stats['hits'] += 1
+                return self._copy(entry[1])
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+                stats['misses'] += 1
+            else:
+                stats['coalesced'] += 1
+        if not owner:
+            return self._copy(future.result())
+
+        try:
+            value = fetch()
+        except BaseException as e:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            future.set_exception(e)
+            raise
+        with self._lock:
+            now = time.monotonic()
+            self._entries = {k: v for k, v in self._entries.items() if v[0] > now}
+            self._entries[key] = (now + ttl, value)
+            self._in_flight.pop(key, None)
+        future.set_result(value)
+        return self._copy(value)
+
+    def stats(self) -> dict:
+        """
+        :return: dict of endpoint -> {'hits', 'misses', 'coalesced'}
+        """
+        with self._lock:
+            return {endpoint: dict(counts) for endpoint, counts in self._stats.items()}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_memory_cache = None
+
+
+def enable_memory_cache(default_ttl: float = 1.0, ttls: dict = None) -> MemoryCache:
+    """
+    cache live endpoint responses in memory for a short ttl and coalesce concurrent identical requests
+    :param default_ttl: seconds an entry stays fresh
+    :param ttls: dict of endpoint -> ttl, eg: {'option_chain': 2.0, 'heat_map': 5.0}
+    :return: MemoryCache
+    """
+    global _memory_cache
+    _memory_cache = MemoryCache(default_ttl=default_ttl, ttls=ttls)
+    return _memory_cache
+
+
+def disable_memory_cache():
+    global _memory_cache
+    _memory_cache = None
+
+
+def get_memory_cache():
+    return _memory_cache
+
+
+def cache_stats() -> dict:
+    """
+    hit / miss / coalesced counters per endpoint of the memory cache
+    """
+    return _memory_cache.stats() if _memory_cache is not None else {}
+
+
+def memory_cached(endpoint: str):
+    """
+    decorator serving a live fetcher from the memory cache (when enabled)
+    :param endpoint: name used for the per endpoint ttl and stats
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            memory_cache = _memory_cache
+            if memory_cache is None:
+                return func(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = tuple(sorted(bound.arguments.items()))
+            return memory_cache.get_or_fetch(endpoint, key, lambda: func(*args, **kwargs))
+        return wrapper
+    return decorator
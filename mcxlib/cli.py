@@ -0,0 +1,358 @@
+"""
+command line bulk exporter, installed as the `mcxlib` console script (or run with python -m mcxlib)
+
+    mcxlib export jobs.json --workers 8 --format parquet --output-dir mcx-export
+    mcxlib export --dataset bhav_copy --start 20230101 --end 20231231
+    mcxlib datasets
+
+a job spec is a JSON file with a list of jobs, each a dataset with a start and end (YYYYMMDD for the daily and
+historical datasets, YYYYMM for the monthly ones) and optional fetcher arguments, eg: instrument for bhav copies:
+
+    {
+        "output_dir": "mcx-export",
+        "format": "parquet",
+        "workers": 8,
+        "jobs": [
+            {"dataset": "bhav_copy", "start": "20200101", "end": "20231231", "instrument": "FUTCOM"},
+            {"dataset": "historical", "start": "20200101", "end": "20231231", "window_days": 90},
+            {"dataset": "pro_cli", "start": "202001", "end": "202312"},
+            {"dataset": "category_wise_oi", "start": "202001", "end": "202312"}
+        ]
+    }
+
+every job is split into tasks (one trading day, historical window or month, non trading days are skipped with the
+trading calendar) which run on a thread pool and are written to <output_dir>/<job name>/<task>.csv|.parquet.
+finished tasks are recorded in <output_dir>/.mcxlib-export.json after each one completes, keyed by the job name,
+task and fetcher arguments, so rerunning the same command after an interruption only fetches what is missing and
+retries what failed. tasks for a day, window or month which is not over yet are written but never recorded, a
+rerun fetches them again
+"""
+import argparse
+from datetime import datetime
+import importlib.util
+import inspect
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+
+from mcxlib import market_data
+from mcxlib.cache import is_past_date
+from mcxlib.libutil import fetch_many, split_date_range
+from mcxlib.trading_calendar import get_trading_calendar
+
+CHECKPOINT_FILE = '.mcxlib-export.json'
+FILE_FORMATS = ('csv', 'parquet')
+DEFAULT_OUTPUT_DIR = 'mcx-export'
+DEFAULT_WORKERS = 4
+
+# dataset name: (fetcher in market_data, how a job is split into tasks)
+DATASETS = {
+    'bhav_copy': ('get_bhav_copy', 'daily'),
+    'historical': ('get_historical_date_wise_data', 'window'),
+    'pro_cli': ('get_pro_cli_details', 'trade_month'),
+    'category_wise_oi': ('get_category_wise_oi', 'month'),
+    'category_wise_turnover': ('get_category_wise_turnover', 'month'),
+    'trading_statistics': ('get_trading_statistics', 'month'),
+    'ccl_delivery': ('get_ccl_delivery', 'month'),
+}
+# job keys which describe the job itself rather than being passed on to the fetcher
+_JOB_KEYS = {'dataset', 'name', 'start', 'end', 'holidays', 'window_days'}
+# arguments the exporter sets per task
+_TASK_ARGUMENTS = {'trade_date', 'start_date', 'end_date', 'trade_month', 'year', 'month_number', 'output'}
+
+logger = logging.getLogger(__name__)
+
+
+class Checkpoint:
+    """
+    finished and failed export tasks of an output directory, saved after every task
+    :param output_dir: export directory holding the checkpoint file
+    """
+
+    def __init__(self, output_dir: str):
+        self.path = os.path.join(output_dir, CHECKPOINT_FILE)
+        self.output_dir = output_dir
+        self.done, self.failed = {}, {}
+        self._lock = threading.Lock()
+        if os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as fh:
+                state = json.load(fh)
+            self.done, self.failed = state.get('done', {}), state.get('failed', {})
+
+    def is_done(self, task_id: str) -> bool:
+        """
+        :return: True when the task finished and its file (if it had rows) is still there
+        """
+        entry = self.done.get(task_id)
+        if entry is None:
+            return False
+        return entry['file'] is None or os.path.exists(os.path.join(self.output_dir, entry['file']))
+
+    def mark_done(self, task_id: str, rows: int, file: str = None):
+        with self._lock:
+            self.done[task_id] = {'rows': rows, 'file': file}
+            self.failed.pop(task_id, None)
+            self._save()
+
+    def mark_incomplete(self, task_id: str):
+        # exported from a period still open, the next run fetches it again
+        with self._lock:
+            if self.done.pop(task_id, None) is not None or self.failed.pop(task_id, None) is not None:
+                self._save()
+
+    def mark_failed(self, task_id: str, error: Exception):
+        with self._lock:
+            self.failed[task_id] = str(error)
+            self._save()
+
+    def _save(self):
+        # write a temporary file and rename it, so an interrupted save never leaves a truncated checkpoint
+        handle, temp_path = tempfile.mkstemp(dir=self.output_dir, prefix=CHECKPOINT_FILE, suffix='.tmp')
+        with os.fdopen(handle, 'w', encoding='utf-8') as fh:
+            json.dump({'done': self.done, 'failed': self.failed}, fh, indent=1, sort_keys=True)
+        os.replace(temp_path, self.path)
+
+
+def _parse_day(value, field: str) -> datetime:
+    try:
+        return datetime.strptime(str(value), '%Y%m%d')
+    except ValueError:
+        raise ValueError(f" {field} should be in YYYYMMDD format : {value}")
+
+
+def _job_tasks(job: dict) -> list:
+    """
+    :return: list of (task key, fetcher keyword arguments) for one validated job
+    """
+    dataset, start, end = job['dataset'], str(job['start']), str(job['end'])
+    options = {key: value for key, value in job.items() if key not in _JOB_KEYS}
+    split = DATASETS[dataset][1]
+    if split == 'daily':
+        return [(trade_date, dict(options, trade_date=trade_date))
+                for trade_date in market_data._trade_dates(start, end, job.get('holidays'))]
+    if split == 'window':
+        if _parse_day(end, 'end') < _parse_day(start, 'start'):
+            raise ValueError(' end should not be before start')
+        windows = split_date_range(start, end, max_days=min(job.get('window_days', 365), 365))
+        calendar = get_trading_calendar()
+        return [(f"{window_start}-{window_end}", dict(options, start_date=window_start, end_date=window_end))
+                for window_start, window_end in windows if len(calendar.trading_days(window_start, window_end))]
+    months = market_data._report_months(start, end)
+    if split == 'trade_month':
+        return [(f"{year}{month:02d}", dict(options, trade_month=f"{year}{month:02d}")) for year, month in months]
+    return [(f"{year}{month:02d}", dict(options, year=year, month_number=month)) for year, month in months]
+
+
+def _task_id(job: dict, key: str) -> str:
+    # fetcher arguments are part of the id, a job rerun with other options does not reuse finished tasks
+    options = sorted((key, value) for key, value in job.items() if key not in _JOB_KEYS)
+    task_id = f"{job['name']}/{key}"
+    if options:
+        task_id += '?' + '&'.join(f"{name}={value}" for name, value in options)
+    return task_id
+
+
+def _is_complete(job: dict, key: str) -> bool:
+    """
+    :return: True when the day, window or month of a task is over, so its data can no longer change
+    """
+    split = DATASETS[job['dataset']][1]
+    if split == 'daily':
+        return is_past_date(key)
+    if split == 'window':
+        return is_past_date(key.split('-')[1])
+    return is_past_date(key, '%Y%m')
+
+
+def validate_job(job: dict) -> dict:
+    """
+    check one job of a spec and fill in its name
+    :param job: dict with dataset, start, end and optional name, holidays, window_days and fetcher arguments
+    :return: the job with 'name' set (defaults to the dataset)
+    """
+    if not isinstance(job, dict):
+        raise ValueError(f" every job should be an object : {job!r}")
+    dataset = job.get('dataset')
+    if dataset not in DATASETS:
+        raise ValueError(f" dataset should be one of {sorted(DATASETS)} : {dataset!r}")
+    missing = [key for key in ('start', 'end') if not job.get(key)]
+    if missing:
+        raise ValueError(f" {dataset} job is missing {missing}")
+    parameters = inspect.signature(getattr(market_data, DATASETS[dataset][0])).parameters
+    unknown = [key for key in job if key not in _JOB_KEYS and (key not in parameters or key in _TASK_ARGUMENTS)]
+    if unknown:
+        raise ValueError(f" {dataset} job has unknown options {unknown}")
+    if 'window_days' in job:
+        window_days = job['window_days']
+        if isinstance(window_days, bool) or not isinstance(window_days, int) or window_days < 1:
+            raise ValueError(f" window_days should be an integer of at least 1 : {window_days!r}")
+    job = dict(job, name=str(job.get('name') or dataset))
+    if os.path.basename(job['name']) != job['name'] or job['name'].startswith('.'):
+        raise ValueError(f" job name should be a plain directory name : {job['name']!r}")
+    return job
+
+
+def load_job_spec(path: str) -> dict:
+    """
+    :param path: JSON job spec, either a list of jobs or an object with 'jobs' and optional
+                 'output_dir', 'format' and 'workers'
+    :return: spec dict with validated jobs
+    """
+    with open(path, encoding='utf-8') as fh:
+        try:
+            spec = json.load(fh)
+        except json.JSONDecodeError as e:
+            raise ValueError(f" job spec {path} is not valid JSON : {e}")
+    if isinstance(spec, list):
+        spec = {'jobs': spec}
+    if not isinstance(spec, dict) or not spec.get('jobs'):
+        raise ValueError(f" job spec {path} has no jobs")
+    return dict(spec, jobs=[validate_job(job) for job in spec['jobs']])
+
+
+def _write_frame(data_df, path: str, file_format: str):
+    # write next to the target and rename, a half written file is never mistaken for a finished task
+    temp_path = f"{path}.part"
+    if file_format == 'parquet':
+        data_df.to_parquet(temp_path, index=False)
+    else:
+        data_df.to_csv(temp_path, index=False)
+    os.replace(temp_path, path)
+
+
+def _export_task(fetch, job_name: str, key: str, kwargs: dict, output_dir: str, file_format: str,
+                 task_id: str = None) -> tuple:
+    data_df = fetch(**kwargs)
+    if data_df is None or data_df.empty:
+        return 0, None
+    file = os.path.join(job_name, f"{key}.{file_format}")
+    _write_frame(data_df, os.path.join(output_dir, file), file_format)
+    return len(data_df), file
+
+
+def run_export(jobs: list, output_dir: str = DEFAULT_OUTPUT_DIR, file_format: str = 'csv',
+               workers: int = DEFAULT_WORKERS, restart: bool = False, progress=None) -> dict:
+    """
+    fetch every task of the jobs on a thread pool, write one file per task and checkpoint each one
+    :param jobs: list of job dicts, see validate_job
+    :param output_dir: export directory, created if missing
+    :param file_format: 'csv' or 'parquet' (needs pyarrow: pip install mcxlib[parquet])
+    :param workers: maximum number of tasks fetched at once
+    :param restart: if True ignore the checkpoint and fetch every task again
+    :param progress: optional callable(done count, total, task id, rows, error) called as tasks finish
+    :return: dict with 'total', 'skipped', 'exported' and 'failed' ({task id: error}) counts of this run
+    """
+    if file_format not in FILE_FORMATS:
+        raise ValueError(f" file format should be one of {FILE_FORMATS} : {file_format!r}")
+    if file_format == 'parquet' and importlib.util.find_spec('pyarrow') is None:
+        raise ImportError("pyarrow is required for parquet exports : pip install mcxlib[parquet]")
+    jobs = [validate_job(job) for job in jobs]
+    output_dir = os.path.abspath(os.path.expanduser(output_dir))
+    os.makedirs(output_dir, exist_ok=True)
+    checkpoint = Checkpoint(output_dir)
+
+    # task id: whether its period is over and it may be checkpointed
+    params, tasks, total, skipped = [], {}, 0, 0
+    for job in jobs:
+        fetch = getattr(market_data, DATASETS[job['dataset']][0])
+        os.makedirs(os.path.join(output_dir, job['name']), exist_ok=True)
+        for key, kwargs in _job_tasks(job):
+            total += 1
+            task_id = _task_id(job, key)
+            if not restart and checkpoint.is_done(task_id):
+                skipped += 1
+                continue
+            tasks[task_id] = _is_complete(job, key)
+            params.append({'fetch': fetch, 'job_name': job['name'], 'key': key, 'kwargs': kwargs,
+                           'output_dir': output_dir, 'file_format': file_format, 'task_id': task_id})
+
+    summary = {'total': total, 'skipped': skipped, 'exported': 0, 'failed': {}}
+    for count, (task, result, error) in enumerate(fetch_many(_export_task, params, workers=workers), 1):
+        task_id = task['task_id']
+        rows = None
+        if error is not None:
+            logger.warning(f"export of {task_id} failed : {error}")
+            checkpoint.mark_failed(task_id, error)
+            summary['failed'][task_id] = str(error)
+        else:
+            rows, file = result
+            if tasks[task_id]:
+                checkpoint.mark_done(task_id, rows, file)
+            else:
+                checkpoint.mark_incomplete(task_id)
+            summary['exported'] += 1
+        if progress is not None:
+            progress(skipped + count, total, task_id, rows, error)
+    return summary
+
+
+def _print_progress(done: int, total: int, task_id: str, rows: int, error: Exception):
+    status = f"failed : {error}" if error is not None else f"{rows} rows"
+    print(f"[{done}/{total}] {task_id} {status}", file=sys.stderr)
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='mcxlib', description='bulk export MCX India data')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    export = commands.add_parser('export', help='run a job spec, or a single --dataset job',
+                                 description='fetch datasets for date ranges into CSV / Parquet files, '
+                                             'rerun the same command to resume an interrupted export')
+    export.add_argument('spec', nargs='?', help='JSON job spec file')
+    export.add_argument('--dataset', choices=sorted(DATASETS), help='export one dataset instead of a spec')
+    export.add_argument('--start', help='first date (YYYYMMDD) or month (YYYYMM) of --dataset')
+    export.add_argument('--end', help='last date (YYYYMMDD) or month (YYYYMM) of --dataset')
+    export.add_argument('--output-dir', help=f"export directory (default: {DEFAULT_OUTPUT_DIR})")
+    export.add_argument('--format', choices=FILE_FORMATS, help='file format (default: csv)')
+    export.add_argument('--workers', type=int, help=f"tasks fetched at once (default: {DEFAULT_WORKERS})")
+    export.add_argument('--restart', action='store_true', help='ignore the checkpoint and export everything again')
+    export.add_argument('--quiet', action='store_true', help='do not print progress')
+
+    commands.add_parser('datasets', help='list the datasets a job can export')
+    return parser
+
+
+def main(argv: list = None) -> int:
+    """
+    entry point of the `mcxlib` console script
+    :return: exit code, 0 when every task finished, 1 when some failed (rerun to retry them)
+    """
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    if args.command == 'datasets':
+        for name, (fetcher, split) in DATASETS.items():
+            print(f"{name:<24} {fetcher:<32} {'months' if 'month' in split else split}")
+        return 0
+
+    if (args.spec is None) == (args.dataset is None):
+        parser.error('give either a job spec file or --dataset with --start and --end')
+    try:
+        if args.spec is not None:
+            spec = load_job_spec(args.spec)
+        else:
+            spec = {'jobs': [validate_job({'dataset': args.dataset, 'start': args.start, 'end': args.end})]}
+    except (OSError, ValueError) as e:
+        parser.error(str(e).strip())
+
+    try:
+        summary = run_export(spec['jobs'],
+                             output_dir=args.output_dir or spec.get('output_dir', DEFAULT_OUTPUT_DIR),
+                             file_format=args.format or spec.get('format', 'csv'),
+                             workers=args.workers or spec.get('workers', DEFAULT_WORKERS),
+                             restart=args.restart,
+                             progress=None if args.quiet else _print_progress)
+    except (ImportError, ValueError) as e:
+        parser.error(str(e).strip())
+    except KeyboardInterrupt:
+        print("interrupted : rerun the same command to resume", file=sys.stderr)
+        return 130
+    print(f"{summary['exported']} tasks exported, {summary['skipped']} already done, "
+          f"{len(summary['failed'])} failed of {summary['total']}", file=sys.stderr)
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
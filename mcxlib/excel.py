@@ -0,0 +1,103 @@
+"""
+parsing of the monthly MCX excel reports
+
+each report layout (header offset, footer rows, column names / renames) is declared in REPORT_LAYOUTS and applied
+by parse_report. the workbook is read with pd.read_excel and the fastest engine available:
+
+* 'calamine' when python-calamine is installed and pandas is 2.2 or newer (pip install mcxlib[fast])
+* 'openpyxl' otherwise
+
+a layout with declared columns raises ValueError when the sheet is not exactly that wide, so a report MCX changed
+is reported instead of being cut to fit. a layout may bound the read with 'usecols' / 'nrows'. none of the bundled
+layouts does: a column bound would hide an added column, and the row count and footer position change every month.
+"""
+from __future__ import annotations
+
+from io import BytesIO
+import hashlib
+import importlib.util
+import json
+
+from mcxlib.lazy import lazy_module
+
+pd = lazy_module('pandas')
+
+REPORT_LAYOUTS = {
+    'category_wise_turnover': {'skiprows': 2, 'skipfooter': 9},
+    'category_wise_oi': {
+        'skiprows': 3, 'skipfooter': 8,
+        'columns': ['Date', 'Commodity', 'Instrument', 'Open Interest', 'FPOs/ Farmers(Long OI)',
+                    'FPOs/ Farmers(Short OI)', 'VCPs/ Hedger(Long OI)', 'VCPs/ Hedger(Short OI)',
+                    'Proprietary traders(Long OI)', 'Proprietary traders(Short OI)',
+                    'Domestic Financial institutional investors(Long OI)',
+                    'Domestic Financial institutional investors(Short OI)', 'Foreign Participants(Long OI)',
+                    'Foreign Participants(Short OI)', 'Others(Long OI)', 'Others(Short OI)'],
+    },
+    'ccl_delivery': {'dropna': True},
+    'trading_statistics': {
+        'skipfooter': 5, 'dropna': True,
+        'rename': {"Mode of Trading (% of Turnover)": "Mode of ALGO Trading (% of Turnover)",
+                   "Unnamed: 25": "Mode of Non-ALGO Trading (% of Turnover)"},
+    },
+}
+
+# pd.read_excel(engine='calamine') was added in pandas 2.2
+_CALAMINE_PANDAS_VERSION = (2, 2)
+
+
+def _pandas_version() -> tuple:
+    return tuple(int(part) for part in pd.__version__.split('.')[:2] if part.isdigit())
+
+
+def excel_engine() -> str:
+    """
+    :return: 'calamine' when python-calamine is installed and pandas supports it, else 'openpyxl'
+    """
+    if importlib.util.find_spec('python_calamine') is not None and _pandas_version() >= _CALAMINE_PANDAS_VERSION:
+        return 'calamine'
+    return 'openpyxl'
+
+
+def layout_key(name: str) -> str:
+    """
+    report name tagged with a digest of its layout, so frames cached under an older layout are not reused
+    """
+    raw = json.dumps(REPORT_LAYOUTS[name], sort_keys=True)
+    return f"{name}-{hashlib.sha1(raw.encode('utf-8')).hexdigest()[:8]}"
+
+
+def read_excel(content: bytes, skiprows: int = 0, skipfooter: int = 0, usecols=None, nrows: int = None,
+               engine: str = None) -> pd.DataFrame:
+    """
+    pd.read_excel of the first sheet with the fastest available engine
+    :param content: xlsx file content
+    :param usecols: passed on to pd.read_excel, eg: range(16) or 'A:P'
+    :param nrows: passed on to pd.read_excel
+    :param engine: 'calamine' or 'openpyxl', default excel_engine()
+    """
+    return pd.read_excel(BytesIO(content), skiprows=skiprows, skipfooter=skipfooter, usecols=usecols, nrows=nrows,
+                         engine=engine or excel_engine())
+
+
+def parse_report(content: bytes, name: str, engine: str = None) -> pd.DataFrame:
+    """
+    parse a monthly report workbook following its REPORT_LAYOUTS entry
+    :param content: xlsx file content
+    :param name: REPORT_LAYOUTS key, eg: 'category_wise_oi'
+    :param engine: see read_excel
+    :return: panda dataframe
+    """
+    layout = REPORT_LAYOUTS[name]
+    data_df = read_excel(content, skiprows=layout.get('skiprows', 0), skipfooter=layout.get('skipfooter', 0),
+                         usecols=layout.get('usecols'), nrows=layout.get('nrows'), engine=engine)
+    columns = layout.get('columns')
+    if columns:
+        if len(data_df.columns) != len(columns):
+            raise ValueError(f" {name} report has {len(data_df.columns)} columns, expected {len(columns)} : "
+                             f"{list(data_df.columns)}")
+        data_df.columns = columns
+    if layout.get('rename'):
+        data_df = data_df.rename(columns=layout['rename'])
+    if layout.get('dropna'):
+        data_df = data_df.dropna().reset_index(drop=True)
+    return data_df
@@ -0,0 +1,34 @@
+"""
+deferred imports for the heavy dependencies
+
+pandas and numpy take most of the time of a cold `import mcxlib`. the core modules bind them through
+lazy_module() instead, so they are imported on first attribute access (eg: the first pd.DataFrame built by a
+fetcher) rather than when mcxlib is imported, and calls which never build a frame never import them
+"""
+import importlib
+import sys
+import types
+
+
+class LazyModule(types.ModuleType):
+    """
+    stand-in for a module which imports it on first attribute access and then serves its attributes directly
+    """
+
+    def __getattr__(self, attribute):
+        # only called for missing attributes: after the first import the module namespace is copied in
+        module = importlib.import_module(self.__name__)
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attribute)
+
+    def __repr__(self):
+        return f"<lazy module {self.__name__!r}>"
+
+
+def lazy_module(name: str) -> types.ModuleType:
+    """
+    :param name: module to import on first use, eg: 'pandas'
+    :return: the module itself when it is already imported, else a LazyModule
+    """
+    module = sys.modules.get(name)
+    return module if module is not None else LazyModule(name)
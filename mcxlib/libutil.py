@@ -1,6 +1,30 @@
-from datetime import datetime
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import json
+from operator import itemgetter
+import re
+import time
 import requests
+from requests.adapters import HTTPAdapter
+
+from mcxlib import metrics
+from mcxlib.lazy import lazy_module
+from mcxlib.ratelimit import backoff_delay, get_rate_limiter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+np = lazy_module('numpy')
+pd = lazy_module('pandas')
+
+MCX_TIMEZONE = timezone(timedelta(hours=5, minutes=30), "IST")
+_MCX_DATE_SERIES_PATTERN = r"^\s*/Date\((-?\d+)(?:[+-]\d+)?\)/\s*$"
 
 header = {
         'Accept': 'application/json, text/javascript, */*; q=0.01',
@@ -52,7 +76,7 @@ def get_headers(use_for:str = 'market-watch'):
     }
 
 
-def validate_date_param(start_date:str, end_date:str):
+def validate_date_param(start_date:str, end_date:str, max_days: int = 365):
     if not start_date or not end_date:
         raise ValueError(' Please provide the valid parameters')
     try:
@@ -61,13 +85,61 @@ def validate_date_param(start_date:str, end_date:str):
         time_delta = (end_date - start_date).days
         if time_delta < 1:
             raise ValueError(f'end_date should greater than start_date ')
-        elif time_delta > 365:
-            raise ValueError(f'Date range cannot be greater than 365 days')
+        elif max_days is not None and time_delta > max_days:
+            raise ValueError(f'Date range cannot be greater than {max_days} days')
     except Exception as e:
         print(e)
         raise ValueError(f'either or both start_date = {start_date} || end_date = {end_date} are not valid value')
 
 
+def split_date_range(start_date: str, end_date: str, max_days: int = 365) -> list:
+    """
+    split a YYYYMMDD date range into consecutive, non overlapping windows which each pass validate_date_param
+    a window is ended a day early when only one day would be left for the next one. a range of a single day
+    (or max_days=1 leaving one day) still gets its last window widened backwards by one day to stay valid
+    :param max_days: longest window, at least 1
+    :return: list of (start_date, end_date) tuples in YYYYMMDD format
+    """
+    if max_days < 1:
+        raise ValueError(f" max_days should be at least 1 : {max_days}")
+    start = datetime.strptime(start_date, '%Y%m%d')
+    end = datetime.strptime(end_date, '%Y%m%d')
+    windows = []
+    while start <= end:
+        window_end = min(start + timedelta(days=max_days), end)
+        if (end - window_end).days == 1 and (window_end - start).days >= 2:
+            window_end -= timedelta(days=1)
+        window_start = min(start, window_end - timedelta(days=1))
+        windows.append((window_start.strftime('%Y%m%d'), window_end.strftime('%Y%m%d')))
+        start = window_end + timedelta(days=1)
+    return windows
+
+
+def fetch_many(func, params: list, workers: int = 8):
+    """
+    call func(**kwargs) for every kwargs in params on a bounded thread pool
+    :param func: any mcxlib fetcher
+    :param params: list of keyword argument dicts
+    :param workers: maximum number of calls in flight
+    :return: generator of (kwargs, result, error) tuples in completion order, error is None on success
+    """
+    if workers < 1:
+        raise ValueError(' workers should be at least 1')
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='mcxlib')
+    futures = {pool.submit(func, **kwargs): kwargs for kwargs in params}
+    try:
+        for future in as_completed(futures):
+            kwargs = futures[future]
+            try:
+                yield kwargs, future.result(), None
+            except Exception as e:
+                yield kwargs, None, e
+    finally:
+        for future in futures:
+            future.cancel()
+        pool.shutdown(wait=False)
+
+
 def get_mcxlib_path():
     """
     Extract isap file path
@@ -76,24 +148,393 @@ def get_mcxlib_path():
     return mydir.split(r'\mcxlib', 1)[0]
 
 
-def post_json(url: str, headers: dict, payload, timeout: int = 30):
-    session = requests.Session()
-    session.trust_env = False
-    response = session.post(url, headers=headers, data=payload, timeout=timeout)
+MCX_BASE_URL = 'https://www.mcxindia.com'
+
+
+class MCXClient:
+    """
+    thread safe HTTP client which keeps a pooled keep-alive session for all MCX requests
+    every request first takes a token from the per host rate limiter (see mcxlib.ratelimit)
+    :param pool_connections: number of host pools to cache
+    :param pool_maxsize: maximum number of connections kept alive per host
+    :param max_retries: retries on connection errors, timeouts and 429/5xx responses
+    :param backoff_factor: exponential backoff factor between retries (in seconds), jittered
+    :param timeout: default request timeout (in seconds)
+    :param backoff_max: longest wait between two retries (in seconds)
+    :param base_url: send requests for https://www.mcxindia.com to this address instead, eg: a local replay
+                     server (default: the MCXLIB_BASE_URL environment variable)
+    """
+    retry_status = (429, 500, 502, 503, 504)
+
+    def __init__(self, pool_connections: int = 4, pool_maxsize: int = 16, max_retries: int = 2,
+                 backoff_factor: float = 0.3, timeout: int = 30, backoff_max: float = 10.0, base_url: str = None):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+        self.backoff_max = backoff_max
+        self.base_url = (base_url or os.environ.get('MCXLIB_BASE_URL') or '').rstrip('/') or None
+        self._session = None
+        self._lock = threading.Lock()
+
+    def _new_adapter(self) -> HTTPAdapter:
+        # retries are done in request() so they go through the rate limiter
+        return HTTPAdapter(pool_connections=self.pool_connections,
+                           pool_maxsize=self.pool_maxsize,
+                           max_retries=0,
+                           pool_block=False)
+
+    def _new_session(self) -> requests.Session:
+        adapter = self._new_adapter()
+        session = requests.Session()
+        session.trust_env = False
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def resize_pool(self, pool_maxsize: int):
+        """
+        change the number of connections kept alive per host, keeping the client and its settings
+        requests already in flight finish on the previous pool, whose connections are closed as they are released
+        :param pool_maxsize: maximum number of connections kept alive per host
+        """
+        with self._lock:
+            self.pool_maxsize = pool_maxsize
+            if self._session is None:
+                return
+            previous = {self._session.get_adapter('https://'), self._session.get_adapter('http://')}
+            adapter = self._new_adapter()
+            self._session.mount('https://', adapter)
+            self._session.mount('http://', adapter)
+        # PoolManager.clear() only forgets its pools, close them too: a closed urllib3 pool shuts its idle sockets now
+        # and every busy one when its request returns it
+        for old_adapter in previous:
+            pools = old_adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is not None:
+                    pool.close()
+            old_adapter.close()
+
+    @property
+    def session(self) -> requests.Session:
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._new_session()
+        return self._session
+
+    def request(self, method: str, url: str, timeout: int = None, **kwargs) -> requests.Response:
+        """
+        send a request, retrying connection errors, timeouts and 429/5xx responses with jittered exponential backoff
+        :param timeout: seconds, default the client's timeout
+        :return: the final response (which may still be a 429/5xx once retries run out)
+        """
+        if self.base_url is not None and url.startswith(MCX_BASE_URL):
+            url = self.base_url + url[len(MCX_BASE_URL):]
+        timeout = self.timeout if timeout is None else timeout
+        attempt = 0
+        while True:
+            limiter = get_rate_limiter(url)
+            if limiter is not None:
+                limiter.acquire()
+            retry_after = None
+            try:
+                if metrics.is_enabled():
+                    response = self._timed_request(metrics.RequestTimer(method, url, attempt),
+                                                   method, url, timeout=timeout, **kwargs)
+                else:
+                    response = self.session.request(method, url, timeout=timeout, **kwargs)
+            except (requests.Timeout, requests.ConnectionError) as exc:
+                if limiter is not None:
+                    limiter.record_failure('timeouts' if isinstance(exc, requests.Timeout) else 'connection_errors')
+                if attempt >= self.max_retries:
+                    raise
+            else:
+                if response.status_code not in self.retry_status:
+                    if limiter is not None:
+                        limiter.record_success()
+                    return response
+                retry_after = _retry_after(response)
+                if limiter is not None:
+                    limiter.record_failure('throttled' if response.status_code == 429 else 'server_errors',
+                                           retry_after=retry_after)
+                if attempt >= self.max_retries:
+                    return response
+                response.close()
+            time.sleep(max(retry_after or 0, backoff_delay(attempt, self.backoff_factor, self.backoff_max)))
+            attempt += 1
+
+    def _timed_request(self, timer, method: str, url: str, **kwargs) -> requests.Response:
+        # stream the body so time to first byte and download time can be told apart
+        session = self.session
+        metrics.instrument_session(session)
+        try:
+            response = session.request(method, url, stream=True, **kwargs)
+            timer.headers_received()
+            size = len(response.content)
+        except Exception as exc:
+            timer.finish(error=exc)
+            raise
+        timer.finish(status=response.status_code, size=size)
+        return response
+
+    def post(self, url: str, headers: dict = None, data=None, timeout: int = None) -> requests.Response:
+        return self.request('POST', url, headers=headers, data=data, timeout=timeout)
+
+    def get(self, url: str, headers: dict = None, timeout: int = None) -> requests.Response:
+        return self.request('GET', url, headers=headers, timeout=timeout)
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _retry_after(response) -> float:
+    try:
+        return min(float(response.headers.get('Retry-After')), 60.0)
+    except (TypeError, ValueError):
+        return None
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> MCXClient:
+    """
+    get the shared MCX client, created on first use
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = MCXClient()
+    return _client
+
+
+def set_client(client: MCXClient):
+    """
+    replace the shared MCX client used by all fetchers
+    """
+    global _client
+    with _client_lock:
+        previous, _client = _client, client
+    if previous is not None and previous is not client:
+        previous.close()
+
+
+def configure_client(**kwargs) -> MCXClient:
+    """
+    rebuild the shared MCX client with new pool / retry settings
+    :param kwargs: any of the MCXClient parameters
+    :return: the new shared client
+    """
+    client = MCXClient(**kwargs)
+    set_client(client)
+    return client
+
+
+def _response_excerpt(response) -> str:
+    excerpt = " ".join(response.text.split())
+    if len(excerpt) > 220:
+        excerpt = excerpt[:220]
+    return excerpt
+
+
+def post_json(url: str, headers: dict, payload, timeout: int = None):
+    response = get_client().post(url, headers=headers, data=payload, timeout=timeout)
     if not response.ok:
-        excerpt = " ".join(response.text.split())
-        if len(excerpt) > 220:
-            excerpt = excerpt[:220]
-        raise MCXdataNotFound(f"HTTP {response.status_code} for {url}: {excerpt}")
+        raise MCXdataNotFound(f"HTTP {response.status_code} for {url}: {_response_excerpt(response)}")
     try:
-        return response.json()
+        if not metrics.is_enabled():
+            return decode_json(response.content)
+        start = time.perf_counter()
+        data = decode_json(response.content)
+        metrics.observe('decode', time.perf_counter() - start, metrics.endpoint_name(url))
+        return data
     except ValueError as exc:
-        excerpt = " ".join(response.text.split())
-        if len(excerpt) > 220:
-            excerpt = excerpt[:220]
-        raise MCXdataNotFound(f"Invalid JSON from {url}: {excerpt}") from exc
+        raise MCXdataNotFound(f"Invalid JSON from {url}: {_response_excerpt(response)}") from exc
+
+
+def decode_json(content: bytes):
+    """
+    decode a JSON response body, using orjson when it is installed
+    """
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _typed_column(values: list):
+    # numeric columns go straight into int64 / float64 arrays and text columns into object arrays,
+    # anything else (eg: a leading None) is left for pandas to infer like DataFrame.from_dict does
+    first_type = type(values[0]) if values else None
+    if first_type in (int, float):
+        array = np.array(values)
+        if array.dtype.kind in 'if':
+            return array
+    elif first_type is str:
+        return np.array(values, dtype=object)
+    return values
+
+
+def _record_columns(records: list, drop: list, errors: str) -> dict:
+    # typed columns of the payload rows, shared by records_to_frame and records_to_output
+    all_keys = list(records[0]) if records else []
+    columns = None
+    if all(len(record) == len(all_keys) for record in records):
+        try:
+            columns = {key: _typed_column(list(map(itemgetter(key), records)))
+                       for key in all_keys if key not in drop}
+        except KeyError:
+            columns = None
+    if columns is None:
+        # rows do not share one layout, take the union of keys in order of appearance like pandas
+        all_keys = list(dict.fromkeys(key for record in records for key in record))
+        columns = {key: _typed_column([record.get(key) for record in records])
+                   for key in all_keys if key not in drop}
+
+    missing = [key for key in drop if key not in all_keys]
+    if missing and errors == 'raise':
+        raise KeyError(f"{missing} not found in axis")
+    return columns
+
+
+def records_to_frame(records: list, drop=(), errors: str = 'raise', url: str = None) -> pd.DataFrame:
+    """
+    build a panda dataframe column by column from the row dicts of a MCX payload,
+    without ever materialising the dropped columns
+    :param records: list of row dicts, eg: data_dict['d']['Data']
+    :param drop: column names to leave out
+    :param errors: 'raise' to fail like DataFrame.drop when a dropped column is missing, or 'ignore'
+    :param url: url the records were downloaded from, the build time is recorded for its endpoint when metrics are on
+    :return: panda dataframe
+    """
+    start = time.perf_counter() if url is not None and metrics.is_enabled() else None
+    drop = [drop] if isinstance(drop, str) else list(drop)
+    frame = pd.DataFrame(_record_columns(records, drop, errors))
+    if start is not None:
+        metrics.observe('frame_build', time.perf_counter() - start, metrics.endpoint_name(url))
+    return frame
+
+
+OUTPUT_FORMATS = ('pandas', 'records', 'numpy', 'arrow')
+
+
+def validate_output(output: str):
+    if output not in OUTPUT_FORMATS:
+        raise ValueError(f" output should be one of {list(OUTPUT_FORMATS)} : got {output!r}")
 
 
+def _require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("pyarrow is required for output='arrow' : pip install mcxlib[parquet]") from None
+    return pyarrow
+
+
+def _arrow_column(pa, values):
+    try:
+        return pa.array(values, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # a column mixing types (eg: numbers and text) is kept as text
+        return pa.array([None if value is None else str(value) for value in values], type=pa.string())
+
+
+def records_to_output(records: list, output: str = 'records', drop=(), errors: str = 'raise', url: str = None):
+    """
+    the rows of a MCX payload in a non pandas output format, straight from the decoded JSON without building a
+    DataFrame. values are returned as MCX sends them, the dtype schemas only apply to the pandas output
+    :param records: list of row dicts, eg: data_dict['d']['Data']
+    :param output: 'records' (list of dicts), 'numpy' (structured array) or 'arrow' (pyarrow Table)
+    :param drop: column names to leave out
+    :param errors: 'raise' to fail when a dropped column is missing, or 'ignore'
+    :param url: see records_to_frame
+    :return: list of dicts, numpy structured array or pyarrow Table
+    """
+    validate_output(output)
+    if output == 'pandas':
+        return records_to_frame(records, drop=drop, errors=errors, url=url)
+    start = time.perf_counter() if url is not None and metrics.is_enabled() else None
+    drop = [drop] if isinstance(drop, str) else list(drop)
+    if output == 'records':
+        if records and errors == 'raise':
+            missing = [key for key in drop if not any(key in record for record in records)]
+            if missing:
+                raise KeyError(f"{missing} not found in axis")
+        drop = set(drop)
+        result = [{key: value for key, value in record.items() if key not in drop} for record in records]
+    else:
+        columns = _record_columns(records, drop, errors if records else 'ignore')
+        if output == 'numpy':
+            columns = {key: values if isinstance(values, np.ndarray) else np.array(values, dtype=object)
+                       for key, values in columns.items()}
+            result = np.empty(len(records), dtype=[(key, values.dtype) for key, values in columns.items()])
+            for key, values in columns.items():
+                result[key] = values
+        else:
+            pa = _require_pyarrow()
+            result = pa.table({key: _arrow_column(pa, values) for key, values in columns.items()})
+    if start is not None:
+        metrics.observe('frame_build', time.perf_counter() - start, metrics.endpoint_name(url))
+    return result
+
+
+def frame_to_output(data_df: pd.DataFrame, output: str = 'pandas'):
+    """
+    convert a fetcher result to the requested output format, for fetchers which need pandas to build it
+    (excel reports, filtered or concatenated frames)
+    :param output: 'pandas', 'records', 'numpy' or 'arrow'
+    """
+    validate_output(output)
+    if output == 'records':
+        return data_df.to_dict('records')
+    if output == 'numpy':
+        return data_df.to_records(index=False).view(np.ndarray)
+    if output == 'arrow':
+        return _require_pyarrow().Table.from_pandas(data_df, preserve_index=False)
+    return data_df
+
+
+def parse_mcx_datetime_series(values, errors: str = 'coerce') -> pd.Series:
+    """
+    convert a whole column of MCX '/Date(ms+offset)/' strings to tz-aware IST datetime64 in one pass
+    :param values: panda series or list of MCX date strings
+    :param errors: 'coerce' turns empty / invalid values into NaT, 'raise' raises ValueError on
+                   any non empty value which is not a MCX date
+    :return: panda series of datetime64[ms, IST]
+    """
+    values = values if isinstance(values, pd.Series) else pd.Series(values, dtype=object)
+    text = values.astype('str')
+    matched = text.str.match(_MCX_DATE_SERIES_PATTERN).fillna(False).astype(bool)
+    if errors == 'raise':
+        invalid = ~matched & values.notna() & (text.str.strip() != '')
+        if invalid.any():
+            raise ValueError(f"Invalid MCX datetime value: {values[invalid].iloc[0]}")
+    millis = text.where(matched).str.replace(_MCX_DATE_SERIES_PATTERN, r'\1', regex=True).astype('float64')
+    return pd.to_datetime(millis, unit='ms', utc=True).dt.tz_convert(MCX_TIMEZONE)
+
+
+def get_content(url: str, headers: dict = None, timeout: int = None) -> bytes:
+    """
+    download a file (eg: the monthly excel reports) through the shared MCX client
+    """
+    response = get_client().get(url, headers=headers, timeout=timeout)
+    if not response.ok:
+        raise MCXdataNotFound(f"HTTP {response.status_code} for {url}: {_response_excerpt(response)}")
+    return response.content
+
 
 # if __name__ == '__main__':
 #     # data = derive_from_and_to_date('6M')
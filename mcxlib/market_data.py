@@ -1,13 +1,28 @@
-import pandas as pd
+from __future__ import annotations
+
 from mcxlib.libutil import *
+from mcxlib import metrics
+from mcxlib.lazy import lazy_module
+from mcxlib.excel import layout_key, parse_report
+from mcxlib.cache import disk_cached, get_report_store, is_past_date, is_past_month, memory_cached
+from mcxlib.schema import apply_schema
+from mcxlib.trading_calendar import get_trading_calendar
 import json
 import calendar
+from functools import partial
+import logging
 import re
-from datetime import datetime, timedelta, timezone
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+import os
 
+np = lazy_module('numpy')
+pd = lazy_module('pandas')
 
-MCX_TIMEZONE = timezone(timedelta(hours=5, minutes=30), "IST")
 _MCX_DATE_PATTERN = re.compile(r"/Date\((-?\d+)(?:[+-]\d+)?\)/")
+logger = logging.getLogger(__name__)
 
 
 def _parse_mcx_datetime(value: str) -> datetime:
@@ -18,196 +33,402 @@ def _parse_mcx_datetime(value: str) -> datetime:
     return datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc).astimezone(MCX_TIMEZONE)
 
 
-def get_recent_expires(commodity:str = 'ALL') -> pd.DataFrame:
+@memory_cached('recent_expires')
+def get_recent_expires(commodity:str = 'ALL', output: str = 'pandas') -> pd.DataFrame:
     """
     get recent expiry for commodity
     :param commodity: any of the list ['ALL', 'CRUDEOIL', 'COPPER', 'GOLD', 'GOLDM', 'NATURALGAS', 'SILVER', 'SILVERM', 'ZINC']
+    :param output: 'pandas' (default), 'records', 'numpy' or 'arrow', see OUTPUT_FORMATS
     :return: panda dataframe
     """
+    validate_output(output)
     url = "https://www.mcxindia.com/backpage.aspx/GetExpirywisePutCallRatio"
     payload = {}
     headers = get_headers(use_for='put-call-ratio')
     try:
         data_dict = post_json(url, headers=headers, payload=payload)
-        data_df = pd.DataFrame.from_dict(data_dict['d']['Data'])
-        data_df.drop(columns=['ExtensionData', 'Date', 'Ratio'], inplace=True)
+        if output != 'pandas':
+            records = [record for record in data_dict['d']['Data']
+                       if commodity == 'ALL' or record.get('Symbol') == commodity]
+            if not records:
+                raise MCXdataNotFound("Apply a valid commodity name")
+            return records_to_output(records, output, drop=['ExtensionData', 'Date', 'Ratio'], url=url)
+        data_df = records_to_frame(data_dict['d']['Data'], drop=['ExtensionData', 'Date', 'Ratio'], url=url)
     except Exception as e:
         raise ValueError(f" data not found / Invalid request  : MCX error:{e}")
     if not commodity == 'ALL':
         data_df = data_df[data_df['Symbol'] == commodity]
     if data_df.empty:
         raise ValueError("Apply a valid commodity name")
-    return data_df
+    return apply_schema(data_df, 'recent_expires')
+
+
+_MARKET_WATCH_URL = "https://www.mcxindia.com/backpage.aspx/GetMarketWatch"
+
+
+@memory_cached('market_watch')
+def _get_market_watch_records() -> list:
+    headers = get_headers(use_for='market-watch')
+    data_dict = post_json(_MARKET_WATCH_URL, headers=headers, payload={})
+    return data_dict['d']['Data']
+
+
+class MarketWatchSnapshot:
+    """
+    one download of the MCX market watch shared by get_market_watch, get_available_contracts
+    and get_mcx_datetime, refreshed at most once every ttl seconds
+    :param ttl: seconds before the snapshot is fetched again, default None keeps the first download until refresh()
+    """
+
+    def __init__(self, ttl: float = None):
+        self.ttl = ttl
+        self.fetched_at = None
+        self._records = None
+        self._data_df = None
+        self._indexes = None
+        self._lock = threading.RLock()
+
+    def _is_stale(self) -> bool:
+        if self.fetched_at is None:
+            return True
+        return self.ttl is not None and time.monotonic() - self.fetched_at >= self.ttl
+
+    def refresh(self):
+        """
+        download the market watch once, the dataframe is built from it on first use
+        """
+        with self._lock:
+            self._records = _get_market_watch_records()
+            self._data_df = None
+            self.fetched_at = time.monotonic()
+
+    def _load(self) -> list:
+        with self._lock:
+            if self._is_stale():
+                self.refresh()
+            return self._records
+
+    @property
+    def records(self) -> list:
+        """
+        payload rows of the snapshot as MCX sent them, without building the dataframe
+        """
+        return self._load()
+
+    @property
+    def data_df(self) -> pd.DataFrame:
+        with self._lock:
+            records = self._load()
+            if self._data_df is None:
+                data_df = records_to_frame(records, drop=['__type'], errors='ignore', url=_MARKET_WATCH_URL)
+                self._data_df = apply_schema(data_df, 'market_watch')
+            return self._data_df
+
+    def market_watch(self) -> pd.DataFrame:
+        return self.data_df.copy()
+
+    def contract_indexes(self) -> tuple:
+        """
+        (commodity, instrument) ContractIndex of the current payload, built on first use
+        """
+        with self._lock:
+            data_df = self.data_df
+            if self._indexes is None or self._indexes[0] is not data_df:
+                self._indexes = (data_df, _contract_indexes(data_df))
+            return self._indexes
+
+    def available_contracts(self, commodity: str = 'ALL', instrument: str = 'ALL') -> pd.DataFrame:
+        data_df, indexes = self.contract_indexes()
+        return _select_contracts(data_df, commodity, instrument, indexes=indexes)
+
+    def mcx_datetime(self) -> datetime:
+        """
+        latest LTT of the snapshot, None when no row carries a LTT
+        """
+        data_df = self.data_df
+        if 'LTT' not in data_df.columns:
+            return None
+        timestamps = data_df['LTT']
+        if not pd.api.types.is_datetime64_any_dtype(timestamps):
+            timestamps = parse_mcx_datetime_series(timestamps, errors='raise')
+        latest = timestamps.max()
+        return None if pd.isna(latest) else latest.to_pydatetime()
+
+
+_COMMODITY_COLUMNS = [
+    'Symbol',
+    'Commodity',
+    'CommodityName',
+    'Product',
+    'ProductName',
+    'ContractName',
+    'InstrumentIdentifier',
+    'Instrument_Identifier',
+]
+_INSTRUMENT_COLUMNS = [
+    'InstrumentName',
+    'Instrument',
+    'InstrumentType',
+    'Instrument_Type',
+]
+
+
+def _no_rows():
+    return np.array([], dtype=np.intp)
+
+
+class ContractIndex:
+    """
+    hash index from the normalised values of some market watch columns to row positions, built once per
+    payload. substring lookups (the fuzzy fallback) scan the unique keys only and are memoised per query
+    :param data_df: market watch panda dataframe, or its payload rows (list of dicts)
+    :param column_names: columns to index, missing ones are ignored
+    """
+
+    def __init__(self, data_df, column_names):
+        if isinstance(data_df, list):
+            self.columns = [column for column in column_names if any(column in record for record in data_df)]
+            groups = self._record_groups(data_df)
+        else:
+            self.columns = [column for column in column_names if column in data_df.columns]
+            groups = self._frame_groups(data_df)
+        positions = {}
+        for key, rows in groups:
+            positions[key] = np.union1d(positions[key], rows) if key in positions else rows
+        self._positions = positions
+        self._keys = [key for key in positions if key]
+        self._contains = {}
+
+    def _frame_groups(self, data_df: pd.DataFrame):
+        for column in self.columns:
+            normalised = data_df[column].astype(object).fillna('').astype(str).str.strip().str.upper()
+            yield from normalised.groupby(normalised, sort=False).indices.items()
+
+    def _record_groups(self, records: list):
+        for column in self.columns:
+            groups = {}
+            for row, record in enumerate(records):
+                value = record.get(column)
+                key = '' if value is None or value != value else str(value).strip().upper()
+                groups.setdefault(key, []).append(row)
+            for key, rows in groups.items():
+                yield key, np.array(rows, dtype=np.intp)
+
+    def exact(self, value: str) -> np.ndarray:
+        return self._positions.get(value, _no_rows())
+
+    def contains(self, value: str) -> np.ndarray:
+        rows = self._contains.get(value)
+        if rows is None:
+            matches = [self._positions[key] for key in self._keys if value in key]
+            rows = np.unique(np.concatenate(matches)) if matches else _no_rows()
+            self._contains[value] = rows
+        return rows
+
+    def filter(self, filter_value: str, within: np.ndarray = None):
+        """
+        row positions matching filter_value exactly in any indexed column, or as a substring when
+        nothing matches exactly
+        :param within: optional sorted row positions to restrict the result to
+        :return: sorted row positions, or within unchanged for 'ALL'
+        """
+        value = str(filter_value).strip().upper()
+        if value == 'ALL':
+            return within
+        if not value:
+            raise ValueError("Apply a valid filter value")
+        if not self.columns:
+            raise ValueError(f" No matching columns found to filter {filter_value}")
+
+        rows = self.exact(value)
+        if within is not None:
+            rows = np.intersect1d(rows, within, assume_unique=True)
+        if rows.size == 0:
+            rows = self.contains(value)
+            if within is not None:
+                rows = np.intersect1d(rows, within, assume_unique=True)
+        return rows
+
+
+def _contract_indexes(data) -> tuple:
+    return ContractIndex(data, _COMMODITY_COLUMNS), ContractIndex(data, _INSTRUMENT_COLUMNS)
+
+
+def _select_contract_rows(indexes: tuple, commodity: str, instrument: str):
+    commodity_index, instrument_index = indexes
+    rows = commodity_index.filter(commodity)
+    if rows is not None and rows.size == 0:
+        raise ValueError("Apply a valid commodity name")
+
+    rows = instrument_index.filter(instrument, within=rows)
+    if rows is not None and rows.size == 0:
+        raise ValueError("Apply a valid instrument name")
+    return rows
+
 
+def _select_contracts(data_df: pd.DataFrame, commodity: str, instrument: str, indexes: tuple = None) -> pd.DataFrame:
+    rows = _select_contract_rows(indexes or _contract_indexes(data_df), commodity, instrument)
+    if rows is None:
+        return data_df.reset_index(drop=True)
+    return data_df.iloc[rows].reset_index(drop=True)
 
-def get_market_watch() -> pd.DataFrame:
+
+def get_market_watch(snapshot: MarketWatchSnapshot = None, output: str = 'pandas') -> pd.DataFrame:
     """
     get live market watch on MCX
+    :param snapshot: optional MarketWatchSnapshot to share one download with other market watch calls
+    :param output: 'pandas' (default), 'records', 'numpy' or 'arrow', see OUTPUT_FORMATS
     :return: panda dataframe
     """
-    url = "https://www.mcxindia.com/backpage.aspx/GetMarketWatch"
-    payload = {}
-    headers = get_headers(use_for='market-watch')
+    validate_output(output)
     try:
-        data_dict = post_json(url, headers=headers, payload=payload)
-        data_df = pd.DataFrame.from_dict(data_dict['d']['Data'])
-        data_df.drop(columns=['__type', 'LTT'], inplace=True)
+        if output != 'pandas':
+            records = snapshot.records if snapshot is not None else _get_market_watch_records()
+            return records_to_output(records, output, drop=['__type'], errors='ignore', url=_MARKET_WATCH_URL)
+        data_df = (snapshot or MarketWatchSnapshot()).market_watch()
     except Exception as e:
         raise ValueError(f" No Data Found : MCX error:{e}")
     return data_df
 
 
-def _filter_contract_rows(data_df: pd.DataFrame, filter_value: str, column_names) -> pd.DataFrame:
-    value = str(filter_value).strip().upper()
-    if value == 'ALL':
-        return data_df
-    if not value:
-        raise ValueError("Apply a valid filter value")
-
-    available_columns = [column for column in column_names if column in data_df.columns]
-    if not available_columns:
-        raise ValueError(f" No matching columns found to filter {filter_value}")
-
-    exact_mask = pd.Series(False, index=data_df.index)
-    contains_mask = pd.Series(False, index=data_df.index)
-    for column in available_columns:
-        column_data = data_df[column].fillna('').astype(str).str.strip().str.upper()
-        exact_mask = exact_mask | (column_data == value)
-        contains_mask = contains_mask | column_data.str.contains(value, regex=False)
-
-    filtered_df = data_df[exact_mask].copy()
-    if filtered_df.empty:
-        filtered_df = data_df[contains_mask].copy()
-    return filtered_df
-
-
 def get_available_contracts(commodity:str = 'ALL',
-                            instrument:str = 'ALL') -> pd.DataFrame:
+                            instrument:str = 'ALL',
+                            snapshot: MarketWatchSnapshot = None,
+                            output: str = 'pandas') -> pd.DataFrame:
     """
     get available contracts with live market details from MCX
     :param commodity: commodity name/symbol such as 'LEADMINI', 'CRUDEOIL', 'GOLD' or 'ALL'
     :param instrument: instrument type such as 'FUTCOM', 'FUTIDX', 'OPTCOM', 'OPTFUT' or 'ALL'
+    :param snapshot: optional MarketWatchSnapshot to share one download with other market watch calls
+    :param output: 'pandas' (default), 'records', 'numpy' or 'arrow', see OUTPUT_FORMATS
     :return: panda dataframe
     """
-    url = "https://www.mcxindia.com/backpage.aspx/GetMarketWatch"
-    payload = {}
-    headers = get_headers(use_for='market-watch')
+    validate_output(output)
+    if output != 'pandas':
+        # filter the payload rows with the same indexes, built over the records instead of a dataframe
+        try:
+            records = snapshot.records if snapshot is not None else _get_market_watch_records()
+        except Exception as e:
+            raise ValueError(f" No contracts data found / Invalid request : MCX error:{e}")
+        rows = _select_contract_rows(_contract_indexes(records), commodity, instrument)
+        if rows is not None:
+            records = [records[row] for row in rows]
+        return records_to_output(records, output, drop=['__type'], errors='ignore', url=_MARKET_WATCH_URL)
+    snapshot = snapshot or MarketWatchSnapshot()
     try:
-        data_dict = post_json(url, headers=headers, payload=payload)
-        data_df = pd.DataFrame.from_dict(data_dict['d']['Data'])
-        data_df.drop(columns=['__type'], inplace=True, errors='ignore')
+        data_df, indexes = snapshot.contract_indexes()
     except Exception as e:
         raise ValueError(f" No contracts data found / Invalid request : MCX error:{e}")
+    return _select_contracts(data_df, commodity, instrument, indexes=indexes)
 
-    commodity_columns = [
-        'Symbol',
-        'Commodity',
-        'CommodityName',
-        'Product',
-        'ProductName',
-        'ContractName',
-        'InstrumentIdentifier',
-        'Instrument_Identifier',
-    ]
-    instrument_columns = [
-        'InstrumentName',
-        'Instrument',
-        'InstrumentType',
-        'Instrument_Type',
-    ]
-
-    data_df = _filter_contract_rows(data_df, commodity, commodity_columns)
-    if data_df.empty:
-        raise ValueError("Apply a valid commodity name")
-
-    data_df = _filter_contract_rows(data_df, instrument, instrument_columns)
-    if data_df.empty:
-        raise ValueError("Apply a valid instrument name")
 
-    data_df.reset_index(inplace=True)
-    data_df.drop(columns='index', inplace=True)
-    return data_df
+def _latest_ltt(records: list) -> datetime:
+    """
+    latest LTT of the market watch rows, None when no row carries a LTT
+    """
+    latest = None
+    for record in records:
+        value = record.get('LTT')
+        if value is None or value != value or not str(value).strip():
+            continue
+        match = _MCX_DATE_PATTERN.fullmatch(str(value).strip())
+        if not match:
+            raise ValueError(f"Invalid MCX datetime value: {value}")
+        timestamp_ms = int(match.group(1))
+        latest = timestamp_ms if latest is None else max(latest, timestamp_ms)
+    if latest is None:
+        return None
+    return datetime.fromtimestamp(latest / 1000, tz=timezone.utc).astimezone(MCX_TIMEZONE)
 
 
-def get_mcx_datetime() -> datetime:
+def get_mcx_datetime(snapshot: MarketWatchSnapshot = None) -> datetime:
     """
     get latest MCX market date and time
+    :param snapshot: optional MarketWatchSnapshot to share one download with other market watch calls
     :return: timezone-aware datetime object in IST
     """
-    url = "https://www.mcxindia.com/backpage.aspx/GetMarketWatch"
-    payload = {}
-    headers = get_headers(use_for='market-watch')
     try:
-        data_dict = post_json(url, headers=headers, payload=payload)
-        timestamps = [
-            _parse_mcx_datetime(item['LTT'])
-            for item in data_dict['d']['Data']
-            if item.get('LTT')
-        ]
+        # without a snapshot read the LTTs straight from the payload, no dataframe (or pandas) needed
+        mcx_datetime = snapshot.mcx_datetime() if snapshot is not None else _latest_ltt(_get_market_watch_records())
     except Exception as e:
         raise ValueError(f" No MCX date time found : MCX error:{e}")
-    if not timestamps:
+    if mcx_datetime is None:
         raise ValueError(" No MCX date time found")
-    return max(timestamps)
+    return mcx_datetime
 
 
-def get_heat_map() -> pd.DataFrame:
+@memory_cached('heat_map')
+def get_heat_map(output: str = 'pandas') -> pd.DataFrame:
     """
     get live market heat map on MCX
+    :param output: 'pandas' (default), 'records', 'numpy' or 'arrow', see OUTPUT_FORMATS
     :return: panda dataframe
     """
+    validate_output(output)
     url = "https://www.mcxindia.com/backpage.aspx/GetHeatMap"
     payload = {}
     headers = get_headers(use_for='heatmap')
     try:
         data_dict = post_json(url, headers=headers, payload=payload)
-        data_df = pd.DataFrame.from_dict(data_dict['d']['Data'])
-        data_df.drop(columns=['__type', 'Dttm'], inplace=True)
+        if output != 'pandas':
+            return records_to_output(data_dict['d']['Data'], output, drop=['__type'], url=url)
+        data_df = records_to_frame(data_dict['d']['Data'], drop=['__type'], url=url)
     except Exception as e:
         raise ValueError(f" No heatmap Data Found : MCX error:{e}")
-    return data_df
+    return apply_schema(data_df, 'heat_map')
 
 
-def get_top_gainers() -> pd.DataFrame:
+@memory_cached('top_gainers')
+def get_top_gainers(output: str = 'pandas') -> pd.DataFrame:
     """
     get live market top gainers on MCX
+    :param output: 'pandas' (default), 'records', 'numpy' or 'arrow', see OUTPUT_FORMATS
     :return: panda dataframe
     """
+    validate_output(output)
     url = "https://www.mcxindia.com/backpage.aspx/GetGainer"
     payload = {}
     headers = get_headers(use_for='top-gainers')
     try:
         data_dict = post_json(url, headers=headers, payload=payload)
-        data_df = pd.DataFrame.from_dict(data_dict['d']['Data'])
-        data_df.drop(columns=['ExtensionData', 'LTT'], inplace=True)
+        if output != 'pandas':
+            return records_to_output(data_dict['d']['Data'], output, drop=['ExtensionData'], url=url)
+        data_df = records_to_frame(data_dict['d']['Data'], drop=['ExtensionData'], url=url)
     except Exception as e:
         raise ValueError(f" No top-gainers Data Found / Invalid request  : MCX error:{e}")
-    return data_df
+    return apply_schema(data_df, 'top_gainers')
 
 
-def get_top_losers() -> pd.DataFrame:
+@memory_cached('top_losers')
+def get_top_losers(output: str = 'pandas') -> pd.DataFrame:
     """
     get live market top losers on MCX
+    :param output: 'pandas' (default), 'records', 'numpy' or 'arrow', see OUTPUT_FORMATS
     :return: panda dataframe
     """
+    validate_output(output)
     url = "https://www.mcxindia.com/backpage.aspx/GetLosers"
     payload = {}
     headers = get_headers(use_for='top-losers')
     try:
         data_dict = post_json(url, headers=headers, payload=payload)
-        data_df = pd.DataFrame.from_dict(data_dict['d']['Data'])
-        data_df.drop(columns=['ExtensionData', 'LTT'], inplace=True)
+        if output != 'pandas':
+            return records_to_output(data_dict['d']['Data'], output, drop=['ExtensionData'], url=url)
+        data_df = records_to_frame(data_dict['d']['Data'], drop=['ExtensionData'], url=url)
     except Exception as e:
         raise ValueError(f" No top-losers Data Found / Invalid request  : MCX error:{e}")
-    return data_df
+    return apply_schema(data_df, 'top_losers')
 
 
-def get_most_active_contracts(instrument:str = 'ALL') -> pd.DataFrame:
+@memory_cached('most_active_contracts')
+def get_most_active_contracts(instrument:str = 'ALL', output: str = 'pandas') -> pd.DataFrame:
     """
     get live market most active contract on MCX
     :param instrument: any value from the list ['ALL','FUTCOM','FUTIDX','OPTCOM','OPTFUT']
+    :param output: 'pandas' (default), 'records', 'numpy' or 'arrow', see OUTPUT_FORMATS
     :return: panda dataframe
     """
+    validate_output(output)
     headers = get_headers(use_for='most-active-contracts')
     url = "https://www.mcxindia.com/backpage.aspx/GetMostActiveContractByVolumeFilter"
     payload = json.dumps({
@@ -215,67 +436,133 @@ def get_most_active_contracts(instrument:str = 'ALL') -> pd.DataFrame:
                         })
     try:
         data_dict = post_json(url, headers=headers, payload=payload)
-        data_df = pd.DataFrame.from_dict(data_dict['d']['Data'])
-        data_df.drop(columns=['ExtensionData', 'Date', 'Unit'], inplace=True)
+        if output != 'pandas':
+            return records_to_output(data_dict['d']['Data'], output, drop=['ExtensionData', 'Date', 'Unit'], url=url)
+        data_df = records_to_frame(data_dict['d']['Data'], drop=['ExtensionData', 'Date', 'Unit'], url=url)
     except Exception as e:
         raise ValueError(f" No most-active-contracts Data Found / Invalid request : MCX error:{e}")
-    return data_df
+    return apply_schema(data_df, 'most_active_contracts')
 
 
+@memory_cached('most_active_puts_calls')
 def get_most_active_puts_calls(option_type:str = 'PE',
                                product:str = 'ALL',
-                               instrument:str = 'OPTFUT') -> pd.DataFrame:
+                               instrument:str = 'OPTFUT',
+                               output: str = 'pandas') -> pd.DataFrame:
     """
     get live market most active put/calls on MCX
     :param option_type: any value from the list ['PE','CE']
     :param product: any value from the list ['ALL','COPPER','CRUDEOIL','GOLD','GOLDM','NATURALGAS',
                                             'SILVER','SILVERM','ZINC']
     :param instrument: any value from the list ['OPTCOM','OPTIONS']
+    :param output: 'pandas' (default), 'records', 'numpy' or 'arrow', see OUTPUT_FORMATS
     :return: panda dataframe
     """
+    validate_output(output)
     headers = get_headers(use_for='most-active-puts-calls')
     url = "https://www.mcxindia.com/backpage.aspx/GetMostActiveOptionsContractsByVolume"
     payload_param = {'OptionType':f'{option_type}','Product':f'{product}','InstrumentType':f'{instrument}'}
     payload = f"{payload_param}"
     try:
         data_dict = post_json(url, headers=headers, payload=payload)
-        data_df = pd.DataFrame.from_dict(data_dict['d']['Data'])
-        data_df.drop(columns=['ExtensionData', 'LTT'], inplace=True)
+        if output != 'pandas':
+            return records_to_output(data_dict['d']['Data'], output, drop=['ExtensionData'], url=url)
+        data_df = records_to_frame(data_dict['d']['Data'], drop=['ExtensionData'], url=url)
     except Exception as e:
         raise ValueError(f" No Data Found / Invalid request : MCX error:{e}")
-    return data_df
+    return apply_schema(data_df, 'most_active_puts_calls')
 
 
+@disk_cached('bhav_copy', lambda params: is_past_date(params['trade_date']))
 def get_bhav_copy(trade_date:str = '20230102',
-                  instrument:str = 'ALL') -> pd.DataFrame:
+                  instrument:str = 'ALL',
+                  output: str = 'pandas') -> pd.DataFrame:
     """
     get bhav copy
     :param trade_date: in str format : YYYYMMDD
     :param instrument: any value from the list ['ALL','FUTCOM','FUTIDX','OPTCOM','OPTFUT']
+    :param output: 'pandas' (default), 'records', 'numpy' or 'arrow', see OUTPUT_FORMATS
     :return: panda dataframe
     """
+    validate_output(output)
     headers = get_headers(use_for='bhavcopy')
     url = "https://www.mcxindia.com/backpage.aspx/GetDateWiseBhavCopy"
     payload_param = {'Date': f'{trade_date}', 'InstrumentName': f'{instrument}'}
     payload = f"{payload_param}"
     try:
         data_dict = post_json(url, headers=headers, payload=payload)
-        data_df = pd.DataFrame.from_dict(data_dict['d']['Data'])
-        data_df.drop(columns='__type', inplace=True)
+        if output != 'pandas':
+            return records_to_output(data_dict['d']['Data'], output, drop='__type', url=url)
+        data_df = records_to_frame(data_dict['d']['Data'], drop='__type', url=url)
     except Exception as e:
         raise ValueError(f" No Data Found / Invalid parameters : MCX error:{e}")
-    return data_df
+    return apply_schema(data_df, 'bhav_copy')
 
 
-def get_historical_date_wise_data(start_date:str = '20230101',
-                                  end_date:str = '20231103',) -> pd.DataFrame:
+def _trade_dates(start_date: str, end_date: str, holidays: list = None) -> list:
     """
-    to get date wise history data in a panda dataframe
-    Date range cannot be greater than 365 days
-    :param start_date: in str format : YYYYMMDD
-    :param end_date: in str format : YYYYMMDD
-    :return: panda dataframe
+    trading days between start_date and end_date (both inclusive) from the shared trading calendar,
+    skipping weekends, MCX holidays and the given extra holidays
     """
+    try:
+        start = datetime.strptime(start_date, '%Y%m%d')
+        end = datetime.strptime(end_date, '%Y%m%d')
+    except (TypeError, ValueError):
+        raise ValueError(f'either or both start_date = {start_date} || end_date = {end_date} are not valid value')
+    if end < start:
+        raise ValueError('end_date should not be before start_date')
+    return get_trading_calendar().trading_dates(start, end, holidays)
+
+
+def get_bhav_copy_range(start_date:str = '20230102',
+                        end_date:str = '20230131',
+                        instrument:str = 'ALL',
+                        workers:int = 8,
+                        holidays:list = None,
+                        as_generator:bool = False,
+                        output: str = 'pandas'):
+    """
+    get bhav copies for every trade date in a range, fetched in parallel
+    weekends, MCX holidays (see get_trading_calendar) and the given holidays are skipped,
+    days MCX fails to return are reported instead of raised
+    :param start_date: in str format : YYYYMMDD
+    :param end_date: in str format : YYYYMMDD (inclusive)
+    :param instrument: any value from the list ['ALL','FUTCOM','FUTIDX','OPTCOM','OPTFUT']
+    :param workers: maximum number of bhav copies downloaded at once
+    :param holidays: list of extra YYYYMMDD dates to skip
+    :param as_generator: if True yield (trade_date, panda dataframe, error) per day in completion order
+    :param output: 'pandas' (default), 'records', 'numpy' or 'arrow', see OUTPUT_FORMATS
+    :return: panda dataframe with a TradeDate column, failed days are listed in data_df.attrs['failed_dates']
+    """
+    validate_output(output)
+    params = [{'trade_date': trade_date, 'instrument': instrument}
+              for trade_date in _trade_dates(start_date, end_date, holidays)]
+    if as_generator:
+        # each day goes straight to the requested output, the range result needs frames to concatenate
+        params = [dict(kwargs, output=output) for kwargs in params]
+    results = ((kwargs['trade_date'], data_df, error)
+               for kwargs, data_df, error in fetch_many(get_bhav_copy, params, workers=workers))
+    if as_generator:
+        return results
+
+    frames, failed_dates = [], {}
+    for trade_date, data_df, error in results:
+        if error is not None:
+            logger.warning(f"bhav copy for {trade_date} failed : {error}")
+            failed_dates[trade_date] = str(error)
+            continue
+        data_df.insert(0, 'TradeDate', pd.Timestamp(datetime.strptime(trade_date, '%Y%m%d')))
+        frames.append(data_df)
+    if not frames:
+        raise ValueError(f" No Data Found between {start_date} and {end_date} : failed dates:{sorted(failed_dates)}")
+    data_df = pd.concat(frames, ignore_index=True)
+    data_df.sort_values('TradeDate', kind='stable', inplace=True, ignore_index=True)
+    data_df.attrs['failed_dates'] = dict(sorted(failed_dates.items()))
+    return frame_to_output(apply_schema(data_df, 'bhav_copy'), output)
+
+
+@disk_cached('historical_date_wise', lambda params: is_past_date(params['end_date']))
+def _get_historical_window(start_date:str, end_date:str) -> pd.DataFrame:
     headers = get_headers(use_for='historical-data')
     url = "https://www.mcxindia.com/backpage.aspx/GetHistoricalDataDetails"
     payload = json.dumps({
@@ -290,19 +577,59 @@ def get_historical_date_wise_data(start_date:str = '20230101',
     validate_date_param(start_date=start_date, end_date=end_date)
     try:
         data_dict = post_json(url, headers=headers, payload=payload)
-        data_df = pd.DataFrame.from_dict(data_dict['d']['Data'])
+        data_df = records_to_frame(data_dict['d']['Data'], drop=['__type', 'Year', 'Month'], url=url)
         data_df['Date'] = pd.to_datetime(data_df['Date'])
-        data_df.drop(columns=['__type', 'Year', 'Month'], inplace=True)
     except Exception as e:
         raise ValueError(f" No Data Found / Invalid parameters : MCX error:{e}")
-    return data_df
+    return apply_schema(data_df, 'historical_date_wise')
 
 
-def get_mcx_icomdex_indices() -> pd.DataFrame:
+def get_historical_date_wise_data(start_date:str = '20230101',
+                                  end_date:str = '20231103',
+                                  workers:int = 4,
+                                  output: str = 'pandas') -> pd.DataFrame:
+    """
+    to get date wise history data in a panda dataframe
+    MCX limits a request to 365 days, longer ranges are split into windows fetched in parallel
+    :param start_date: in str format : YYYYMMDD
+    :param end_date: in str format : YYYYMMDD
+    :param workers: maximum number of windows downloaded at once
+    :param output: 'pandas' (default), 'records', 'numpy' or 'arrow', see OUTPUT_FORMATS
+    :return: panda dataframe sorted by Date, empty when the range has no trading day
+    """
+    validate_output(output)
+    validate_date_param(start_date=start_date, end_date=end_date, max_days=None)
+    # windows without a single trading day cannot have data, they are not requested
+    trading_days = get_trading_calendar().trading_days
+    windows = [(window_start, window_end) for window_start, window_end in split_date_range(start_date, end_date)
+               if len(trading_days(window_start, window_end))]
+    if not windows:
+        return frame_to_output(pd.DataFrame(), output)
+    if len(windows) == 1:
+        return frame_to_output(_get_historical_window(*windows[0]), output)
+
+    params = [{'start_date': window_start, 'end_date': window_end} for window_start, window_end in windows]
+    window_dfs = []
+    for kwargs, window_df, error in fetch_many(_get_historical_window, params, workers=workers):
+        if error is not None:
+            raise ValueError(f" window {kwargs['start_date']}-{kwargs['end_date']} failed : {error}")
+        window_dfs.append(window_df)
+    # one concat for all windows instead of copying the running result once per window
+    data_df = pd.concat(window_dfs, ignore_index=True)
+    del window_dfs
+    data_df.drop_duplicates(inplace=True, ignore_index=True)
+    data_df.sort_values('Date', kind='stable', inplace=True, ignore_index=True)
+    return frame_to_output(apply_schema(data_df, 'historical_date_wise'), output)
+
+
+@memory_cached('mcx_icomdex_indices')
+def get_mcx_icomdex_indices(output: str = 'pandas') -> pd.DataFrame:
     """
     get MCX iCOMDEX Indices
+    :param output: 'pandas' (default), 'records', 'numpy' or 'arrow', see OUTPUT_FORMATS
     :return: panda dataframe
     """
+    validate_output(output)
     url = "https://www.mcxindia.com/backpage.aspx/GetMCXIComdexIndicesDetails"
     payload = json.dumps({
         "Instrument_Identifier": "0",
@@ -311,19 +638,23 @@ def get_mcx_icomdex_indices() -> pd.DataFrame:
     headers = get_headers(use_for='mcx-icomdex-indices')
     try:
         data_dict = post_json(url, headers=headers, payload=payload)
-        data_df = pd.DataFrame.from_dict(data_dict['d']['Data'])
-        data_df.drop(columns=['__type'], inplace=True)
+        if output != 'pandas':
+            return records_to_output(data_dict['d']['Data'], output, drop=['__type'], url=url)
+        data_df = records_to_frame(data_dict['d']['Data'], drop=['__type'], url=url)
     except Exception as e:
         raise ValueError(f" No Data Found / Invalid request  : MCX error:{e}")
-    return data_df
+    return apply_schema(data_df, 'mcx_icomdex_indices')
 
 
-def get_pro_cli_details(trade_month:str = '202301') -> pd.DataFrame:
+@disk_cached('pro_cli_details', lambda params: is_past_date(params['trade_month'], '%Y%m'))
+def get_pro_cli_details(trade_month:str = '202301', output: str = 'pandas') -> pd.DataFrame:
     """
     get PRO CLI Details for given month
     :param trade_month: in str format : YYYYMM
+    :param output: 'pandas' (default), 'records', 'numpy' or 'arrow', see OUTPUT_FORMATS
     :return: panda dataframe
     """
+    validate_output(output)
     headers = get_headers(use_for='pro-cli-details')
     url = "https://www.mcxindia.com/backpage.aspx/GetPROClientDetailsSegmentWise"
     payload = json.dumps({
@@ -335,43 +666,109 @@ def get_pro_cli_details(trade_month:str = '202301') -> pd.DataFrame:
     })
     try:
         data_dict = post_json(url, headers=headers, payload=payload)
-        data_df = pd.DataFrame.from_dict(data_dict['d']['Data'])
-        data_df['Date'] = pd.to_datetime(data_df['Date'])
-        data_df.drop(columns=['ExtensionData', 'TradingDate', 'Date'], inplace=True)
+        if output != 'pandas':
+            return records_to_output(data_dict['d']['Data'], output, drop=['ExtensionData', 'TradingDate', 'Date'],
+                                     url=url)
+        data_df = records_to_frame(data_dict['d']['Data'], drop=['ExtensionData', 'TradingDate', 'Date'], url=url)
     except Exception as e:
         raise ValueError(f" No Data Found / Invalid parameters : MCX error:{e}")
-    return data_df
+    return apply_schema(data_df, 'pro_cli_details')
 
 
-def get_option_chain(commodity:str = 'CRUDEOIL', expiry:str = '15NOV2023') -> pd.DataFrame:
+@memory_cached('option_chain')
+def get_option_chain(commodity:str = 'CRUDEOIL', expiry:str = '15NOV2023', output: str = 'pandas') -> pd.DataFrame:
     """
     get live option chain from MCX site, the expiry date is different for different commodity
     :param commodity: any of the list ['CRUDEOIL', 'COPPER', 'GOLD', 'GOLDM', 'NATURALGAS', 'SILVER', 'SILVERM', 'ZINC']
     :param expiry: in the format od 'DDMMMYYYY' eg:'15NOV2023'
+    :param output: 'pandas' (default), 'records', 'numpy' or 'arrow', see OUTPUT_FORMATS
     :return: panda dataframe
     """
+    validate_output(output)
     headers = get_headers(use_for='option-chain')
     url = "https://www.mcxindia.com/backpage.aspx/GetOptionChain"
     payload_param = {'Commodity':f'{commodity}','Expiry':f'{expiry}'}
     payload = f"{payload_param}"
     try:
         data_dict = post_json(url, headers=headers, payload=payload)
-        data_df = pd.DataFrame.from_dict(data_dict['d']['Data'])
-        data_df.drop(columns=['ExtensionData', 'PE_LTT', 'CE_LTT', 'LTT', 'Symbol'], inplace=True)
+        if output != 'pandas':
+            records = [record for record in data_dict['d']['Data']
+                       if (record.get('CE_OpenInterest') or 0) > 0 or (record.get('PE_OpenInterest') or 0) > 0]
+            return records_to_output(records, output, drop=['ExtensionData', 'Symbol'], url=url)
+        data_df = records_to_frame(data_dict['d']['Data'], drop=['ExtensionData', 'Symbol'], url=url)
         data_df = data_df[(data_df['CE_OpenInterest']>0) | (data_df['PE_OpenInterest']>0)].copy()
     except Exception as e:
         raise ValueError(f" Invalid parameters : MCX error:{e}")
     data_df.reset_index(inplace=True)
     data_df.drop(columns='index', inplace=True)
-    return data_df
+    return apply_schema(data_df, 'option_chain')
+
+
+_EXPIRY_COLUMNS = ['ExpiryDate', 'Expiry', 'Expiry_Date']
+
+
+class OptionChains(dict):
+    """
+    (commodity, expiry) -> option chain returned by get_all_option_chains(as_dict=True)
+    :param failed_chains: {(commodity, expiry): error} of the chains MCX failed to return
+    """
+
+    def __init__(self, chains: dict, failed_chains: dict):
+        super().__init__(chains)
+        self.failed_chains = failed_chains
+
+
+def get_all_option_chains(commodity:str = 'ALL', workers:int = 16, as_dict:bool = False, output: str = 'pandas'):
+    """
+    get the live option chain of every commodity / expiry listed by get_recent_expires, fetched in parallel
+    chains MCX fails to return are reported instead of raised
+    :param commodity: 'ALL' or one commodity from get_recent_expires
+    :param workers: maximum number of option chains downloaded at once
+    :param as_dict: if True return an OptionChains dict of (commodity, expiry) -> panda dataframe,
+                    failed chains are listed in its failed_chains attribute
+    :param output: 'pandas' (default), 'records', 'numpy' or 'arrow', see OUTPUT_FORMATS
+    :return: long format panda dataframe with Commodity and Expiry columns,
+             failed chains are listed in data_df.attrs['failed_chains']
+    """
+    validate_output(output)
+    expires_df = get_recent_expires(commodity=commodity)
+    expiry_column = next((column for column in _EXPIRY_COLUMNS if column in expires_df.columns), None)
+    if expiry_column is None:
+        raise ValueError(f" No expiry column found in recent expires : {list(expires_df.columns)}")
+    keys = list(expires_df[['Symbol', expiry_column]].astype(str).drop_duplicates().itertuples(index=False, name=None))
+    params = [{'commodity': symbol, 'expiry': expiry} for symbol, expiry in keys]
 
+    chains, failed_chains = {}, {}
+    for kwargs, data_df, error in fetch_many(get_option_chain, params, workers=workers):
+        key = (kwargs['commodity'], kwargs['expiry'])
+        if error is not None:
+            logger.warning(f"option chain for {key[0]} {key[1]} failed : {error}")
+            failed_chains[key] = str(error)
+        else:
+            chains[key] = data_df
+    # keep the order of get_recent_expires rather than completion order
+    chains = {key: chains[key] for key in keys if key in chains}
+    if not chains:
+        raise ValueError(f" No option chain found : failed chains:{sorted(failed_chains)}")
+    if as_dict:
+        return OptionChains({key: frame_to_output(chain_df, output) for key, chain_df in chains.items()},
+                            failed_chains)
+    data_df = pd.concat([chain_df.assign(Commodity=key[0], Expiry=key[1]) for key, chain_df in chains.items()],
+                        ignore_index=True)
+    data_df = data_df[['Commodity', 'Expiry'] + [c for c in data_df.columns if c not in ('Commodity', 'Expiry')]]
+    data_df.attrs['failed_chains'] = failed_chains
+    return frame_to_output(apply_schema(data_df, 'option_chain'), output)
 
-def get_put_call_ratio(ratio_type:str = 'expiry_wise') -> pd.DataFrame:
+
+@memory_cached('put_call_ratio')
+def get_put_call_ratio(ratio_type:str = 'expiry_wise', output: str = 'pandas') -> pd.DataFrame:
     """
     get recent expiry wise put call ratio
     :param ratio_type: 'expiry_wise' or 'commodity_wise'
+    :param output: 'pandas' (default), 'records', 'numpy' or 'arrow', see OUTPUT_FORMATS
     :return: panda dataframe
     """
+    validate_output(output)
     if ratio_type =='expiry_wise':
         url = "https://www.mcxindia.com/backpage.aspx/GetExpirywisePutCallRatio"
     elif ratio_type == 'commodity_wise':
@@ -382,100 +779,239 @@ def get_put_call_ratio(ratio_type:str = 'expiry_wise') -> pd.DataFrame:
     headers = get_headers(use_for='put-call-ratio')
     try:
         data_dict = post_json(url, headers=headers, payload=payload)
-        data_df = pd.DataFrame.from_dict(data_dict['d']['Data'])
-        data_df.drop(columns=['ExtensionData', 'Date'], inplace=True)
+        if output != 'pandas':
+            return records_to_output(data_dict['d']['Data'], output, drop=['ExtensionData', 'Date'], url=url)
+        data_df = records_to_frame(data_dict['d']['Data'], drop=['ExtensionData', 'Date'], url=url)
     except Exception as e:
         raise ValueError(f" call put ratio data not found / Invalid request  : MCX error:{e}")
-    return data_df
+    return apply_schema(data_df, 'put_call_ratio')
+
+
+# the range loaders hand excel parsing to a process pool through this, per download thread
+_report_parser = threading.local()
+
 
+def _read_report(url: str, name: str) -> pd.DataFrame:
+    # revalidate the local copy of a monthly excel report with a conditional GET instead of downloading it again
+    def parse(content: bytes) -> pd.DataFrame:
+        start = time.perf_counter()
+        executor = getattr(_report_parser, 'executor', None)
+        if executor is None:
+            data_df = parse_report(content, name)
+        else:
+            data_df = executor.submit(parse_report, content, name).result()
+        if metrics.is_enabled():
+            metrics.observe('frame_build', time.perf_counter() - start, metrics.endpoint_name(url))
+        return data_df
+
+    report_store = get_report_store()
+    if report_store is None:
+        return parse(get_content(url))
+    return report_store.fetch(url, layout_key(name), parse)
 
-def get_category_wise_turnover(year:int = 2023, month_number:int = 9) -> pd.DataFrame:
+
+@disk_cached('category_wise_turnover', lambda params: is_past_month(params['year'], params['month_number']))
+def get_category_wise_turnover(year:int = 2023, month_number:int = 9, output: str = 'pandas') -> pd.DataFrame:
     """
     get the category wise turnover data
     :param year: int format : YYYY
     :param month_number: int between (1 to 12)
+    :param output: 'pandas' (default), 'records', 'numpy' or 'arrow', see OUTPUT_FORMATS
     :return: pandas dataframe
     """
+    validate_output(output)
     month_long = calendar.month_name[month_number].lower()
     month_short = calendar.month_abbr[month_number].lower()
     try:
         url = f"https://www.mcxindia.com/docs/default-source/market-data/historicaldata/{str(year)}/{month_long}/" \
             f"category-wise-turnover-{month_short}-{str(year)}.xlsx"
-        data_df = pd.read_excel(url, skiprows=2, skipfooter=9)
+        data_df = _read_report(url, 'category_wise_turnover')
     except Exception as e:
         raise ValueError(f" apply valid parameter : MCX error:{e}")
-    return data_df
+    return frame_to_output(apply_schema(data_df, 'category_wise_turnover'), output)
 
 
-def get_category_wise_oi(year:int = 2023, month_number:int = 9) -> pd.DataFrame:
+@disk_cached('category_wise_oi', lambda params: is_past_month(params['year'], params['month_number']))
+def get_category_wise_oi(year:int = 2023, month_number:int = 9, output: str = 'pandas') -> pd.DataFrame:
     """
     get the category wise open interest data
     :param year: int format : YYYY
     :param month_number: int between (1 to 12)
+    :param output: 'pandas' (default), 'records', 'numpy' or 'arrow', see OUTPUT_FORMATS
     :return: pandas dataframe
     """
+    validate_output(output)
     month_long = calendar.month_name[month_number].lower()
     month_short = calendar.month_abbr[month_number].lower()
     try:
         url = f"https://www.mcxindia.com/docs/default-source/market-data/historicaldata/{str(year)}/{month_long}/" \
               f"category-wise-oi-{month_short}-{str(year)}.xlsx"
-        data_df = pd.read_excel(url, skiprows=3, skipfooter=8)
+        data_df = _read_report(url, 'category_wise_oi')
     except Exception as e:
         raise ValueError(f" apply valid parameter : MCX error:{e}")
-    data_df.columns = ['Date', 'Commodity', 'Instrument', 'Open Interest', 'FPOs/ Farmers(Long OI)',
-                       'FPOs/ Farmers(Short OI)', 'VCPs/ Hedger(Long OI)', 'VCPs/ Hedger(Short OI)',
-                       'Proprietary traders(Long OI)', 'Proprietary traders(Short OI)',
-                       'Domestic Financial institutional investors(Long OI)',
-                       'Domestic Financial institutional investors(Short OI)', 'Foreign Participants(Long OI)',
-                       'Foreign Participants(Short OI)', 'Others(Long OI)', 'Others(Short OI)']
-    return data_df
+    return frame_to_output(apply_schema(data_df, 'category_wise_oi'), output)
 
 
-def get_ccl_delivery(year:int = 2023, month_number:int = 9) -> pd.DataFrame:
+@disk_cached('ccl_delivery', lambda params: is_past_month(params['year'], params['month_number']))
+def get_ccl_delivery(year:int = 2023, month_number:int = 9, output: str = 'pandas') -> pd.DataFrame:
     """
     get the ccl delivery data
     :param year: int format : YYYY
     :param month_number: int between (1 to 12)
+    :param output: 'pandas' (default), 'records', 'numpy' or 'arrow', see OUTPUT_FORMATS
     :return: pandas dataframe
     """
+    validate_output(output)
     month_long = calendar.month_name[month_number].lower()
     # month_short = calendar.month_abbr[month_number].lower()
     try:
         url = f"https://www.mcxindia.com/docs/default-source/market-data/historicaldata/{str(year)}/{month_long}/" \
             f"ccl_delivery.xlsx"
-        data_df = pd.read_excel(url)
+        data_df = _read_report(url, 'ccl_delivery')
     except Exception as e:
         raise ValueError(f" apply valid parameter : MCX error:{e}")
-    data_df.dropna(inplace=True)
-    data_df.reset_index(inplace=True)
-    data_df.drop(columns='index', inplace=True)
-    return data_df
+    return frame_to_output(data_df, output)
 
 
-def get_trading_statistics(year:int = 2023, month_number:int = 9) -> pd.DataFrame:
+@disk_cached('trading_statistics', lambda params: is_past_month(params['year'], params['month_number']))
+def get_trading_statistics(year:int = 2023, month_number:int = 9, output: str = 'pandas') -> pd.DataFrame:
     """
     get the trading statistics data from MCX
     :param year: int format : YYYY
     :param month_number: int between (1 to 12)
+    :param output: 'pandas' (default), 'records', 'numpy' or 'arrow', see OUTPUT_FORMATS
     :return: pandas dataframe
     """
+    validate_output(output)
     month_long = calendar.month_name[month_number].lower()
     month_short = calendar.month_abbr[month_number].lower()
     try:
         url = (f"https://www.mcxindia.com/docs/default-source/market-data/historicaldata/"
                 f"{year}/{month_long}/trading-statistics-{month_short}-{year}.xlsx")
-        print(url)
-        data_df = pd.read_excel(url, skipfooter=5)
+        data_df = _read_report(url, 'trading_statistics')
     except Exception as e:
         raise ValueError(f" apply valid parameter : MCX error:{e}")
-    data_df.rename(columns={"Mode of Trading (% of Turnover)": "Mode of ALGO Trading (% of Turnover)",
-                            "Unnamed: 25": "Mode of Non-ALGO Trading (% of Turnover)"},inplace=True)
-    data_df.dropna(inplace=True)
-    data_df.reset_index(inplace=True)
-    data_df.drop(columns='index', inplace=True)
+    return frame_to_output(data_df, output)
+
+
+
+def _report_months(start_month: str, end_month: str) -> list:
+    try:
+        start = datetime.strptime(str(start_month), '%Y%m')
+        end = datetime.strptime(str(end_month), '%Y%m')
+    except ValueError:
+        raise ValueError(f" start_month and end_month should be in YYYYMM format : {start_month}, {end_month}")
+    if start > end:
+        raise ValueError(f" start_month {start_month} is after end_month {end_month}")
+    return [(period.year, period.month) for period in pd.period_range(start, end, freq='M')]
+
+
+def _normalize_column(column) -> str:
+    return ' '.join(str(column).split())
+
+
+def _fetch_month_with_parser(fetch, executor, **kwargs):
+    _report_parser.executor = executor
+    try:
+        return fetch(**kwargs)
+    finally:
+        _report_parser.executor = None
+
+
+def _get_report_range(fetch, start_month: str, end_month: str, workers: int, processes: int) -> pd.DataFrame:
+    months = _report_months(start_month, end_month)
+    params = [{'year': year, 'month_number': month_number} for year, month_number in months]
+    if processes is None:
+        processes = min(len(months), os.cpu_count() or 1)
+    executor = None
+    if processes > 1:
+        executor = ProcessPoolExecutor(max_workers=processes)
+        # start the workers now, before the download threads, so forking never copies a thread holding a lock
+        executor.submit(int).result()
+    frames, failed_months = [], {}
+    try:
+        for kwargs, data_df, error in fetch_many(partial(_fetch_month_with_parser, fetch, executor), params,
+                                                 workers=workers):
+            period = f"{kwargs['year']}{kwargs['month_number']:02d}"
+            if error is not None:
+                logger.warning(f"{fetch.__name__} for {period} failed : {error}")
+                failed_months[period] = str(error)
+                continue
+            data_df.columns = [_normalize_column(column) for column in data_df.columns]
+            data_df.insert(0, 'Period', pd.Period(year=kwargs['year'], month=kwargs['month_number'], freq='M'))
+            frames.append(data_df)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    if not frames:
+        raise ValueError(f" No Data Found between {start_month} and {end_month} : failed months:{sorted(failed_months)}")
+    data_df = pd.concat(frames, ignore_index=True)
+    data_df.sort_values('Period', kind='stable', inplace=True, ignore_index=True)
+    data_df.attrs['failed_months'] = dict(sorted(failed_months.items()))
     return data_df
 
 
+def get_category_wise_turnover_range(start_month:str = '202301', end_month:str = '202312', workers:int = 8,
+                                     processes:int = None, output: str = 'pandas') -> pd.DataFrame:
+    """
+    get the category wise turnover data for every month in a range, downloaded in parallel
+    :param start_month: in str format : YYYYMM
+    :param end_month: in str format : YYYYMM (inclusive)
+    :param workers: maximum number of reports downloaded at once
+    :param processes: excel parsing processes, default one per CPU, 0 or 1 parses in the download threads
+    :param output: 'pandas' (default), 'records', 'numpy' or 'arrow', see OUTPUT_FORMATS
+    :return: panda dataframe with a Period column, failed months are listed in data_df.attrs['failed_months']
+    """
+    validate_output(output)
+    data_df = _get_report_range(get_category_wise_turnover, start_month, end_month, workers, processes)
+    return frame_to_output(apply_schema(data_df, 'category_wise_turnover'), output)
+
+
+def get_category_wise_oi_range(start_month:str = '202301', end_month:str = '202312', workers:int = 8,
+                               processes:int = None, output: str = 'pandas') -> pd.DataFrame:
+    """
+    get the category wise open interest data for every month in a range, downloaded in parallel
+    :param start_month: in str format : YYYYMM
+    :param end_month: in str format : YYYYMM (inclusive)
+    :param workers: maximum number of reports downloaded at once
+    :param processes: excel parsing processes, default one per CPU, 0 or 1 parses in the download threads
+    :param output: 'pandas' (default), 'records', 'numpy' or 'arrow', see OUTPUT_FORMATS
+    :return: panda dataframe with a Period column, failed months are listed in data_df.attrs['failed_months']
+    """
+    validate_output(output)
+    data_df = _get_report_range(get_category_wise_oi, start_month, end_month, workers, processes)
+    return frame_to_output(apply_schema(data_df, 'category_wise_oi'), output)
+
+
+def get_ccl_delivery_range(start_month:str = '202301', end_month:str = '202312', workers:int = 8,
+                           processes:int = None, output: str = 'pandas') -> pd.DataFrame:
+    """
+    get the ccl delivery data for every month in a range, downloaded in parallel
+    :param start_month: in str format : YYYYMM
+    :param end_month: in str format : YYYYMM (inclusive)
+    :param workers: maximum number of reports downloaded at once
+    :param processes: excel parsing processes, default one per CPU, 0 or 1 parses in the download threads
+    :param output: 'pandas' (default), 'records', 'numpy' or 'arrow', see OUTPUT_FORMATS
+    :return: panda dataframe with a Period column, failed months are listed in data_df.attrs['failed_months']
+    """
+    validate_output(output)
+    return frame_to_output(_get_report_range(get_ccl_delivery, start_month, end_month, workers, processes), output)
+
+
+def get_trading_statistics_range(start_month:str = '202301', end_month:str = '202312', workers:int = 8,
+                                 processes:int = None, output: str = 'pandas') -> pd.DataFrame:
+    """
+    get the trading statistics data for every month in a range, downloaded in parallel
+    :param start_month: in str format : YYYYMM
+    :param end_month: in str format : YYYYMM (inclusive)
+    :param workers: maximum number of reports downloaded at once
+    :param processes: excel parsing processes, default one per CPU, 0 or 1 parses in the download threads
+    :param output: 'pandas' (default), 'records', 'numpy' or 'arrow', see OUTPUT_FORMATS
+    :return: panda dataframe with a Period column, failed months are listed in data_df.attrs['failed_months']
+    """
+    validate_output(output)
+    return frame_to_output(_get_report_range(get_trading_statistics, start_month, end_month, workers, processes), output)
+
 # if __name__ == '__main__':
 #     import mcxlib
     # df = mcxlib.get_recent_expires(commodity='COPPER')
@@ -0,0 +1,304 @@
+"""
+request level instrumentation for mcxlib
+
+when enabled, every MCX request records per endpoint timings for connect (DNS + TCP + TLS), time to first byte and
+body download, the payload size and status, and the fetchers add JSON decode and DataFrame build times.
+measurements go to an in-process registry (exportable in Prometheus text format) and to any registered hooks
+
+    import mcxlib
+    registry = mcxlib.enable_metrics()
+    mcxlib.add_metrics_hook(print)
+    mcxlib.get_market_watch()
+    registry.stats()['GetMarketWatch']
+    print(registry.to_prometheus())
+
+hooks receive one dict per event: {'type': 'request', 'endpoint', 'method', 'url', 'status', 'attempt', 'bytes',
+'error', 'connect', 'ttfb', 'download', 'total'} for every HTTP attempt (seconds), and
+{'type': 'decode' | 'frame_build', 'endpoint', 'seconds'} for the processing steps.
+"""
+from time import perf_counter
+from urllib.parse import urlsplit
+import bisect
+import logging
+import re
+import threading
+
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+logger = logging.getLogger(__name__)
+
+PHASES = ('connect', 'ttfb', 'download', 'total', 'decode', 'frame_build')
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+_REPORT_PERIOD = re.compile(r'-(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*-\d{4}$', re.I)
+
+# per thread timer of the request in flight, read by the connection classes below
+_local = threading.local()
+_instrument_lock = threading.Lock()
+
+
+def endpoint_name(url: str) -> str:
+    """
+    metric label for a MCX url: the backpage.aspx method name, or the report file name without its month
+    eg: GetMarketWatch, category-wise-oi
+    """
+    name = urlsplit(url).path.rstrip('/').rsplit('/', 1)[-1]
+    if name.lower().endswith(('.xlsx', '.xls')):
+        name = _REPORT_PERIOD.sub('', name.rsplit('.', 1)[0])
+    return name or urlsplit(url).netloc
+
+
+class MetricsRegistry:
+    """
+    thread safe in-process store of per endpoint phase histograms and request / byte / retry counters
+    :param buckets: histogram bucket upper bounds in seconds
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._phases = {}
+        self._requests = {}
+        self._bytes = {}
+        self._retries = {}
+        self._lock = threading.Lock()
+
+    def observe(self, endpoint: str, phase: str, seconds: float):
+        with self._lock:
+            histogram = self._phases.get((endpoint, phase))
+            if histogram is None:
+                histogram = self._phases[(endpoint, phase)] = {
+                    'buckets': [0] * len(self.buckets), 'count': 0, 'sum': 0.0, 'max': 0.0}
+            index = bisect.bisect_left(self.buckets, seconds)
+            if index < len(self.buckets):
+                histogram['buckets'][index] += 1
+            histogram['count'] += 1
+            histogram['sum'] += seconds
+            histogram['max'] = max(histogram['max'], seconds)
+
+    def record(self, event: dict):
+        """
+        add one hook event to the registry
+        """
+        endpoint = event['endpoint']
+        if event['type'] != 'request':
+            self.observe(endpoint, event['type'], event['seconds'])
+            return
+        for phase in ('connect', 'ttfb', 'download', 'total'):
+            if event.get(phase) is not None:
+                self.observe(endpoint, phase, event[phase])
+        status = str(event['status']) if event.get('status') is not None else 'error'
+        with self._lock:
+            self._requests[(endpoint, status)] = self._requests.get((endpoint, status), 0) + 1
+            self._bytes[endpoint] = self._bytes.get(endpoint, 0) + (event.get('bytes') or 0)
+            if event.get('attempt'):
+                self._retries[endpoint] = self._retries.get(endpoint, 0) + 1
+
+    def stats(self) -> dict:
+        """
+        :return: {endpoint: {'requests': {status: count}, 'bytes': int, 'retries': int,
+                             phase: {'count', 'sum', 'mean', 'max'}}}
+        """
+        with self._lock:
+            result = {}
+            for (endpoint, phase), histogram in self._phases.items():
+                result.setdefault(endpoint, {})[phase] = {
+                    'count': histogram['count'], 'sum': histogram['sum'], 'max': histogram['max'],
+                    'mean': histogram['sum'] / histogram['count']}
+            for (endpoint, status), count in self._requests.items():
+                result.setdefault(endpoint, {}).setdefault('requests', {})[status] = count
+            for endpoint, stats in result.items():
+                stats.setdefault('requests', {})
+                stats['bytes'] = self._bytes.get(endpoint, 0)
+                stats['retries'] = self._retries.get(endpoint, 0)
+            return result
+
+    def to_prometheus(self, prefix: str = 'mcxlib') -> str:
+        """
+        :return: all metrics in the Prometheus text exposition format
+        """
+        def labels(**values):
+            return ','.join(f'{key}="{_escape_label(value)}"' for key, value in values.items())
+
+        with self._lock:
+            lines = [f'# HELP {prefix}_phase_seconds time spent per request phase',
+                     f'# TYPE {prefix}_phase_seconds histogram']
+            for (endpoint, phase), histogram in sorted(self._phases.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, histogram['buckets']):
+                    cumulative += count
+                    lines.append(f'{prefix}_phase_seconds_bucket{{{labels(endpoint=endpoint, phase=phase, le=bound)}}}'
+                                 f' {cumulative}')
+                lines.append(f'{prefix}_phase_seconds_bucket{{{labels(endpoint=endpoint, phase=phase, le="+Inf")}}}'
+                             f' {histogram["count"]}')
+                lines.append(f'{prefix}_phase_seconds_sum{{{labels(endpoint=endpoint, phase=phase)}}}'
+                             f' {histogram["sum"]:.6f}')
+                lines.append(f'{prefix}_phase_seconds_count{{{labels(endpoint=endpoint, phase=phase)}}}'
+                             f' {histogram["count"]}')
+            lines += [f'# HELP {prefix}_requests_total HTTP attempts by status', f'# TYPE {prefix}_requests_total counter']
+            lines += [f'{prefix}_requests_total{{{labels(endpoint=endpoint, status=status)}}} {count}'
+                      for (endpoint, status), count in sorted(self._requests.items())]
+            lines += [f'# HELP {prefix}_response_bytes_total response body bytes',
+                      f'# TYPE {prefix}_response_bytes_total counter']
+            lines += [f'{prefix}_response_bytes_total{{{labels(endpoint=endpoint)}}} {count}'
+                      for endpoint, count in sorted(self._bytes.items())]
+            lines += [f'# HELP {prefix}_retries_total retried HTTP attempts', f'# TYPE {prefix}_retries_total counter']
+            lines += [f'{prefix}_retries_total{{{labels(endpoint=endpoint)}}} {count}'
+                      for endpoint, count in sorted(self._retries.items())]
+        return '\n'.join(lines) + '\n'
+
+    def clear(self):
+        with self._lock:
+            self._phases.clear()
+            self._requests.clear()
+            self._bytes.clear()
+            self._retries.clear()
+
+
+def _escape_label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+_registry = None
+_hooks = []
+
+
+def enable_metrics(buckets=DEFAULT_BUCKETS) -> MetricsRegistry:
+    """
+    start recording request metrics into a new registry
+    :param buckets: histogram bucket upper bounds in seconds
+    :return: MetricsRegistry
+    """
+    global _registry
+    _registry = MetricsRegistry(buckets=buckets)
+    return _registry
+
+
+def disable_metrics():
+    global _registry
+    _registry = None
+
+
+def get_metrics():
+    return _registry
+
+
+def export_prometheus(prefix: str = 'mcxlib') -> str:
+    """
+    :return: the enabled registry in the Prometheus text exposition format, empty when metrics are off
+    """
+    registry = _registry
+    return registry.to_prometheus(prefix) if registry is not None else ''
+
+
+def add_metrics_hook(callback):
+    """
+    call callback(event) for every instrumentation event, see the module docstring for the event fields
+    """
+    if callback not in _hooks:
+        _hooks.append(callback)
+
+
+def remove_metrics_hook(callback):
+    if callback in _hooks:
+        _hooks.remove(callback)
+
+
+def logging_hook(event: dict):
+    """
+    ready made hook logging every event at DEBUG level on the mcxlib.metrics logger
+    """
+    logger.debug("%s", event)
+
+
+def is_enabled() -> bool:
+    return _registry is not None or bool(_hooks)
+
+
+def emit(event: dict):
+    registry = _registry
+    if registry is not None:
+        registry.record(event)
+    for callback in list(_hooks):
+        try:
+            callback(event)
+        except Exception:
+            logger.exception("metrics hook %r failed", callback)
+
+
+class RequestTimer:
+    """
+    timings of one HTTP attempt, filled in by MCXClient.request and the instrumented connections
+    """
+
+    def __init__(self, method: str, url: str, attempt: int = 0):
+        self.event = {'type': 'request', 'endpoint': endpoint_name(url), 'method': method, 'url': url,
+                      'status': None, 'attempt': attempt, 'bytes': 0, 'error': None,
+                      'connect': 0.0, 'ttfb': None, 'download': None, 'total': None}
+        self._start = perf_counter()
+        self._headers_at = None
+        _local.timer = self
+
+    def headers_received(self):
+        self._headers_at = perf_counter()
+        event = self.event
+        event['ttfb'] = max(0.0, self._headers_at - self._start - event['connect'])
+
+    def finish(self, status: int = None, size: int = 0, error: BaseException = None):
+        now = perf_counter()
+        event = self.event
+        if self._headers_at is not None:
+            event['download'] = now - self._headers_at
+        event.update(status=status, bytes=size, total=now - self._start,
+                     error=type(error).__name__ if error is not None else None)
+        _local.timer = None
+        emit(event)
+
+
+def observe(phase: str, seconds: float, endpoint: str):
+    """
+    record a processing step (eg: 'decode', 'frame_build') for endpoint, see endpoint_name
+    """
+    emit({'type': phase, 'endpoint': endpoint, 'seconds': seconds})
+
+
+class _TimedConnectionMixin:
+    # urllib3 resolves and connects in connect(), TLS included for https, so the whole call is the connect phase
+    def connect(self):
+        timer = getattr(_local, 'timer', None)
+        start = perf_counter()
+        super().connect()
+        if timer is not None:
+            timer.event['connect'] += perf_counter() - start
+
+
+class InstrumentedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class InstrumentedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class InstrumentedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = InstrumentedHTTPConnection
+
+
+class InstrumentedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = InstrumentedHTTPSConnection
+
+
+POOL_CLASSES_BY_SCHEME = {'http': InstrumentedHTTPConnectionPool, 'https': InstrumentedHTTPSConnectionPool}
+
+
+def instrument_session(session):
+    """
+    switch the connection pools of a requests session to the instrumented connection classes, called on the first
+    timed request so sessions of clients never used with metrics keep the stock urllib3 pools
+    """
+    with _instrument_lock:
+        for adapter in set(session.adapters.values()):
+            poolmanager = getattr(adapter, 'poolmanager', None)
+            if poolmanager is not None and poolmanager.pool_classes_by_scheme is not POOL_CLASSES_BY_SCHEME:
+                poolmanager.pool_classes_by_scheme = POOL_CLASSES_BY_SCHEME
+                # pools opened before metrics were enabled are rebuilt with the instrumented connections
+                poolmanager.clear()
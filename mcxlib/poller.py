@@ -0,0 +1,127 @@
+"""
+streaming market watch poller which emits only the contracts that moved
+
+    from mcxlib.poller import MarketWatchPoller
+
+    poller = MarketWatchPoller(interval=5)
+    for delta in poller:
+        print(delta[['ContractName', 'LTP', 'Volume']])
+
+or with a callback on a background thread:
+
+    poller.start(lambda delta: publish(delta))
+    ...
+    poller.stop()
+"""
+import logging
+import threading
+import time
+
+import pandas as pd
+
+from mcxlib.market_data import get_market_watch
+
+logger = logging.getLogger(__name__)
+
+WATCH_COLUMNS = ('LTP', 'Volume', 'OpenInterest', 'LTT')
+KEY_COLUMNS = ('Symbol', 'InstrumentName', 'ExpiryDate', 'StrikePrice', 'OptionType')
+
+
+class MarketWatchPoller:
+    """
+    polls the market watch on a fixed schedule, keeps the last values of the watched columns keyed by
+    contract and emits a delta frame holding only new contracts and those whose watched values changed
+    :param interval: seconds between polls
+    :param watch_columns: columns compared between polls
+    :param key_columns: columns identifying a contract, defaults to ContractName when present
+    :param fetch: function returning the market watch panda dataframe
+    """
+
+    def __init__(self, interval: float = 5.0, watch_columns=WATCH_COLUMNS, key_columns=None,
+                 fetch=get_market_watch):
+        self.interval = interval
+        self.watch_columns = list(watch_columns)
+        self.key_columns = list(key_columns) if key_columns else None
+        self.fetch = fetch
+        self._last = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _keys(self, data_df: pd.DataFrame) -> list:
+        if self.key_columns:
+            return self.key_columns
+        if 'ContractName' in data_df.columns:
+            return ['ContractName']
+        return [column for column in KEY_COLUMNS if column in data_df.columns]
+
+    def diff(self, data_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        compare a market watch frame with the previous one and remember it for the next call
+        :return: rows of data_df which are new or whose watched columns changed
+        """
+        keys = self._keys(data_df)
+        if not keys:
+            raise ValueError(" No contract key columns found in market watch")
+        watched = [column for column in self.watch_columns if column in data_df.columns]
+        current = data_df[watched].copy()
+        current.index = pd.MultiIndex.from_arrays([data_df[column].astype(str) for column in keys])
+        current = current[~current.index.duplicated(keep='last')]
+
+        if self._last is None:
+            changed = pd.Series(True, index=current.index)
+        else:
+            previous = self._last.reindex(current.index)
+            is_new = ~current.index.isin(self._last.index)
+            moved = (current != previous) & ~(current.isna() & previous.isna())
+            changed = pd.Series(is_new, index=current.index) | moved.any(axis=1)
+        self._last = current
+
+        row_keys = pd.MultiIndex.from_arrays([data_df[column].astype(str) for column in keys])
+        changed_keys = changed.index[changed.to_numpy()]
+        mask = row_keys.isin(changed_keys) & ~row_keys.duplicated(keep='last')
+        return data_df[mask].reset_index(drop=True)
+
+    def poll(self) -> pd.DataFrame:
+        """
+        fetch the market watch once and return the delta frame
+        """
+        return self.diff(self.fetch())
+
+    def reset(self):
+        self._last = None
+
+    def __iter__(self):
+        """
+        yield a non empty delta frame per poll until stop() is called, failed polls are logged and skipped
+        """
+        self._stop.clear()
+        next_poll = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                delta = self.poll()
+            except Exception as e:
+                logger.warning(f"market watch poll failed : {e}")
+            else:
+                if not delta.empty:
+                    yield delta
+            next_poll += self.interval
+            self._stop.wait(max(0.0, next_poll - time.monotonic()))
+
+    def start(self, callback) -> threading.Thread:
+        """
+        run the poller on a daemon thread calling callback(delta) for every non empty delta
+        """
+        def run():
+            for delta in self:
+                callback(delta)
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=run, name='mcxlib-poller', daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: float = None):
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+            self._thread = None
@@ -0,0 +1,169 @@
+"""
+per host token bucket rate limiting with adaptive backoff for every MCX request
+
+all MCXClient requests take a token from the limiter of their host before they are sent. the limiter lowers its
+rate when MCX answers 429/5xx or times out (multiplicative decrease) and creeps back up while requests succeed
+(additive increase), so parallel fetchers settle at the highest rate MCX sustains without hand tuned sleeps.
+
+    import mcxlib
+    mcxlib.configure_rate_limit(rate=20, burst=40)
+    mcxlib.rate_limit_stats()
+"""
+from urllib.parse import urlsplit
+import random
+import threading
+import time
+
+# without an explicit max_rate a healthy host is probed up to this multiple of the initial rate
+MAX_RATE_FACTOR = 4
+
+
+def backoff_delay(attempt: int, backoff_factor: float = 0.3, backoff_max: float = 10.0) -> float:
+    """
+    full jitter exponential backoff: a random delay between 0 and backoff_factor * 2 ** attempt (capped)
+    """
+    return random.uniform(0, min(backoff_max, backoff_factor * 2 ** attempt))
+
+
+class RateLimiter:
+    """
+    thread safe adaptive token bucket for one host
+    :param rate: requests per second allowed initially
+    :param burst: maximum number of tokens the bucket holds
+    :param min_rate: the rate never drops below this
+    :param max_rate: the rate never grows above this, default MAX_RATE_FACTOR * rate so the limiter can probe above
+                     the initial rate while requests succeed
+    :param decrease: factor applied to the rate on a throttling error
+    :param increase: requests per second added back for every successful request
+    :param cooldown: seconds between two rate decreases, so one burst of errors cuts the rate once
+    """
+
+    def __init__(self, rate: float = 10.0, burst: int = 20, min_rate: float = 0.5, max_rate: float = None,
+                 decrease: float = 0.7, increase: float = 0.2, cooldown: float = 1.0):
+        if rate <= 0 or burst < 1:
+            raise ValueError(" rate must be positive and burst at least 1")
+        self.rate = float(rate)
+        self.burst = burst
+        self.min_rate = min(float(min_rate), self.rate)
+        self.max_rate = float(max_rate or rate * MAX_RATE_FACTOR)
+        self.decrease = decrease
+        self.increase = increase
+        self.cooldown = cooldown
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._last_decrease = float('-inf')
+        self._error_rate = 0.0
+        self._counts = {'requests': 0, 'successes': 0, 'throttled': 0, 'server_errors': 0, 'timeouts': 0,
+                        'connection_errors': 0}
+        self._waited = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """
+        block until a token is available
+        :return: seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    self._counts['requests'] += 1
+                    self._waited += waited
+                    return waited
+                delay = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+            time.sleep(delay)
+            waited += delay
+
+    def record_success(self):
+        with self._lock:
+            self._counts['successes'] += 1
+            self._error_rate *= 0.95
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def record_failure(self, kind: str = 'server_errors', retry_after: float = None):
+        """
+        :param kind: 'throttled' (HTTP 429), 'server_errors' (HTTP 5xx), 'timeouts' or 'connection_errors'
+        :param retry_after: seconds MCX asked us to wait, holds back every request to the host
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._counts[kind] += 1
+            self._error_rate = self._error_rate * 0.95 + 0.05
+            if now - self._last_decrease >= self.cooldown:
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                self._tokens = min(self._tokens, 1.0)
+                self._last_decrease = now
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._counts, rate=round(self.rate, 3), error_rate=round(self._error_rate, 4),
+                        waited_seconds=round(self._waited, 3))
+
+
+class RateLimiterRegistry:
+    """
+    one RateLimiter per host, created on first use with the same settings
+    :param kwargs: any of the RateLimiter parameters
+    """
+
+    def __init__(self, **kwargs):
+        RateLimiter(**kwargs)  # validate the settings up front
+        self.settings = kwargs
+        self._limiters = {}
+        self._lock = threading.Lock()
+
+    def for_url(self, url: str) -> RateLimiter:
+        host = urlsplit(url).netloc.lower()
+        limiter = self._limiters.get(host)
+        if limiter is None:
+            with self._lock:
+                limiter = self._limiters.setdefault(host, RateLimiter(**self.settings))
+        return limiter
+
+    def stats(self) -> dict:
+        return {host: limiter.stats() for host, limiter in list(self._limiters.items())}
+
+
+_registry = RateLimiterRegistry()
+
+
+def configure_rate_limit(**kwargs) -> RateLimiterRegistry:
+    """
+    replace the per host rate limiters shared by every MCX client
+    :param kwargs: any of the RateLimiter parameters, eg: rate=20, burst=40, min_rate=1
+    :return: RateLimiterRegistry
+    """
+    global _registry
+    _registry = RateLimiterRegistry(**kwargs)
+    return _registry
+
+
+def disable_rate_limit():
+    global _registry
+    _registry = None
+
+
+def get_rate_limiter(url: str):
+    """
+    the RateLimiter for the host of url, or None when rate limiting is disabled
+    """
+    registry = _registry
+    return registry.for_url(url) if registry is not None else None
+
+
+def rate_limit_stats() -> dict:
+    """
+    requests, successes, throttled / server error / timeout / connection error counts, current rate, decayed error rate
+    and total seconds waited, per host
+    """
+    return _registry.stats() if _registry is not None else {}
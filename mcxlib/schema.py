@@ -0,0 +1,112 @@
+"""
+per endpoint dtype schemas applied to every DataFrame returned by mcxlib
+
+repeated text such as symbols, instrument names and expiries becomes categorical, dates and MCX
+'/Date(...)/' timestamps become datetime64 and counts (volume, open interest, quantities) become int64, the same
+width on every call so arithmetic cannot overflow and frames concatenate cleanly. prices stay float64 so no
+precision is lost.
+"""
+from __future__ import annotations
+
+from mcxlib.lazy import lazy_module
+from mcxlib.libutil import parse_mcx_datetime_series
+
+pd = lazy_module('pandas')
+
+_CONTRACT = ['Symbol', 'ProductCode', 'InstrumentName', 'ExpiryDate', 'OptionType', 'Unit', 'Underlying']
+_PRICES = ['Open', 'High', 'Low', 'Close', 'LTP', 'PreviousClose', 'AbsoluteChange', 'PercentChange',
+           'StrikePrice', 'Value', 'BuyPrice', 'SellPrice']
+_COUNTS = ['Volume', 'OpenInterest', 'BuyQuantity', 'SellQuantity', 'ChangeInOI']
+
+
+def _option_chain_columns(suffixes: list) -> list:
+    return [f'{side}_{suffix}' for side in ('CE', 'PE') for suffix in suffixes]
+
+
+SCHEMAS = {
+    'market_watch': {'category': _CONTRACT, 'float': _PRICES, 'integer': _COUNTS, 'mcx_datetime': ['LTT']},
+    'heat_map': {'category': _CONTRACT, 'float': _PRICES, 'integer': _COUNTS, 'mcx_datetime': ['Dttm']},
+    'top_gainers': {'category': _CONTRACT, 'float': _PRICES, 'integer': _COUNTS, 'mcx_datetime': ['LTT']},
+    'top_losers': {'category': _CONTRACT, 'float': _PRICES, 'integer': _COUNTS, 'mcx_datetime': ['LTT']},
+    'most_active_contracts': {'category': _CONTRACT, 'float': _PRICES, 'integer': _COUNTS},
+    'most_active_puts_calls': {'category': _CONTRACT, 'float': _PRICES, 'integer': _COUNTS,
+                               'mcx_datetime': ['LTT']},
+    'bhav_copy': {'category': _CONTRACT + ['DateDisplay'], 'float': _PRICES, 'integer': _COUNTS,
+                  'datetime': ['TradeDate']},
+    'historical_date_wise': {'category': _CONTRACT, 'float': _PRICES, 'integer': _COUNTS,
+                             'datetime': ['Date']},
+    'option_chain': {'category': ['ExpiryDate', 'Symbol', 'Commodity', 'Expiry'],
+                     'float': _option_chain_columns(['LTP', 'AbsoluteChange', 'BidPrice', 'AskPrice', 'StrikePrice'])
+                     + ['UnderlyingValue'],
+                     'integer': _option_chain_columns(['OpenInterest', 'ChangeInOI', 'Volume', 'BidQty', 'AskQty']),
+                     'mcx_datetime': ['LTT', 'CE_LTT', 'PE_LTT']},
+    'recent_expires': {'category': ['Symbol', 'ExpiryDate', 'Expiry'], 'integer': ['PutOI', 'CallOI']},
+    'put_call_ratio': {'category': ['Symbol', 'ExpiryDate', 'Expiry'], 'integer': ['PutOI', 'CallOI'],
+                       'float': ['Ratio']},
+    'pro_cli_details': {'category': ['Segment', 'CommodityHead', 'Commodity']},
+    'mcx_icomdex_indices': {'category': ['Index', 'IndexName', 'Symbol']},
+    'category_wise_oi': {'category': ['Commodity', 'Instrument']},
+    'category_wise_turnover': {'category': ['Commodity', 'Instrument', 'Segment']},
+}
+
+
+def _to_category(column: pd.Series) -> pd.Series:
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return column
+    return column.astype('category')
+
+
+def _to_datetime(column: pd.Series) -> pd.Series:
+    if pd.api.types.is_datetime64_any_dtype(column):
+        return column
+    return pd.to_datetime(column)
+
+
+def _to_mcx_datetime(column: pd.Series) -> pd.Series:
+    if pd.api.types.is_datetime64_any_dtype(column):
+        return column
+    return parse_mcx_datetime_series(column, errors='raise')
+
+
+def _to_float(column: pd.Series) -> pd.Series:
+    return pd.to_numeric(column).astype('float64')
+
+
+def _to_integer(column: pd.Series) -> pd.Series:
+    # columns holding NaN or fractions stay float
+    column = pd.to_numeric(column)
+    if pd.api.types.is_integer_dtype(column):
+        return column.astype('int64')
+    if pd.api.types.is_float_dtype(column) and column.notna().all() and (column == column.round()).all():
+        return column.astype('int64')
+    return column
+
+
+_CONVERTERS = {
+    'category': _to_category,
+    'datetime': _to_datetime,
+    'float': _to_float,
+    'mcx_datetime': _to_mcx_datetime,
+    'integer': _to_integer,
+}
+
+
+def apply_schema(data_df: pd.DataFrame, name: str) -> pd.DataFrame:
+    """
+    convert the columns of data_df in place to the dtypes registered for an endpoint
+    columns missing from the frame or which cannot be converted are left untouched
+    :param data_df: panda dataframe returned by a fetcher
+    :param name: key of SCHEMAS, eg: 'market_watch'
+    :return: the same panda dataframe
+    """
+    schema = SCHEMAS.get(name, {})
+    for kind, columns in schema.items():
+        converter = _CONVERTERS[kind]
+        for column in columns:
+            if column not in data_df.columns:
+                continue
+            try:
+                data_df[column] = converter(data_df[column])
+            except (TypeError, ValueError, OverflowError):
+                continue
+    return data_df
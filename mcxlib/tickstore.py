@@ -0,0 +1,215 @@
+"""
+columnar tick store for recorded market watch and option chain snapshots
+
+snapshots are buffered in memory and appended as parquet files partitioned by date and commodity:
+
+    <root>/<dataset>/date=2023-11-02/commodity=GOLD/part-<id>-0.parquet
+
+    from mcxlib.tickstore import TickRecorder, read_ticks
+
+    with TickRecorder('~/mcx-ticks') as recorder:
+        recorder.record_market_watch()
+        recorder.record_option_chain('CRUDEOIL', '17NOV2023')
+
+    ticks = read_ticks('~/mcx-ticks', 'market_watch', start='2023-11-01', end='2023-11-30',
+                       commodities=['GOLD'], columns=['SnapshotTime', 'ContractName', 'LTP'])
+
+requires pyarrow (pip install mcxlib[parquet])
+"""
+from datetime import datetime
+import os
+import threading
+import uuid
+
+import pandas as pd
+
+from mcxlib.libutil import MCX_TIMEZONE
+from mcxlib.market_data import get_market_watch, get_option_chain
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.fs as pafs
+except ImportError:
+    pa = None
+
+PARTITION_COLUMNS = ['date', 'commodity']
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("pyarrow is required for the tick store : pip install mcxlib[parquet]")
+
+
+def _partitioning():
+    return ds.partitioning(pa.schema([('date', pa.string()), ('commodity', pa.string())]), flavor='hive')
+
+
+class TickStoreWriter:
+    """
+    buffered append writer for one dataset of the tick store
+    :param root: store directory
+    :param dataset: dataset name, eg: 'market_watch' or 'option_chain'
+    :param buffer_rows: rows kept in memory before they are written out
+    :param commodity_column: column holding the commodity used for partitioning
+    """
+
+    def __init__(self, root: str, dataset: str, buffer_rows: int = 100000, commodity_column: str = 'Symbol'):
+        _require_pyarrow()
+        self.path = os.path.join(os.path.abspath(os.path.expanduser(root)), dataset)
+        self.buffer_rows = buffer_rows
+        self.commodity_column = commodity_column
+        self._buffer = []
+        self._buffered_rows = 0
+        self._lock = threading.Lock()
+
+    def append(self, data_df: pd.DataFrame, snapshot_time: datetime = None, commodity: str = None):
+        """
+        add one snapshot to the buffer, flushing when it is full
+        :param data_df: market watch / option chain panda dataframe
+        :param snapshot_time: time of the snapshot, defaults to now in IST
+        :param commodity: commodity for every row, defaults to the commodity_column values
+        """
+        if data_df.empty:
+            return
+        snapshot_time = pd.Timestamp(snapshot_time or datetime.now(MCX_TIMEZONE))
+        if snapshot_time.tzinfo is None:
+            snapshot_time = snapshot_time.tz_localize(MCX_TIMEZONE)
+        snapshot_time = snapshot_time.tz_convert(MCX_TIMEZONE)
+        data_df = data_df.copy()
+        data_df.insert(0, 'SnapshotTime', snapshot_time)
+        data_df['date'] = snapshot_time.strftime('%Y-%m-%d')
+        if commodity is not None:
+            data_df['commodity'] = commodity
+        elif self.commodity_column in data_df.columns:
+            data_df['commodity'] = data_df[self.commodity_column].astype(object).fillna('UNKNOWN').astype(str)
+        else:
+            data_df['commodity'] = 'UNKNOWN'
+        with self._lock:
+            self._buffer.append(data_df)
+            self._buffered_rows += len(data_df)
+            full = self._buffered_rows >= self.buffer_rows
+        if full:
+            self.flush()
+
+    def flush(self):
+        """
+        write the buffered snapshots as new parquet files
+        """
+        with self._lock:
+            frames, self._buffer, self._buffered_rows = self._buffer, [], 0
+        if not frames:
+            return
+        data_df = pd.concat(frames, ignore_index=True)
+        for column in data_df.columns:
+            # categories differ between snapshots, store them as plain values
+            if isinstance(data_df[column].dtype, pd.CategoricalDtype):
+                data_df[column] = data_df[column].astype(object)
+            # one integer width in every file, read_ticks cannot unify int8 and int32 parts of a column
+            elif pd.api.types.is_integer_dtype(data_df[column].dtype) and data_df[column].dtype != 'int64':
+                data_df[column] = data_df[column].astype('int64')
+        table = pa.Table.from_pandas(data_df, preserve_index=False)
+        ds.write_dataset(table, self.path, format='parquet', partitioning=_partitioning(),
+                         basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+                         existing_data_behavior='overwrite_or_ignore')
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class TickRecorder:
+    """
+    recording mode: fetch market watch / option chain snapshots and append them to a tick store
+    :param root: store directory
+    :param buffer_rows: rows buffered per dataset before writing
+    """
+
+    def __init__(self, root: str, buffer_rows: int = 100000):
+        self.market_watch = TickStoreWriter(root, 'market_watch', buffer_rows=buffer_rows)
+        self.option_chain = TickStoreWriter(root, 'option_chain', buffer_rows=buffer_rows)
+
+    def record_market_watch(self, snapshot=None) -> pd.DataFrame:
+        data_df = get_market_watch(snapshot=snapshot)
+        self.market_watch.append(data_df)
+        return data_df
+
+    def record_option_chain(self, commodity: str, expiry: str) -> pd.DataFrame:
+        data_df = get_option_chain(commodity=commodity, expiry=expiry)
+        recorded = data_df.assign(Commodity=commodity, Expiry=expiry)
+        self.option_chain.append(recorded, commodity=commodity)
+        return data_df
+
+    def flush(self):
+        self.market_watch.flush()
+        self.option_chain.flush()
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _as_timestamp(value):
+    value = pd.Timestamp(value)
+    return value.tz_localize(MCX_TIMEZONE) if value.tzinfo is None else value
+
+
+def read_ticks(root: str, dataset: str = 'market_watch', start=None, end=None, commodities: list = None,
+               columns: list = None, filters=None) -> pd.DataFrame:
+    """
+    load a time slice of a tick store dataset, reading only the matching partitions, row groups and columns
+    files are memory mapped instead of read into RAM
+    :param root: store directory
+    :param dataset: 'market_watch' or 'option_chain'
+    :param start: first snapshot time to include (date or datetime, IST when naive)
+    :param end: last snapshot time to include (a bare date includes that whole day)
+    :param commodities: list of commodities to load
+    :param columns: columns to load, None for all
+    :param filters: extra pyarrow dataset expression, eg: ds.field('LTP') > 100
+    :return: panda dataframe sorted by SnapshotTime
+    """
+    _require_pyarrow()
+    path = os.path.join(os.path.abspath(os.path.expanduser(root)), dataset)
+    if not os.path.isdir(path):
+        raise ValueError(f" No recorded {dataset} ticks found in {root}")
+    dataset_ = ds.dataset(path, format='parquet', partitioning=_partitioning(),
+                          filesystem=pafs.LocalFileSystem(use_mmap=True))
+
+    expression = None
+
+    def _and(condition):
+        return condition if expression is None else expression & condition
+
+    if start is not None:
+        start = _as_timestamp(start)
+        expression = _and(ds.field('date') >= start.strftime('%Y-%m-%d'))
+        expression = _and(ds.field('SnapshotTime') >= pa.scalar(start.tz_convert('UTC').to_pydatetime(),
+                                                                type=pa.timestamp('us', tz='UTC')))
+    if end is not None:
+        if isinstance(end, str) and len(end) <= 10:
+            end = _as_timestamp(end) + pd.Timedelta(days=1) - pd.Timedelta(microseconds=1)
+        end = _as_timestamp(end)
+        expression = _and(ds.field('date') <= end.strftime('%Y-%m-%d'))
+        expression = _and(ds.field('SnapshotTime') <= pa.scalar(end.tz_convert('UTC').to_pydatetime(),
+                                                                type=pa.timestamp('us', tz='UTC')))
+    if commodities:
+        expression = _and(ds.field('commodity').isin([str(commodity) for commodity in commodities]))
+    if filters is not None:
+        expression = _and(filters)
+
+    table = dataset_.to_table(columns=columns, filter=expression)
+    data_df = table.to_pandas()
+    if 'SnapshotTime' in data_df.columns:
+        data_df['SnapshotTime'] = data_df['SnapshotTime'].dt.tz_convert(MCX_TIMEZONE)
+        data_df.sort_values('SnapshotTime', kind='stable', inplace=True, ignore_index=True)
+    return data_df
@@ -0,0 +1,310 @@
+"""
+MCX trading calendar: weekdays which are not full day exchange holidays
+
+range fetchers (get_bhav_copy_range, get_historical_date_wise_data, the mcxlib export command) take their dates from
+here, so weekends and holidays are skipped before any request is sent. holidays come from the list bundled with
+mcxlib (BUNDLED_HOLIDAYS), the JSON file the calendar persists and dates added with add_holidays. downloading the
+list from MCX is opt-in (fetch=True) until the holiday endpoint is verified
+
+    import mcxlib
+
+    calendar = mcxlib.get_trading_calendar()
+    calendar.trading_dates('20231101', '20231130')        # ['20231101', '20231102', '20231103', '20231106', ...]
+    calendar.is_trading_day(['20231112', '20231113'])     # array([False,  True])
+
+    mcxlib.get_trading_calendar().add_holidays(['20231114'])      # kept in ~/.cache/mcxlib/holidays.json
+    mcxlib.configure_trading_calendar(fetch=True)                 # also download the lists from MCX
+
+holidays on which MCX still trades the evening session are trading days, their bhav copies are published
+"""
+from __future__ import annotations
+
+from datetime import date, datetime
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+
+from mcxlib.cache import DEFAULT_CACHE_DIR
+from mcxlib.lazy import lazy_module
+from mcxlib.libutil import MCX_TIMEZONE, CalenderNotFound, get_headers, post_json, records_to_frame
+
+np = lazy_module('numpy')
+
+DEFAULT_CALENDAR_PATH = os.path.join(DEFAULT_CACHE_DIR, 'holidays.json')
+HOLIDAY_URL = "https://www.mcxindia.com/backpage.aspx/GetTradingHolidays"
+# seconds before a year whose holiday list could not be downloaded is tried again
+RETRY_AFTER = 300
+# full day closures (morning and evening sessions), holidays with an open evening session are trading days
+BUNDLED_HOLIDAYS = {
+    2021: ['20210126', '20210402'],
+    2022: ['20220126', '20220415', '20220815'],
+    2023: ['20230126', '20230407', '20230815', '20231002', '20231225'],
+    2024: ['20240126', '20240329', '20240815', '20241002', '20241225'],
+    2025: ['20250418', '20250815', '20251002', '20251225'],
+    2026: ['20260126', '20260403', '20261002', '20261225'],
+}
+
+_MCX_DATE_PATTERN = re.compile(r"/Date\((-?\d+)(?:[+-]\d+)?\)/")
+_DATE_FORMATS = ('%d %b %Y', '%d-%b-%Y', '%d %B %Y', '%d-%B-%Y', '%d/%m/%Y', '%Y-%m-%d', '%Y%m%d', '%A, %B %d, %Y')
+
+logger = logging.getLogger(__name__)
+
+
+def _holiday_records(year: int) -> list:
+    headers = get_headers(use_for='trading-holidays')
+    try:
+        data_dict = post_json(HOLIDAY_URL, headers=headers, payload=json.dumps({"Year": f"{year}"}))
+        return data_dict['d']['Data']
+    except Exception as e:
+        raise CalenderNotFound(f" No trading holidays found for {year} : MCX error:{e}")
+
+
+def trading_holiday_calendar(year: int = None):
+    """
+    get the MCX trading holiday list as published for a year
+    :param year: calendar year, defaults to the current year
+    :return: panda dataframe
+    """
+    year = year or datetime.now(MCX_TIMEZONE).year
+    return records_to_frame(_holiday_records(year), drop=['__type', 'ExtensionData'], errors='ignore', url=HOLIDAY_URL)
+
+
+def _parse_holiday_date(value) -> str:
+    text = str(value).strip()
+    matched = _MCX_DATE_PATTERN.search(text)
+    if matched:
+        return datetime.fromtimestamp(int(matched.group(1)) / 1000, MCX_TIMEZONE).strftime('%Y%m%d')
+    for date_format in _DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format).strftime('%Y%m%d')
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid holiday date value: {value}")
+
+
+def parse_holidays(records: list) -> list:
+    """
+    full day closures from MCX holiday records, days with an open evening session are left out
+    :param records: holiday rows as returned by MCX, the first non empty field with 'date' in its name is used
+    :return: sorted list of YYYYMMDD dates
+    """
+    holidays = set()
+    for record in records:
+        evening = next((value for key, value in record.items() if 'evening' in key.lower()), None)
+        if evening is not None and 'open' in str(evening).lower():
+            continue
+        value = next((value for key, value in record.items() if 'date' in key.lower() and value), None)
+        if value is None:
+            raise CalenderNotFound(f" No date field found in holiday record : {record}")
+        holidays.add(_parse_holiday_date(value))
+    return sorted(holidays)
+
+
+def _to_day(value):
+    """
+    YYYYMMDD string, date, datetime or numpy datetime64 as numpy datetime64[D]
+    """
+    if isinstance(value, str):
+        try:
+            value = datetime.strptime(value, '%Y%m%d')
+        except ValueError:
+            raise ValueError(f" date should be in YYYYMMDD format : {value}")
+    if isinstance(value, datetime):
+        value = value.date()
+    return np.datetime64(value, 'D')
+
+
+def _day_text(value) -> str:
+    return str(_to_day(value)).replace('-', '')
+
+
+def _year(day) -> int:
+    return int(day.astype('datetime64[Y]').astype(int)) + 1970
+
+
+class TradingCalendar:
+    """
+    MCX trading days from the bundled, persisted and added holiday lists
+    :param path: JSON file the holiday lists are persisted to, None keeps them in memory only
+    :param fetch: if True the list of each year is downloaded from MCX once and replaces the bundled one,
+                  if False (default) nothing is downloaded
+    :param refresh_after: seconds after which the list of the current or a future year is downloaded again,
+                          lists of past years never change
+    """
+
+    def __init__(self, path: str = DEFAULT_CALENDAR_PATH, fetch: bool = False, refresh_after: float = 24 * 3600):
+        self.path = os.path.abspath(os.path.expanduser(path)) if path else None
+        self.fetch = fetch
+        self.refresh_after = refresh_after
+        # year -> {'holidays': [YYYYMMDD, ...], 'fetched_at': epoch seconds}
+        self._years = {}
+        self._added = set()
+        self._failed_at = {}
+        self._busday_calendars = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if self.path is None or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding='utf-8') as fh:
+                state = json.load(fh)
+            self._years = {int(year): entry for year, entry in state.get('years', {}).items()}
+            self._added = set(state.get('added', []))
+        except (OSError, ValueError) as e:
+            logger.warning("could not read trading calendar %s: %s", self.path, e)
+
+    def _save(self):
+        if self.path is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix='.tmp')
+            with os.fdopen(handle, 'w', encoding='utf-8') as fh:
+                json.dump({'years': {str(year): entry for year, entry in sorted(self._years.items())},
+                           'added': sorted(self._added)}, fh, indent=1)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logger.warning("could not store trading calendar %s: %s", self.path, e)
+
+    def _is_stale(self, year: int, now: float) -> bool:
+        entry = self._years.get(year)
+        if entry is None:
+            return True
+        return year >= datetime.now(MCX_TIMEZONE).year and now - entry['fetched_at'] > self.refresh_after
+
+    def _ensure_years(self, years: range):
+        if not self.fetch:
+            return
+        now = time.time()
+        with self._lock:
+            for year in years:
+                if not self._is_stale(year, now) or now - self._failed_at.get(year, -RETRY_AFTER) < RETRY_AFTER:
+                    continue
+                try:
+                    holidays = parse_holidays(_holiday_records(year))
+                except (CalenderNotFound, ValueError) as e:
+                    if year not in self._years:
+                        logger.warning(f"trading holidays for {year} could not be downloaded, "
+                                       f"the bundled list is used : {e}")
+                    self._failed_at[year] = now
+                    continue
+                # the list of one year may carry dates of the next, keep what belongs to the requested year
+                self._years[year] = {'holidays': [day for day in holidays if day.startswith(str(year))],
+                                     'fetched_at': now}
+                self._failed_at.pop(year, None)
+                self._busday_calendars.clear()
+                self._save()
+
+    def add_holidays(self, dates: list):
+        """
+        mark extra dates as non trading days (kept in the persisted file)
+        :param dates: list of YYYYMMDD dates
+        """
+        days = {_day_text(day) for day in dates}
+        with self._lock:
+            self._added |= days
+            self._busday_calendars.clear()
+            self._save()
+
+    def holidays(self, start_year: int, end_year: int) -> list:
+        """
+        :return: sorted list of YYYYMMDD holidays between start_year and end_year (both inclusive)
+        """
+        years = range(start_year, end_year + 1)
+        self._ensure_years(years)
+        with self._lock:
+            # a downloaded list replaces the bundled one of its year
+            days = {day for year in years
+                    for day in self._years.get(year, {}).get('holidays', BUNDLED_HOLIDAYS.get(year, []))}
+            days |= {day for day in self._added if int(day[:4]) in years}
+        return sorted(days)
+
+    def _busday_calendar(self, start_year: int, end_year: int, holidays: tuple = ()):
+        key = (start_year, end_year, holidays)
+        busday_calendar = self._busday_calendars.get(key)
+        if busday_calendar is None:
+            days = self.holidays(start_year, end_year) + list(holidays)
+            busday_calendar = np.busdaycalendar(weekmask='1111100',
+                                                holidays=np.array([_to_day(day) for day in days], dtype='datetime64[D]'))
+            if len(self._busday_calendars) >= 64:
+                self._busday_calendars.clear()
+            self._busday_calendars[key] = busday_calendar
+        return busday_calendar
+
+    def trading_days(self, start_date, end_date, holidays: list = None):
+        """
+        trading days between start_date and end_date (both inclusive)
+        :param start_date: YYYYMMDD string or date
+        :param end_date: YYYYMMDD string or date
+        :param holidays: extra YYYYMMDD dates to skip for this call only
+        :return: numpy datetime64[D] array
+        """
+        start, end = _to_day(start_date), _to_day(end_date)
+        if end < start:
+            raise ValueError('end_date should not be before start_date')
+        days = np.arange(start, end + np.timedelta64(1, 'D'), dtype='datetime64[D]')
+        extra = tuple(sorted({_day_text(day) for day in holidays or []}))
+        busday_calendar = self._busday_calendar(_year(start), _year(end), extra)
+        return days[np.is_busday(days, busdaycal=busday_calendar)]
+
+    def trading_dates(self, start_date, end_date, holidays: list = None) -> list:
+        """
+        trading_days as YYYYMMDD strings, the format the fetchers take
+        """
+        days = self.trading_days(start_date, end_date, holidays)
+        return np.char.replace(np.datetime_as_string(days, unit='D'), '-', '').tolist()
+
+    def is_trading_day(self, dates):
+        """
+        :param dates: one date or a list of YYYYMMDD strings / dates
+        :return: bool for one date, numpy bool array for a list
+        """
+        single = isinstance(dates, (str, date, np.datetime64))
+        days = np.array([_to_day(day) for day in ([dates] if single else dates)], dtype='datetime64[D]')
+        if not len(days):
+            return np.array([], dtype=bool)
+        busday_calendar = self._busday_calendar(_year(days.min()), _year(days.max()))
+        result = np.is_busday(days, busdaycal=busday_calendar)
+        return bool(result[0]) if single else result
+
+
+_calendar = None
+_calendar_lock = threading.Lock()
+
+
+def get_trading_calendar() -> TradingCalendar:
+    """
+    get the shared trading calendar used by the range fetchers, created on first use
+    """
+    global _calendar
+    if _calendar is None:
+        with _calendar_lock:
+            if _calendar is None:
+                _calendar = TradingCalendar()
+    return _calendar
+
+
+def set_trading_calendar(calendar: TradingCalendar):
+    """
+    replace the shared trading calendar, None recreates the default one on next use
+    """
+    global _calendar
+    with _calendar_lock:
+        _calendar = calendar
+
+
+def configure_trading_calendar(**kwargs) -> TradingCalendar:
+    """
+    rebuild the shared trading calendar
+    :param kwargs: any of the TradingCalendar parameters
+    :return: the new shared calendar
+    """
+    calendar = TradingCalendar(**kwargs)
+    set_trading_calendar(calendar)
+    return calendar
@@ -13,7 +13,9 @@ setuptools.setup(
     long_description_content_type="text/markdown", author='RuchiTanmay',
     author_email='ruchitanmay@gmail.com',
     url='https://github.com/RuchiTanmay/mcxlib',
-    install_requires=['requests', 'pandas'],
+    install_requires=['requests', 'pandas', 'openpyxl'],
+    extras_require={'parquet': ['pyarrow'], 'fast': ['orjson', 'python-calamine', 'pandas>=2.2']},
+    entry_points={'console_scripts': ['mcxlib=mcxlib.cli:main']},
     keywords=['mcx', 'mcx india', 'python', 'mcx data', 'mcx history data', 'commodity', 'mcx python',
               'mcx python library', 'mcx library'],
     classifiers=[
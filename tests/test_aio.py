@@ -0,0 +1,115 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import mcxlib
+import mcxlib.market_data as market_data
+from mcxlib import aio, libutil, trading_calendar
+
+
+class AioTest(unittest.TestCase):
+    def tearDown(self):
+        aio.set_concurrency(8)
+
+    def test_every_public_fetcher_has_an_awaitable(self):
+        for name in mcxlib.__all__:
+            func = getattr(market_data, name, None)
+            if name.startswith("get_") and getattr(func, "__module__", None) == market_data.__name__:
+                self.assertTrue(asyncio.iscoroutinefunction(getattr(aio, name)), name)
+
+    def test_gather_respects_concurrency_limit(self):
+        aio.set_concurrency(3)
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0}
+
+        def fake_post_json(url, headers, payload, timeout=30):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.02)
+            with lock:
+                state["active"] -= 1
+            return {"d": {"Data": [{"__type": "HeatMap", "Dttm": "", "Symbol": "GOLD"}]}}
+
+        async def fan_out():
+            return await asyncio.gather(*[aio.get_heat_map() for _ in range(12)])
+
+        with patch.object(market_data, "post_json", side_effect=fake_post_json):
+            results = asyncio.run(fan_out())
+
+        self.assertEqual(len(results), 12)
+        self.assertEqual(results[0].loc[0, "Symbol"], "GOLD")
+        self.assertLessEqual(state["peak"], 3)
+
+    def test_bulk_fetchers_share_the_concurrency_limit(self):
+        aio.set_concurrency(4)
+        trading_calendar.set_trading_calendar(trading_calendar.TradingCalendar(path=None, fetch=False))
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0}
+
+        def fake_post_json(url, headers, payload, timeout=None):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.02)
+            with lock:
+                state["active"] -= 1
+            return {"d": {"Data": [{"__type": "HeatMap", "Dttm": "", "Symbol": "GOLD", "Close": 1.0}]}}
+
+        async def fan_out():
+            return await asyncio.gather(aio.get_bhav_copy_range("20230102", "20230113", workers=16),
+                                        *[aio.get_heat_map() for _ in range(6)])
+
+        try:
+            with patch.object(market_data, "post_json", side_effect=fake_post_json):
+                results = asyncio.run(fan_out())
+        finally:
+            trading_calendar.set_trading_calendar(None)
+
+        self.assertEqual(len(results[0]), 10)
+        self.assertLessEqual(state["peak"], 4)
+
+    def test_generators_are_drained_inside_the_limit(self):
+        trading_calendar.set_trading_calendar(trading_calendar.TradingCalendar(path=None, fetch=False))
+        response = {"d": {"Data": [{"__type": "Bhavcopy", "Symbol": "GOLD", "Close": 1.0}]}}
+        try:
+            with patch.object(market_data, "post_json", return_value=response) as post_json:
+                results = asyncio.run(aio.get_bhav_copy_range("20230102", "20230106", as_generator=True))
+                calls = post_json.call_count
+        finally:
+            trading_calendar.set_trading_calendar(None)
+
+        self.assertIsInstance(results, list)
+        self.assertEqual(calls, 5)
+        self.assertEqual(sorted(trade_date for trade_date, _, _ in results),
+                         ["20230102", "20230103", "20230104", "20230105", "20230106"])
+
+    def test_set_concurrency_resizes_the_shared_client(self):
+        client = libutil.MCXClient(pool_maxsize=2)
+        libutil.set_client(client)
+        try:
+            session = client.session
+            previous = session.get_adapter("https://www.mcxindia.com")
+            pool = previous.poolmanager.connection_from_url("https://www.mcxindia.com")
+            aio.set_concurrency(12)
+
+            self.assertIs(libutil.get_client(), client)
+            self.assertIs(client.session, session)
+            self.assertEqual(client.pool_maxsize, 12)
+            self.assertEqual(session.get_adapter("https://www.mcxindia.com")._pool_maxsize, 12)
+            # the replaced adapter is closed, its pooled sockets do not leak
+            self.assertIsNone(pool.pool)
+            self.assertEqual(len(previous.poolmanager.pools), 0)
+        finally:
+            libutil.set_client(None)
+
+    def test_errors_propagate_to_the_awaiting_caller(self):
+        with patch.object(market_data, "post_json", side_effect=RuntimeError("down")):
+            with self.assertRaises(ValueError):
+                asyncio.run(aio.get_top_gainers())
+
+
+if __name__ == "__main__":
+    unittest.main()
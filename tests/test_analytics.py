@@ -0,0 +1,76 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from mcxlib import analytics
+
+
+class AnalyticsTest(unittest.TestCase):
+    def test_norm_cdf_matches_known_values(self):
+        np.testing.assert_allclose(
+            analytics.norm_cdf([-1.96, 0.0, 1.0, 8.0]),
+            [0.024997895148220435, 0.5, 0.8413447460685429, 0.9999999999999993],
+            rtol=1e-12,
+        )
+
+    def test_implied_volatility_round_trips_black76_prices(self):
+        strikes = np.array([5500.0, 6000.0, 6500.0, 7000.0, 7500.0])
+        sigma = np.array([0.55, 0.45, 0.4, 0.42, 0.5])
+        is_call = np.array([True, False, True, False, True])
+        prices = analytics.black76_price(6500.0, strikes, 0.05, sigma, rate=0.065, is_call=is_call)
+
+        solved = analytics.implied_volatility(prices, 6500.0, strikes, 0.05, rate=0.065, is_call=is_call)
+
+        np.testing.assert_allclose(solved, sigma, atol=1e-6)
+
+    def test_implied_volatility_is_nan_below_intrinsic(self):
+        self.assertTrue(np.isnan(analytics.implied_volatility(100.0, 6500.0, 6000.0, 0.05, is_call=True)))
+
+    def test_call_put_delta_parity(self):
+        result = {
+            side: analytics.greeks(6500.0, 6400.0, 0.1, 0.4, rate=0.05, is_call=is_call)
+            for side, is_call in (("CE", True), ("PE", False))
+        }
+
+        self.assertAlmostEqual(
+            float(result["CE"]["delta"] - result["PE"]["delta"]), float(np.exp(-0.05 * 0.1)), places=12
+        )
+        self.assertAlmostEqual(float(result["CE"]["gamma"]), float(result["PE"]["gamma"]), places=12)
+
+    def test_max_pain_and_pcr_per_chain(self):
+        chain_df = pd.DataFrame({
+            "Commodity": ["GOLD"] * 3 + ["ZINC"] * 2,
+            "Expiry": ["24NOV2023"] * 3 + ["29NOV2023"] * 2,
+            "CE_StrikePrice": [100.0, 110.0, 120.0, 250.0, 260.0],
+            "CE_OpenInterest": [10, 50, 100, 5, 0],
+            "PE_OpenInterest": [100, 50, 10, 0, 5],
+        })
+
+        self.assertEqual(analytics.max_pain(chain_df)[("GOLD", "24NOV2023")], 110.0)
+        self.assertAlmostEqual(analytics.put_call_ratio(chain_df)[("ZINC", "29NOV2023")], 1.0)
+        self.assertEqual(analytics.max_pain(chain_df.iloc[:3].drop(columns=["Commodity", "Expiry"])), 110.0)
+
+    def test_option_surface_solves_every_strike(self):
+        strikes = np.array([6000.0, 6500.0, 7000.0])
+        as_of = pd.Timestamp("2023-11-01 10:00", tz=analytics.MCX_TIMEZONE)
+        years = (pd.Timestamp("2023-11-17 23:30", tz=analytics.MCX_TIMEZONE) - as_of).total_seconds() / (365 * 86400)
+        chain_df = pd.DataFrame({
+            "ExpiryDate": "17NOV2023",
+            "UnderlyingValue": 6500.0,
+            "CE_StrikePrice": strikes,
+            "CE_LTP": analytics.black76_price(6500.0, strikes, years, 0.4, is_call=True),
+            "PE_LTP": analytics.black76_price(6500.0, strikes, years, 0.4, is_call=False),
+            "CE_OpenInterest": [10, 20, 30],
+            "PE_OpenInterest": [30, 20, 0],
+        })
+
+        surface = analytics.option_surface(chain_df, as_of=as_of)
+
+        np.testing.assert_allclose(surface["CE_IV"], 0.4, atol=1e-6)
+        np.testing.assert_allclose(surface["PE_IV"], 0.4, atol=1e-6)
+        self.assertEqual(list(surface["StrikePCR"]), [3.0, 1.0, 0.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
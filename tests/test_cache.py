@@ -0,0 +1,157 @@
+import os
+import tempfile
+import unittest
+from io import BytesIO
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+
+import mcxlib
+import mcxlib.market_data as market_data
+from mcxlib import cache
+
+
+class DiskCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.disk_cache = mcxlib.enable_disk_cache(self.tmp_dir.name)
+        self.response = {"d": {"Data": [{"__type": "Bhavcopy", "Symbol": "GOLD", "Close": 61000.5}]}}
+
+    def tearDown(self):
+        mcxlib.disable_disk_cache()
+        self.tmp_dir.cleanup()
+
+    def test_past_bhav_copy_is_served_from_disk(self):
+        with patch.object(market_data, "post_json", return_value=self.response) as post_json:
+            first = market_data.get_bhav_copy(trade_date="20230102")
+            second = market_data.get_bhav_copy(trade_date="20230102")
+
+        post_json.assert_called_once()
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_live_dates_bypass_the_cache(self):
+        with patch.object(market_data, "post_json", return_value=self.response) as post_json:
+            market_data.get_bhav_copy(trade_date="20990101")
+            market_data.get_bhav_copy(trade_date="20990101")
+
+        self.assertEqual(post_json.call_count, 2)
+
+    def test_is_past_date_uses_day_or_month_granularity(self):
+        self.assertTrue(cache.is_past_date("20230102"))
+        self.assertFalse(cache.is_past_date("20990101"))
+        self.assertTrue(cache.is_past_date("202301", "%Y%m"))
+        self.assertTrue(cache.is_past_month(2023, 9))
+
+    def test_cache_is_opt_in(self):
+        mcxlib.disable_disk_cache()
+        with patch.object(market_data, "post_json", return_value=self.response) as post_json:
+            market_data.get_bhav_copy(trade_date="20230102")
+            market_data.get_bhav_copy(trade_date="20230102")
+
+        self.assertEqual(post_json.call_count, 2)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        data_df = pd.DataFrame({"value": range(1000)})
+        self.disk_cache.set("test", {"n": 1}, data_df)
+        entry_size = self.disk_cache.size
+        self.disk_cache.max_bytes = entry_size * 2
+        self.disk_cache.set("test", {"n": 2}, data_df)
+        for entry_path in self.disk_cache._entry_paths("test", {"n": 1}):
+            if os.path.exists(entry_path):
+                os.utime(entry_path, (0, 0))
+        self.disk_cache.set("test", {"n": 3}, data_df)
+
+        self.assertIsNone(self.disk_cache.get("test", {"n": 1}))
+        self.assertIsNotNone(self.disk_cache.get("test", {"n": 2}))
+        self.assertIsNotNone(self.disk_cache.get("test", {"n": 3}))
+
+    def test_writes_under_the_cap_do_not_scan_the_directory(self):
+        data_df = pd.DataFrame({"value": range(1000)})
+        self.disk_cache.set("test", {"n": 1}, data_df)
+        with patch.object(self.disk_cache, "_entries", wraps=self.disk_cache._entries) as entries:
+            for n in range(2, 6):
+                self.disk_cache.set("test", {"n": n}, data_df)
+            self.disk_cache.set("test", {"n": 2}, data_df)
+
+        entries.assert_not_called()
+        self.assertEqual(self.disk_cache._size, self.disk_cache.size)
+
+
+class ReportStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.previous_store = cache.get_report_store()
+        self.report_store = mcxlib.enable_report_cache(self.tmp_dir.name)
+        content = BytesIO()
+        pd.DataFrame({"Commodity": ["GOLD", "SILVER"], "Delivery": [10, 20]}).to_excel(content, index=False)
+        self.content = content.getvalue()
+        self.client = MagicMock()
+
+    def tearDown(self):
+        cache._report_store = self.previous_store
+        self.tmp_dir.cleanup()
+
+    def _respond(self, status_code, headers=None):
+        response = MagicMock(status_code=status_code, ok=status_code < 400, content=self.content,
+                             headers=headers or {})
+        self.client.get.return_value = response
+
+    def _fetch(self):
+        with patch.object(cache, "get_client", return_value=self.client):
+            return market_data.get_ccl_delivery(year=2099, month_number=1)
+
+    def test_unchanged_report_is_revalidated_not_reparsed(self):
+        self._respond(200, {"ETag": '"v1"', "Last-Modified": "Mon, 02 Oct 2023 10:00:00 GMT"})
+        first = self._fetch()
+        self._respond(304)
+        with patch.object(market_data.pd, "read_excel") as read_excel:
+            second = self._fetch()
+
+        read_excel.assert_not_called()
+        pd.testing.assert_frame_equal(first, second)
+        headers = self.client.get.call_args.kwargs["headers"]
+        self.assertEqual(headers, {"If-None-Match": '"v1"', "If-Modified-Since": "Mon, 02 Oct 2023 10:00:00 GMT"})
+        self.assertEqual(self.report_store.stats(), {"not_modified": 1, "downloaded": 1, "unchanged": 0, "parsed": 1})
+
+    def test_parsed_frame_is_reloaded_from_disk(self):
+        self._respond(200, {"ETag": '"v1"'})
+        first = self._fetch()
+        mcxlib.enable_report_cache(self.tmp_dir.name)
+        self._respond(304)
+        with patch.object(market_data.pd, "read_excel") as read_excel:
+            second = self._fetch()
+
+        read_excel.assert_not_called()
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_same_bytes_without_validators_skip_the_parse(self):
+        self._respond(200)
+        self._fetch()
+        self._fetch()
+
+        self.assertIsNone(self.client.get.call_args.kwargs["headers"])
+        self.assertEqual(self.report_store.stats()["unchanged"], 1)
+        self.assertEqual(self.report_store.stats()["parsed"], 1)
+
+    def test_http_error_raises(self):
+        self._respond(404)
+
+        with self.assertRaises(ValueError):
+            self._fetch()
+
+    def test_parsed_frames_are_bounded(self):
+        report_store = mcxlib.enable_report_cache(self.tmp_dir.name, max_frames=2)
+        self._respond(200)
+        with patch.object(cache, "get_client", return_value=self.client):
+            for month in (1, 2, 3):
+                market_data.get_ccl_delivery(year=2099, month_number=month)
+
+        bases = [report_store._base(call.args[0]) for call in self.client.get.call_args_list]
+        self.assertEqual([base for base, _ in report_store._frames], bases[1:])
+
+    def test_report_cache_is_off_by_default(self):
+        self.assertIsNone(self.previous_store)
+
+
+if __name__ == "__main__":
+    unittest.main()
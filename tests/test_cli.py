@@ -0,0 +1,135 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+import mcxlib.market_data as market_data
+from mcxlib import cli, trading_calendar
+
+
+def fake_bhav_copy(trade_date, instrument="ALL"):
+    if trade_date == "20231103":
+        raise ValueError(" No Data Found / Invalid parameters : MCX error:timeout")
+    return pd.DataFrame({"Symbol": ["GOLD", "SILVER"], "Instrument": [instrument] * 2, "Date": [trade_date] * 2})
+
+
+class ExportTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.job = {"dataset": "bhav_copy", "start": "20231101", "end": "20231106", "instrument": "FUTCOM"}
+        trading_calendar.set_trading_calendar(trading_calendar.TradingCalendar(path=None, fetch=False))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        trading_calendar.set_trading_calendar(None)
+
+    def test_export_checkpoints_and_resumes(self):
+        with patch.object(market_data, "get_bhav_copy", autospec=True, side_effect=fake_bhav_copy) as fetch:
+            first = cli.run_export([self.job], output_dir=self.tmp_dir.name, workers=2)
+            fetch.reset_mock()
+            second = cli.run_export([self.job], output_dir=self.tmp_dir.name, workers=2)
+
+        self.assertEqual((first["total"], first["exported"], list(first["failed"])), (4, 3, ["bhav_copy/20231103?instrument=FUTCOM"]))
+        # only the failed day is fetched again
+        fetch.assert_called_once_with(trade_date="20231103", instrument="FUTCOM")
+        self.assertEqual((second["skipped"], second["exported"]), (3, 0))
+        data_df = pd.read_csv(os.path.join(self.tmp_dir.name, "bhav_copy", "20231106.csv"))
+        self.assertEqual(list(data_df["Instrument"]), ["FUTCOM", "FUTCOM"])
+        with open(os.path.join(self.tmp_dir.name, cli.CHECKPOINT_FILE)) as fh:
+            checkpoint = json.load(fh)
+        self.assertEqual(checkpoint["done"]["bhav_copy/20231101?instrument=FUTCOM"],
+                         {"file": "bhav_copy/20231101.csv", "rows": 2})
+        self.assertIn("bhav_copy/20231103?instrument=FUTCOM", checkpoint["failed"])
+
+    def test_changed_options_are_not_resumed_from_the_checkpoint(self):
+        with patch.object(market_data, "get_bhav_copy", autospec=True, side_effect=fake_bhav_copy) as fetch:
+            cli.run_export([self.job], output_dir=self.tmp_dir.name)
+            fetch.reset_mock()
+            summary = cli.run_export([dict(self.job, instrument="OPTFUT")], output_dir=self.tmp_dir.name)
+
+        self.assertEqual((summary["skipped"], fetch.call_count), (0, 4))
+        data_df = pd.read_csv(os.path.join(self.tmp_dir.name, "bhav_copy", "20231106.csv"))
+        self.assertEqual(list(data_df["Instrument"]), ["OPTFUT", "OPTFUT"])
+
+    def test_open_periods_are_exported_but_not_checkpointed(self):
+        job = {"dataset": "pro_cli", "start": "202301", "end": "209901"}
+        with patch.object(market_data, "get_pro_cli_details", autospec=True,
+                          return_value=pd.DataFrame({"Client": [1]})) as fetch, \
+                patch.object(market_data, "_report_months", return_value=[(2023, 1), (2099, 1)]):
+            first = cli.run_export([job], output_dir=self.tmp_dir.name)
+            second = cli.run_export([job], output_dir=self.tmp_dir.name)
+
+        self.assertEqual((first["exported"], second["skipped"], second["exported"]), (2, 1, 1))
+        self.assertEqual(fetch.call_args.kwargs, {"trade_month": "209901"})
+        with open(os.path.join(self.tmp_dir.name, cli.CHECKPOINT_FILE)) as fh:
+            self.assertEqual(list(json.load(fh)["done"]), ["pro_cli/202301"])
+
+    def test_deleted_files_and_restart_are_fetched_again(self):
+        with patch.object(market_data, "get_bhav_copy", autospec=True, side_effect=fake_bhav_copy) as fetch:
+            cli.run_export([self.job], output_dir=self.tmp_dir.name)
+            os.remove(os.path.join(self.tmp_dir.name, "bhav_copy", "20231102.csv"))
+            fetch.reset_mock()
+            cli.run_export([self.job], output_dir=self.tmp_dir.name)
+            self.assertEqual(sorted(call.kwargs["trade_date"] for call in fetch.call_args_list),
+                             ["20231102", "20231103"])
+            fetch.reset_mock()
+            cli.run_export([self.job], output_dir=self.tmp_dir.name, restart=True)
+            self.assertEqual(fetch.call_count, 4)
+
+    def test_jobs_are_split_per_day_window_and_month(self):
+        jobs = [cli.validate_job(job) for job in (
+            {"dataset": "historical", "start": "20230101", "end": "20230630", "window_days": 90},
+            {"dataset": "pro_cli", "start": "202311", "end": "202402"},
+            {"dataset": "trading_statistics", "start": "202312", "end": "202401", "name": "stats"},
+        )]
+
+        self.assertEqual([key for key, _ in cli._job_tasks(jobs[0])], ["20230101-20230401", "20230402-20230630"])
+        # a window is ended early rather than leaving a single day window overlapping the previous one
+        job = cli.validate_job({"dataset": "historical", "start": "20230101", "end": "20230104", "window_days": 2})
+        self.assertEqual([key for key, _ in cli._job_tasks(job)],
+                         ["20230101-20230102", "20230103-20230104"])
+        self.assertEqual([key for key, _ in cli._job_tasks(dict(job, window_days=3, end="20230105"))],
+                         ["20230101-20230103", "20230104-20230105"])
+        self.assertEqual([kwargs for _, kwargs in cli._job_tasks(jobs[1])][-1], {"trade_month": "202402"})
+        self.assertEqual(cli._job_tasks(jobs[2]), [("202312", {"year": 2023, "month_number": 12}),
+                                                   ("202401", {"year": 2024, "month_number": 1})])
+        self.assertEqual(jobs[2]["name"], "stats")
+
+    def test_invalid_jobs_are_rejected(self):
+        for job in ({"dataset": "ticks", "start": "20230101", "end": "20230102"},
+                    {"dataset": "bhav_copy", "start": "20230101"},
+                    {"dataset": "bhav_copy", "start": "20230101", "end": "20230102", "instrumnet": "ALL"},
+                    {"dataset": "bhav_copy", "start": "20230101", "end": "20230102", "trade_date": "20230101"},
+                    {"dataset": "pro_cli", "start": "202301", "end": "202302", "name": "../out"},
+                    *[{"dataset": "historical", "start": "20230101", "end": "20230110", "window_days": window_days}
+                      for window_days in (-1, 0, 1.5, "90", True)]):
+            with self.assertRaises(ValueError):
+                cli.validate_job(job)
+        with self.assertRaises(ValueError):
+            cli.run_export([self.job], output_dir=self.tmp_dir.name, file_format="xlsx")
+
+    def test_main_runs_a_spec_and_reports_failures(self):
+        spec_path = os.path.join(self.tmp_dir.name, "jobs.json")
+        with open(spec_path, "w") as fh:
+            json.dump({"output_dir": os.path.join(self.tmp_dir.name, "out"), "jobs": [self.job]}, fh)
+
+        stderr = io.StringIO()
+        with patch.object(market_data, "get_bhav_copy", autospec=True, side_effect=fake_bhav_copy), \
+                contextlib.redirect_stderr(stderr):
+            self.assertEqual(cli.main(["export", spec_path, "--workers", "1", "--quiet"]), 1)
+            self.assertEqual(cli.main(["export", "--dataset", "bhav_copy", "--start", "20231101", "--end",
+                                       "20231102", "--output-dir", os.path.join(self.tmp_dir.name, "one")]), 0)
+            with self.assertRaises(SystemExit):
+                cli.main(["export", spec_path, "--dataset", "bhav_copy"])
+
+        self.assertIn("3 tasks exported, 0 already done, 1 failed of 4", stderr.getvalue())
+        self.assertTrue(os.path.exists(os.path.join(self.tmp_dir.name, "one", "bhav_copy", "20231102.csv")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+from datetime import datetime
+from io import BytesIO
+from unittest.mock import patch
+
+import openpyxl
+import pandas as pd
+
+from mcxlib import excel
+
+
+def _oi_workbook(width: int) -> bytes:
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    for row in (['title'], ['subtitle'], [], ['Date'] + [f'c{i}' for i in range(width - 1)]):
+        sheet.append(row)
+    sheet.append([datetime(2023, 9, 1), 'GOLD', 'FUTCOM'] + list(range(width - 3)))
+    for i in range(8):
+        sheet.append([f'note {i}'])
+    content = BytesIO()
+    workbook.save(content)
+    return content.getvalue()
+
+
+class ExcelEngineTest(unittest.TestCase):
+    def test_calamine_needs_the_package_and_pandas_2_2(self):
+        with patch.object(excel.importlib.util, "find_spec", return_value=object()):
+            with patch.object(excel, "_pandas_version", return_value=(2, 1)):
+                self.assertEqual(excel.excel_engine(), "openpyxl")
+            with patch.object(excel, "_pandas_version", return_value=(2, 2)):
+                self.assertEqual(excel.excel_engine(), "calamine")
+        with patch.object(excel.importlib.util, "find_spec", return_value=None):
+            self.assertEqual(excel.excel_engine(), "openpyxl")
+
+    def test_read_excel_passes_usecols_and_nrows(self):
+        content = _oi_workbook(16)
+
+        result = excel.read_excel(content, skiprows=3, usecols=range(3), nrows=1, engine="openpyxl")
+        expected = pd.read_excel(BytesIO(content), skiprows=3, usecols=range(3), nrows=1, engine="openpyxl")
+
+        pd.testing.assert_frame_equal(result, expected)
+        self.assertEqual(result.shape, (1, 3))
+
+
+class ParseReportTest(unittest.TestCase):
+    def test_layout_columns_and_footer_are_applied(self):
+        data_df = excel.parse_report(_oi_workbook(16), 'category_wise_oi')
+
+        self.assertEqual(list(data_df.columns), excel.REPORT_LAYOUTS['category_wise_oi']['columns'])
+        self.assertEqual(data_df.loc[0, 'Others(Short OI)'], 12)
+        self.assertEqual(len(data_df), 1)
+
+    def test_unexpected_width_raises(self):
+        for width in (15, 17):
+            with self.assertRaises(ValueError):
+                excel.parse_report(_oi_workbook(width), 'category_wise_oi')
+
+    def test_layout_bounds_are_passed_to_read_excel(self):
+        layout = excel.REPORT_LAYOUTS['ccl_delivery']
+        try:
+            excel.REPORT_LAYOUTS['ccl_delivery'] = dict(layout, usecols=range(2), nrows=5)
+            with patch.object(excel, "read_excel", return_value=pd.DataFrame({"a": [1]})) as read_excel:
+                excel.parse_report(b"", 'ccl_delivery')
+        finally:
+            excel.REPORT_LAYOUTS['ccl_delivery'] = layout
+
+        self.assertEqual(read_excel.call_args.kwargs["usecols"], range(2))
+        self.assertEqual(read_excel.call_args.kwargs["nrows"], 5)
+
+    def test_layout_key_follows_the_layout(self):
+        key = excel.layout_key('ccl_delivery')
+        layout = excel.REPORT_LAYOUTS['ccl_delivery']
+        try:
+            excel.REPORT_LAYOUTS['ccl_delivery'] = dict(layout, skipfooter=1)
+            self.assertNotEqual(excel.layout_key('ccl_delivery'), key)
+        finally:
+            excel.REPORT_LAYOUTS['ccl_delivery'] = layout
+
+
+if __name__ == '__main__':
+    unittest.main()
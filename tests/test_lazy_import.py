@@ -0,0 +1,52 @@
+import subprocess
+import sys
+import unittest
+
+import mcxlib
+
+# seconds a cold `import mcxlib` may take, measured in a fresh interpreter (eager imports took ~0.7 s)
+IMPORT_BUDGET = 0.05
+
+
+def run_python(code: str) -> str:
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+
+
+class LazyImportTest(unittest.TestCase):
+    def test_import_defers_heavy_modules_within_budget(self):
+        output = run_python(
+            "import sys, time\n"
+            "start = time.perf_counter()\n"
+            "import mcxlib\n"
+            "elapsed = time.perf_counter() - start\n"
+            "print(elapsed, *[name in sys.modules for name in ('pandas', 'numpy', 'requests')])\n"
+        )
+        elapsed, *loaded = output.split()
+
+        self.assertEqual(loaded, ["False", "False", "False"])
+        self.assertLess(float(elapsed), IMPORT_BUDGET)
+
+    def test_get_mcx_datetime_does_not_import_pandas(self):
+        output = run_python(
+            "import sys\n"
+            "from unittest.mock import patch\n"
+            "import mcxlib\n"
+            "from mcxlib import market_data\n"
+            "with patch.object(market_data, 'post_json', return_value={'d': {'Data': [{'LTT': '/Date(3000)/'}]}}):\n"
+            "    print(mcxlib.get_mcx_datetime().isoformat())\n"
+            "print('pandas' in sys.modules, 'numpy' in sys.modules)\n"
+        )
+
+        self.assertEqual(output.split(), ["1970-01-01T05:30:03+05:30", "False", "False"])
+
+    def test_public_names_resolve_on_first_access(self):
+        for name in mcxlib.__all__:
+            self.assertTrue(callable(getattr(mcxlib, name)), name)
+        self.assertIs(mcxlib.get_historical_data, mcxlib.get_historical_date_wise_data)
+        self.assertIn("get_market_watch", dir(mcxlib))
+        with self.assertRaises(AttributeError):
+            mcxlib.get_unknown_report
+
+
+if __name__ == "__main__":
+    unittest.main()
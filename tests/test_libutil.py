@@ -0,0 +1,184 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+
+import mcxlib
+from mcxlib import libutil
+
+
+class MCXClientTest(unittest.TestCase):
+    def tearDown(self):
+        libutil.set_client(None)
+
+    def test_get_client_returns_one_shared_client(self):
+        libutil.set_client(None)
+
+        self.assertIs(libutil.get_client(), libutil.get_client())
+
+    def test_client_reuses_its_session(self):
+        client = libutil.MCXClient(pool_maxsize=2)
+
+        self.assertIs(client.session, client.session)
+        adapter = client.session.get_adapter("https://www.mcxindia.com")
+        self.assertEqual(adapter._pool_maxsize, 2)
+        client.close()
+
+    def test_configure_client_replaces_shared_client(self):
+        client = mcxlib.configure_client(pool_maxsize=8, max_retries=0)
+
+        self.assertIs(libutil.get_client(), client)
+        self.assertEqual(client.max_retries, 0)
+
+    def test_base_url_redirects_mcx_requests(self):
+        client = libutil.MCXClient(max_retries=0, base_url="http://127.0.0.1:8765/")
+        session = MagicMock()
+        session.request.return_value = MagicMock(status_code=200)
+        client._session = session
+
+        with patch.object(libutil, "get_rate_limiter", return_value=None):
+            client.get("https://www.mcxindia.com/backpage.aspx/GetMarketWatch")
+            client.get("https://example.com/file.xlsx")
+
+        urls = [call.args[1] for call in session.request.call_args_list]
+        self.assertEqual(urls, ["http://127.0.0.1:8765/backpage.aspx/GetMarketWatch", "https://example.com/file.xlsx"])
+
+    def test_base_url_defaults_to_environment(self):
+        with patch.dict("os.environ", {"MCXLIB_BASE_URL": "http://localhost:9000"}):
+            self.assertEqual(libutil.MCXClient().base_url, "http://localhost:9000")
+        with patch.dict("os.environ", {}, clear=True):
+            self.assertIsNone(libutil.MCXClient().base_url)
+
+    def test_client_timeout_applies_unless_a_call_overrides_it(self):
+        client = libutil.MCXClient(max_retries=0, timeout=3)
+        session = MagicMock()
+        session.request.return_value = MagicMock(ok=True, status_code=200, content=b'{"d": {"Data": []}}')
+        client._session = session
+
+        with patch.object(libutil, "get_client", return_value=client), \
+                patch.object(libutil, "get_rate_limiter", return_value=None):
+            libutil.post_json("https://example.com", headers={}, payload={})
+            libutil.get_content("https://example.com/file.xlsx")
+            client.get("https://example.com/file.xlsx", timeout=7)
+
+        self.assertEqual([call.kwargs["timeout"] for call in session.request.call_args_list], [3, 3, 7])
+
+    def test_post_json_goes_through_shared_client(self):
+        response = MagicMock(ok=True, content=b'{"d": {"Data": []}}')
+        client = MagicMock()
+        client.post.return_value = response
+
+        with patch.object(libutil, "get_client", return_value=client):
+            result = libutil.post_json("https://example.com", headers={}, payload={})
+
+        self.assertEqual(result, {"d": {"Data": []}})
+        client.post.assert_called_once()
+
+    def test_post_json_raises_on_http_error(self):
+        response = MagicMock(ok=False, status_code=503, text="Service Unavailable")
+        client = MagicMock()
+        client.post.return_value = response
+
+        with patch.object(libutil, "get_client", return_value=client):
+            with self.assertRaises(libutil.MCXdataNotFound):
+                libutil.post_json("https://example.com", headers={}, payload={})
+
+
+class RecordsToFrameTest(unittest.TestCase):
+    def setUp(self):
+        self.records = [
+            {"__type": "Row", "Symbol": "GOLD", "LTP": 72800, "Volume": 10},
+            {"__type": "Row", "Symbol": "SILVER", "LTP": 410.5, "Volume": 20},
+        ]
+
+    def test_matches_pandas_from_dict_and_drop(self):
+        expected = pd.DataFrame.from_dict(self.records).drop(columns=["__type"])
+
+        result = libutil.records_to_frame(self.records, drop=["__type"])
+
+        pd.testing.assert_frame_equal(result, expected)
+        self.assertEqual(result["Volume"].dtype, "int64")
+        self.assertEqual(result["LTP"].dtype, "float64")
+
+    def test_rows_with_different_keys_are_unioned(self):
+        records = self.records + [{"Symbol": "ZINC", "OpenInterest": 5}]
+        expected = pd.DataFrame.from_dict(records).drop(columns=["__type"])
+
+        result = libutil.records_to_frame(records, drop=["__type"])
+
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_missing_drop_column_raises_unless_ignored(self):
+        with self.assertRaises(KeyError):
+            libutil.records_to_frame(self.records, drop=["LTT"])
+
+        result = libutil.records_to_frame(self.records, drop=["LTT"], errors="ignore")
+        self.assertIn("__type", result.columns)
+
+    def test_decode_json_returns_python_objects(self):
+        self.assertEqual(libutil.decode_json(b'{"d": {"Data": [1]}}'), {"d": {"Data": [1]}})
+
+
+class RecordsToOutputTest(unittest.TestCase):
+    def setUp(self):
+        self.records = [
+            {"__type": "Row", "Symbol": "GOLD", "LTP": 72800.0, "Volume": 10},
+            {"__type": "Row", "Symbol": "SILVER", "LTP": 410.5, "Volume": 20},
+        ]
+
+    def test_records_drop_columns_without_touching_the_payload(self):
+        result = libutil.records_to_output(self.records, "records", drop=["__type"])
+
+        self.assertEqual(result, [{"Symbol": "GOLD", "LTP": 72800.0, "Volume": 10},
+                                  {"Symbol": "SILVER", "LTP": 410.5, "Volume": 20}])
+        self.assertIn("__type", self.records[0])
+        with self.assertRaises(KeyError):
+            libutil.records_to_output(self.records, "records", drop=["LTT"])
+
+    def test_numpy_structured_array_keeps_column_types(self):
+        result = libutil.records_to_output(self.records, "numpy", drop="__type")
+
+        self.assertEqual(result.dtype.names, ("Symbol", "LTP", "Volume"))
+        self.assertEqual(result["Volume"].dtype, "int64")
+        self.assertEqual(list(result["Symbol"]), ["GOLD", "SILVER"])
+
+    def test_arrow_table(self):
+        result = libutil.records_to_output(self.records, "arrow", drop=["__type"])
+
+        self.assertEqual(result.column_names, ["Symbol", "LTP", "Volume"])
+        self.assertEqual(result.column("LTP").to_pylist(), [72800.0, 410.5])
+
+    def test_frame_to_output_and_invalid_formats(self):
+        data_df = libutil.records_to_frame(self.records, drop=["__type"])
+
+        self.assertIs(libutil.frame_to_output(data_df, "pandas"), data_df)
+        self.assertEqual(libutil.frame_to_output(data_df, "records")[1]["Symbol"], "SILVER")
+        self.assertEqual(libutil.frame_to_output(data_df, "numpy")["LTP"][0], 72800.0)
+        with self.assertRaises(ValueError):
+            libutil.records_to_output(self.records, "json")
+
+    def test_fetchers_return_the_requested_output(self):
+        response = {"d": {"Data": [dict(row, ExtensionData=None) for row in self.records]}}
+
+        with patch.object(mcxlib.market_data, "post_json", return_value=response) as post_json:
+            result = mcxlib.get_top_gainers(output="records")
+            with self.assertRaises(ValueError):
+                mcxlib.get_top_gainers(output="xml")
+
+        self.assertEqual(result[0]["Symbol"], "GOLD")
+        self.assertNotIn("ExtensionData", result[0])
+        post_json.assert_called_once()
+
+
+class SplitDateRangeTest(unittest.TestCase):
+    def test_windows_do_not_overlap(self):
+        self.assertEqual(libutil.split_date_range("20230101", "20230105", max_days=3),
+                         [("20230101", "20230103"), ("20230104", "20230105")])
+
+    def test_max_days_below_one_raises(self):
+        for max_days in (0, -1):
+            with self.assertRaises(ValueError):
+                libutil.split_date_range("20230101", "20230110", max_days=max_days)
+
+if __name__ == "__main__":
+    unittest.main()
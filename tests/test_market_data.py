@@ -1,9 +1,14 @@
 from datetime import datetime, timezone
+from io import BytesIO
+import json
 import unittest
 from unittest.mock import patch
 
+import pandas as pd
+
 import mcxlib
 import mcxlib.market_data as market_data
+from mcxlib import cache, trading_calendar
 
 
 class MCXDatetimeTest(unittest.TestCase):
@@ -57,6 +62,23 @@ class MCXDatetimeTest(unittest.TestCase):
             ),
         )
 
+    def test_parse_mcx_datetime_series_matches_per_value_parser(self):
+        values = ["/Date(1777441209000)/", "/Date(0+0530)/", "/Date(-19800000)/"]
+
+        result = market_data.parse_mcx_datetime_series(values)
+
+        self.assertEqual(list(result), [market_data._parse_mcx_datetime(value) for value in values])
+        self.assertEqual(str(result.dt.tz), "IST")
+
+    def test_parse_mcx_datetime_series_coerces_or_raises_on_invalid_values(self):
+        values = ["/Date(1000)/", "", None, "junk"]
+
+        result = market_data.parse_mcx_datetime_series(values)
+
+        self.assertEqual(result.isna().tolist(), [False, True, True, True])
+        with self.assertRaises(ValueError):
+            market_data.parse_mcx_datetime_series(values, errors="raise")
+
     def test_get_mcx_datetime_is_exported(self):
         self.assertIs(mcxlib.get_mcx_datetime, market_data.get_mcx_datetime)
 
@@ -123,9 +145,287 @@ class AvailableContractsTest(unittest.TestCase):
             with self.assertRaises(ValueError):
                 market_data.get_available_contracts(commodity="UNKNOWN")
 
+    def test_get_available_contracts_falls_back_to_substring_match(self):
+        with patch.object(market_data, "post_json", return_value=self.response):
+            result = market_data.get_available_contracts(commodity="lead", instrument="OPT")
+
+        self.assertEqual(list(result["ContractName"]), ["LEADMINI17DEC180CE"])
+
+    def test_get_available_contracts_records_output_matches_frame(self):
+        with patch.object(market_data, "post_json", return_value=self.response):
+            for commodity, instrument in (("LEADMINI", "FUTCOM"), ("lead", "OPT"), ("ALL", "ALL")):
+                frame = market_data.get_available_contracts(commodity=commodity, instrument=instrument)
+                records = market_data.get_available_contracts(commodity=commodity, instrument=instrument,
+                                                              output="records")
+                self.assertEqual([row["ContractName"] for row in records], list(frame["ContractName"]))
+                self.assertNotIn("__type", records[0])
+            with self.assertRaises(ValueError):
+                market_data.get_available_contracts(commodity="UNKNOWN", output="records")
+
+    def test_contract_index_reuses_lookups_per_snapshot(self):
+        snapshot = market_data.MarketWatchSnapshot(ttl=60)
+
+        with patch.object(market_data, "post_json", return_value=self.response):
+            first = snapshot.available_contracts(commodity="LEADMINI")
+            _, indexes = snapshot.contract_indexes()
+            second = snapshot.available_contracts(commodity="GOLD", instrument="FUTCOM")
+
+        self.assertIs(snapshot.contract_indexes()[1], indexes)
+        self.assertEqual(len(first), 2)
+        self.assertEqual(list(second["ContractName"]), ["GOLD05JUNFUT"])
+        self.assertEqual(list(indexes[0].exact("LEADMINI")), [0, 1])
+
     def test_get_available_contracts_is_exported(self):
         self.assertIs(mcxlib.get_available_contracts, market_data.get_available_contracts)
 
 
+class MarketWatchSnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.response = {
+            "d": {
+                "Data": [
+                    {
+                        "__type": "MarketWatch",
+                        "Symbol": "GOLD",
+                        "InstrumentName": "FUTCOM",
+                        "ContractName": "GOLD05JUNFUT",
+                        "LTP": 72800,
+                        "LTT": "/Date(1000)/",
+                    },
+                    {
+                        "__type": "MarketWatch",
+                        "Symbol": "SILVER",
+                        "InstrumentName": "OPTFUT",
+                        "ContractName": "SILVER05JUN72000CE",
+                        "LTP": 410.5,
+                        "LTT": "/Date(5000)/",
+                    },
+                ]
+            }
+        }
+
+    def test_snapshot_answers_all_market_watch_functions_with_one_fetch(self):
+        snapshot = market_data.MarketWatchSnapshot(ttl=60)
+
+        with patch.object(market_data, "post_json", return_value=self.response) as post_json:
+            market_watch = market_data.get_market_watch(snapshot=snapshot)
+            contracts = market_data.get_available_contracts(commodity="GOLD", snapshot=snapshot)
+            mcx_datetime = market_data.get_mcx_datetime(snapshot=snapshot)
+
+        post_json.assert_called_once()
+        self.assertEqual(len(market_watch), 2)
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(market_watch["LTT"]))
+        self.assertEqual(contracts.loc[0, "ContractName"], "GOLD05JUNFUT")
+        self.assertEqual(
+            mcx_datetime,
+            datetime.fromtimestamp(5, tz=timezone.utc).astimezone(market_data.MCX_TIMEZONE),
+        )
+
+    def test_snapshot_refetches_after_ttl(self):
+        snapshot = market_data.MarketWatchSnapshot(ttl=0)
+
+        with patch.object(market_data, "post_json", return_value=self.response) as post_json:
+            market_data.get_market_watch(snapshot=snapshot)
+            market_data.get_market_watch(snapshot=snapshot)
+
+        self.assertEqual(post_json.call_count, 2)
+
+    def test_snapshot_records_output_skips_the_dataframe(self):
+        snapshot = market_data.MarketWatchSnapshot()
+
+        with patch.object(market_data, "post_json", return_value=self.response), \
+                patch.object(market_data, "records_to_frame") as records_to_frame:
+            records = market_data.get_market_watch(snapshot=snapshot, output="records")
+            contracts = market_data.get_available_contracts(commodity="GOLD", snapshot=snapshot, output="records")
+
+        records_to_frame.assert_not_called()
+        self.assertEqual([row["Symbol"] for row in records], ["GOLD", "SILVER"])
+        self.assertEqual([row["ContractName"] for row in contracts], ["GOLD05JUNFUT"])
+
+    def test_default_snapshot_is_fetched_once_until_refresh(self):
+        snapshot = market_data.MarketWatchSnapshot()
+
+        with patch.object(market_data, "post_json", return_value=self.response) as post_json:
+            market_data.get_market_watch(snapshot=snapshot)
+            market_data.get_mcx_datetime(snapshot=snapshot)
+            self.assertEqual(post_json.call_count, 1)
+            snapshot.refresh()
+
+        self.assertEqual(post_json.call_count, 2)
+
+
+class BhavCopyRangeTest(unittest.TestCase):
+    def setUp(self):
+        # weekends only, the holiday list is never downloaded
+        trading_calendar.set_trading_calendar(trading_calendar.TradingCalendar(path=None, fetch=False))
+
+    def tearDown(self):
+        trading_calendar.set_trading_calendar(None)
+
+    @staticmethod
+    def fake_post_json(url, headers, payload, timeout=30):
+        if "20230104" in payload:
+            raise market_data.MCXdataNotFound("HTTP 500")
+        return {"d": {"Data": [{"__type": "Bhavcopy", "Symbol": "GOLD", "Close": 1.0}]}}
+
+    def test_range_skips_weekends_and_holidays(self):
+        with patch.object(market_data, "post_json", side_effect=self.fake_post_json) as post_json:
+            result = market_data.get_bhav_copy_range(
+                start_date="20230106", end_date="20230110", holidays=["20230109"], workers=2
+            )
+
+        self.assertEqual(post_json.call_count, 2)
+        self.assertEqual(
+            list(result["TradeDate"].dt.strftime("%Y%m%d")), ["20230106", "20230110"]
+        )
+
+    def test_range_reports_failed_days_without_aborting(self):
+        with patch.object(market_data, "post_json", side_effect=self.fake_post_json):
+            result = market_data.get_bhav_copy_range(
+                start_date="20230102", end_date="20230106", workers=3
+            )
+
+        self.assertEqual(len(result), 4)
+        self.assertEqual(list(result.attrs["failed_dates"]), ["20230104"])
+        self.assertTrue(result["TradeDate"].is_monotonic_increasing)
+
+    def test_range_can_yield_per_day_frames(self):
+        with patch.object(market_data, "post_json", side_effect=self.fake_post_json):
+            days = list(
+                market_data.get_bhav_copy_range(
+                    start_date="20230103", end_date="20230104", as_generator=True
+                )
+            )
+
+        by_date = {trade_date: (data_df, error) for trade_date, data_df, error in days}
+        self.assertEqual(len(by_date["20230103"][0]), 1)
+        self.assertIsInstance(by_date["20230104"][1], ValueError)
+
+
+class HistoricalDateWiseDataTest(unittest.TestCase):
+    def setUp(self):
+        # weekends only, the holiday list is never downloaded
+        trading_calendar.set_trading_calendar(trading_calendar.TradingCalendar(path=None, fetch=False))
+
+    def tearDown(self):
+        trading_calendar.set_trading_calendar(None)
+
+    @staticmethod
+    def fake_post_json(url, headers, payload, timeout=30):
+        request = json.loads(payload)
+        rows = [
+            {"__type": "Hist", "Year": 0, "Month": 0, "Date": date, "Symbol": "GOLD"}
+            for date in (request["Startdate"], request["EndDate"])
+        ]
+        return {"d": {"Data": rows}}
+
+    def test_long_range_is_split_into_windows_and_stitched(self):
+        with patch.object(market_data, "post_json", side_effect=self.fake_post_json) as post_json:
+            result = market_data.get_historical_date_wise_data(
+                start_date="20200101", end_date="20231231", workers=2
+            )
+
+        self.assertEqual(post_json.call_count, 4)
+        for call in post_json.call_args_list:
+            request = json.loads(call.kwargs["payload"])
+            market_data.validate_date_param(request["Startdate"], request["EndDate"])
+        self.assertTrue(result["Date"].is_monotonic_increasing)
+        self.assertFalse(result.duplicated().any())
+        self.assertEqual(result["Date"].iloc[0], pd.Timestamp("2020-01-01"))
+        self.assertEqual(result["Date"].iloc[-1], pd.Timestamp("2023-12-31"))
+
+    def test_short_range_is_a_single_request(self):
+        with patch.object(market_data, "post_json", side_effect=self.fake_post_json) as post_json:
+            market_data.get_historical_date_wise_data(start_date="20230101", end_date="20230301")
+
+        post_json.assert_called_once()
+
+
+class AllOptionChainsTest(unittest.TestCase):
+    @staticmethod
+    def fake_post_json(url, headers, payload, timeout=30):
+        if url.endswith("GetExpirywisePutCallRatio"):
+            rows = [
+                {"ExtensionData": None, "Date": "", "Ratio": 1.0, "Symbol": symbol, "ExpiryDate": expiry}
+                for symbol, expiry in (("CRUDEOIL", "17NOV2023"), ("GOLD", "24NOV2023"), ("ZINC", "29NOV2023"))
+            ]
+            return {"d": {"Data": rows}}
+        if "ZINC" in payload:
+            raise market_data.MCXdataNotFound("HTTP 500")
+        return {
+            "d": {
+                "Data": [
+                    {"ExtensionData": None, "Symbol": "", "LTT": "", "CE_LTT": "", "PE_LTT": "",
+                     "CE_OpenInterest": 10, "PE_OpenInterest": 5, "CE_StrikePrice": 6500.0}
+                ]
+            }
+        }
+
+    def test_chains_are_concatenated_in_long_format(self):
+        with patch.object(market_data, "post_json", side_effect=self.fake_post_json):
+            result = market_data.get_all_option_chains(workers=3)
+
+        self.assertEqual(list(result.columns[:2]), ["Commodity", "Expiry"])
+        self.assertEqual(list(result["Commodity"].astype(str)), ["CRUDEOIL", "GOLD"])
+        self.assertEqual(list(result.attrs["failed_chains"]), [("ZINC", "29NOV2023")])
+
+    def test_chains_can_be_returned_as_dict(self):
+        with patch.object(market_data, "post_json", side_effect=self.fake_post_json):
+            result = market_data.get_all_option_chains(as_dict=True)
+
+        self.assertEqual(list(result), [("CRUDEOIL", "17NOV2023"), ("GOLD", "24NOV2023")])
+        self.assertEqual(list(result.failed_chains), [("ZINC", "29NOV2023")])
+
+    def test_dict_of_chains_raises_when_every_chain_failed(self):
+        def failing_post_json(url, headers, payload, timeout=None):
+            if "GetOptionChain" in url:
+                raise market_data.MCXdataNotFound("HTTP 503")
+            return self.fake_post_json(url, headers, payload)
+
+        with patch.object(market_data, "post_json", side_effect=failing_post_json):
+            with self.assertRaises(ValueError):
+                market_data.get_all_option_chains(as_dict=True)
+
+
+class MonthlyReportRangeTest(unittest.TestCase):
+    def setUp(self):
+        self.previous_store = cache.get_report_store()
+        mcxlib.disable_report_cache()
+
+    def tearDown(self):
+        cache._report_store = self.previous_store
+
+    @staticmethod
+    def workbook(header):
+        content = BytesIO()
+        pd.DataFrame([["GOLD", 10], ["SILVER", 20]], columns=header).to_excel(content, index=False)
+        return content.getvalue()
+
+    def fake_get_content(self, url, headers=None, timeout=30):
+        if "/march/" in url:
+            raise market_data.MCXdataNotFound("HTTP 404")
+        header = ["Commodity", "Delivery  Qty "] if "/january/" in url else ["Commodity", "Delivery Qty"]
+        return self.workbook(header)
+
+    def test_months_are_concatenated_with_a_period_column(self):
+        with patch.object(market_data, "get_content", side_effect=self.fake_get_content) as get_content:
+            result = mcxlib.get_ccl_delivery_range("202212", "202303", workers=2, processes=0)
+
+        self.assertEqual(get_content.call_count, 4)
+        self.assertEqual(list(result.columns), ["Period", "Commodity", "Delivery Qty"])
+        self.assertEqual(list(result["Period"].astype(str).unique()), ["2022-12", "2023-01", "2023-02"])
+        self.assertEqual(list(result.attrs["failed_months"]), ["202303"])
+
+    def test_parsing_can_run_in_a_process_pool(self):
+        with patch.object(market_data, "get_content", side_effect=self.fake_get_content):
+            result = mcxlib.get_ccl_delivery_range("202301", "202302", processes=2)
+
+        self.assertEqual(len(result), 4)
+
+    def test_invalid_month_range_raises(self):
+        with self.assertRaises(ValueError):
+            mcxlib.get_category_wise_oi_range("202305", "202301")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,83 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import mcxlib
+import mcxlib.market_data as market_data
+
+
+class MemoryCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.memory_cache = mcxlib.enable_memory_cache(default_ttl=60, ttls={"top_losers": 0})
+        self.response = {
+            "d": {
+                "Data": [
+                    {"ExtensionData": None, "LTT": "", "Date": "", "Unit": "", "Symbol": "GOLD", "LTP": 1.0}
+                ]
+            }
+        }
+
+    def tearDown(self):
+        mcxlib.disable_memory_cache()
+
+    def test_repeated_calls_are_served_from_memory(self):
+        with patch.object(market_data, "post_json", return_value=self.response) as post_json:
+            first = market_data.get_top_gainers()
+            first.loc[0, "LTP"] = 99.0
+            second = market_data.get_top_gainers()
+
+        post_json.assert_called_once()
+        self.assertEqual(second.loc[0, "LTP"], 1.0)
+        self.assertEqual(mcxlib.cache_stats()["top_gainers"], {"hits": 1, "misses": 1, "coalesced": 0})
+
+    def test_arguments_are_part_of_the_key(self):
+        with patch.object(market_data, "post_json", return_value=self.response) as post_json:
+            market_data.get_most_active_contracts(instrument="FUTCOM")
+            market_data.get_most_active_contracts("FUTCOM")
+            market_data.get_most_active_contracts(instrument="OPTFUT")
+
+        self.assertEqual(post_json.call_count, 2)
+
+    def test_zero_ttl_endpoint_is_not_cached(self):
+        with patch.object(market_data, "post_json", return_value=self.response) as post_json:
+            market_data.get_top_losers()
+            market_data.get_top_losers()
+
+        self.assertEqual(post_json.call_count, 2)
+
+    def test_concurrent_callers_share_one_fetch(self):
+        started = threading.Event()
+
+        def slow_post_json(url, headers, payload, timeout=30):
+            started.set()
+            time.sleep(0.1)
+            return self.response
+
+        results = []
+        with patch.object(market_data, "post_json", side_effect=slow_post_json) as post_json:
+            threads = [threading.Thread(target=lambda: results.append(market_data.get_top_gainers()))
+                       for _ in range(5)]
+            threads[0].start()
+            started.wait()
+            for thread in threads[1:]:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        post_json.assert_called_once()
+        self.assertEqual(len(results), 5)
+        self.assertEqual(self.memory_cache.stats()["top_gainers"]["coalesced"], 4)
+
+    def test_errors_are_shared_and_not_cached(self):
+        with patch.object(market_data, "post_json", side_effect=RuntimeError("down")):
+            with self.assertRaises(ValueError):
+                market_data.get_top_gainers()
+        with patch.object(market_data, "post_json", return_value=self.response) as post_json:
+            market_data.get_top_gainers()
+
+        post_json.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import mcxlib
+from mcxlib import libutil, metrics
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    body = json.dumps({"d": {"Data": [{"Symbol": "GOLD", "LTP": 61000.0}, {"Symbol": "SILVER", "LTP": 72000.0}]}})
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = self.body.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class MetricsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f"http://localhost:{cls.server.server_port}/backpage.aspx/GetMarketWatch"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        mcxlib.disable_rate_limit()
+        self.client = libutil.MCXClient(max_retries=0)
+        libutil.set_client(self.client)
+        self.registry = mcxlib.enable_metrics()
+
+    def tearDown(self):
+        mcxlib.disable_metrics()
+        libutil.set_client(None)
+        mcxlib.configure_rate_limit()
+
+    def test_endpoint_names(self):
+        self.assertEqual(metrics.endpoint_name("https://www.mcxindia.com/backpage.aspx/GetOptionChain"),
+                         "GetOptionChain")
+        self.assertEqual(metrics.endpoint_name("https://www.mcxindia.com/docs/default-source/market-data/"
+                                               "historicaldata/2023/september/category-wise-oi-sep-2023.xlsx"),
+                         "category-wise-oi")
+
+    def test_request_phases_decode_and_frame_build_are_recorded(self):
+        data = libutil.post_json(self.url, headers={}, payload="{}")
+        libutil.records_to_frame(data["d"]["Data"], url=self.url)
+
+        stats = self.registry.stats()["GetMarketWatch"]
+        self.assertEqual(stats["requests"], {"200": 1})
+        self.assertEqual(stats["bytes"], len(_Handler.body))
+        for phase in ("connect", "ttfb", "download", "total", "decode", "frame_build"):
+            self.assertEqual(stats[phase]["count"], 1, phase)
+        self.assertGreater(stats["connect"]["sum"], 0)
+        self.assertGreaterEqual(stats["total"]["sum"], stats["ttfb"]["sum"])
+
+    def test_frame_build_is_charged_to_the_given_endpoint(self):
+        libutil.post_json(self.url, headers={}, payload="{}")
+        libutil.records_to_frame([{"Symbol": "GOLD"}], url="https://www.mcxindia.com/backpage.aspx/GetHeatMap")
+        libutil.records_to_frame([{"Symbol": "GOLD"}])
+
+        stats = self.registry.stats()
+        self.assertNotIn("frame_build", stats["GetMarketWatch"])
+        self.assertEqual(stats["GetHeatMap"]["frame_build"]["count"], 1)
+
+    def test_pools_are_instrumented_only_once_metrics_are_used(self):
+        mcxlib.disable_metrics()
+        libutil.post_json(self.url, headers={}, payload="{}")
+        poolmanager = self.client.session.get_adapter(self.url).poolmanager
+        self.assertIsNot(poolmanager.pool_classes_by_scheme, metrics.POOL_CLASSES_BY_SCHEME)
+
+        mcxlib.enable_metrics()
+        libutil.post_json(self.url, headers={}, payload="{}")
+        self.assertIs(poolmanager.pool_classes_by_scheme, metrics.POOL_CLASSES_BY_SCHEME)
+        self.assertEqual(metrics.get_metrics().stats()["GetMarketWatch"]["connect"]["count"], 1)
+
+    def test_hooks_receive_events_and_failures_are_isolated(self):
+        events = []
+
+        def failing(event):
+            raise RuntimeError("broken hook")
+
+        mcxlib.add_metrics_hook(failing)
+        mcxlib.add_metrics_hook(events.append)
+        try:
+            with self.assertLogs("mcxlib.metrics", level="ERROR"):
+                libutil.post_json(self.url, headers={}, payload="{}")
+        finally:
+            mcxlib.remove_metrics_hook(failing)
+            mcxlib.remove_metrics_hook(events.append)
+
+        self.assertEqual([event["type"] for event in events], ["request", "decode"])
+        self.assertEqual(events[0]["status"], 200)
+        self.assertEqual(events[0]["endpoint"], "GetMarketWatch")
+
+    def test_failed_attempts_are_counted_as_errors(self):
+        url = "http://127.0.0.1:9/backpage.aspx/GetHeatMap"
+        with self.assertRaises(Exception):
+            self.client.get(url, timeout=1)
+
+        self.assertEqual(self.registry.stats()["GetHeatMap"]["requests"], {"error": 1})
+
+    def test_prometheus_export(self):
+        libutil.post_json(self.url, headers={}, payload="{}")
+        text = mcxlib.export_prometheus()
+
+        self.assertIn("# TYPE mcxlib_phase_seconds histogram", text)
+        self.assertIn('mcxlib_phase_seconds_count{endpoint="GetMarketWatch",phase="total"} 1', text)
+        self.assertIn('mcxlib_phase_seconds_bucket{endpoint="GetMarketWatch",phase="total",le="+Inf"} 1', text)
+        self.assertIn('mcxlib_requests_total{endpoint="GetMarketWatch",status="200"} 1', text)
+        self.assertIn(f'mcxlib_response_bytes_total{{endpoint="GetMarketWatch"}} {len(_Handler.body)}', text)
+
+    def test_nothing_is_recorded_while_disabled(self):
+        mcxlib.disable_metrics()
+        libutil.post_json(self.url, headers={}, payload="{}")
+
+        self.assertEqual(self.registry.stats(), {})
+        self.assertEqual(mcxlib.export_prometheus(), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
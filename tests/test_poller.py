@@ -0,0 +1,57 @@
+import threading
+import unittest
+
+import pandas as pd
+
+from mcxlib.poller import MarketWatchPoller
+
+
+def board(ltp_gold, volume_silver, extra=False):
+    rows = [
+        {"ContractName": "GOLD05JUNFUT", "LTP": ltp_gold, "Volume": 10, "OpenInterest": 5},
+        {"ContractName": "SILVER05JULFUT", "LTP": 72000.0, "Volume": volume_silver, "OpenInterest": 7},
+        {"ContractName": "ZINC30JUNFUT", "LTP": 250.0, "Volume": None, "OpenInterest": 1},
+    ]
+    if extra:
+        rows.append({"ContractName": "LEAD30JUNFUT", "LTP": 180.0, "Volume": 1, "OpenInterest": 1})
+    return pd.DataFrame(rows)
+
+
+class MarketWatchPollerTest(unittest.TestCase):
+    def test_first_poll_emits_the_whole_board(self):
+        poller = MarketWatchPoller(fetch=lambda: board(61000.0, 20))
+
+        self.assertEqual(len(poller.poll()), 3)
+
+    def test_only_changed_and_new_contracts_are_emitted(self):
+        boards = iter([board(61000.0, 20), board(61000.0, 20), board(61010.0, 25, extra=True)])
+        poller = MarketWatchPoller(fetch=lambda: next(boards))
+
+        poller.poll()
+        unchanged = poller.poll()
+        delta = poller.poll()
+
+        self.assertTrue(unchanged.empty)
+        self.assertEqual(
+            sorted(delta["ContractName"]), ["GOLD05JUNFUT", "LEAD30JUNFUT", "SILVER05JULFUT"]
+        )
+
+    def test_callback_mode_delivers_deltas_until_stopped(self):
+        received = []
+        done = threading.Event()
+
+        def callback(delta):
+            received.append(delta)
+            done.set()
+
+        poller = MarketWatchPoller(interval=0.01, fetch=lambda: board(61000.0, 20))
+        poller.start(callback)
+        done.wait(2)
+        poller.stop(timeout=2)
+
+        self.assertEqual(len(received), 1)
+        self.assertEqual(len(received[0]), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+import requests
+
+import mcxlib
+from mcxlib import libutil, ratelimit
+
+
+class RateLimiterTest(unittest.TestCase):
+    def test_bucket_blocks_once_the_burst_is_spent(self):
+        limiter = ratelimit.RateLimiter(rate=50, burst=2)
+
+        start = time.monotonic()
+        for _ in range(4):
+            limiter.acquire()
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.03)
+        self.assertEqual(limiter.stats()["requests"], 4)
+
+    def test_rate_backs_off_on_errors_and_recovers_on_success(self):
+        limiter = ratelimit.RateLimiter(rate=10, burst=1, min_rate=1, max_rate=10, decrease=0.5, increase=1,
+                                        cooldown=0)
+
+        limiter.record_failure("throttled")
+        limiter.record_failure("server_errors")
+        self.assertEqual(limiter.rate, 2.5)
+
+        for _ in range(20):
+            limiter.record_success()
+        stats = limiter.stats()
+        self.assertEqual(stats["rate"], 10)
+        self.assertEqual((stats["throttled"], stats["server_errors"], stats["successes"]), (1, 1, 20))
+
+    def test_rate_is_probed_above_the_initial_rate(self):
+        limiter = ratelimit.RateLimiter(rate=10, increase=1)
+
+        for _ in range(100):
+            limiter.record_success()
+
+        self.assertEqual(limiter.rate, 10 * ratelimit.MAX_RATE_FACTOR)
+
+    def test_cooldown_cuts_the_rate_once_per_burst_of_errors(self):
+        limiter = ratelimit.RateLimiter(rate=8, burst=1, decrease=0.5, cooldown=60)
+
+        for _ in range(5):
+            limiter.record_failure("timeouts")
+
+        self.assertEqual(limiter.rate, 4)
+
+    def test_retry_after_holds_back_the_host(self):
+        limiter = ratelimit.RateLimiter(rate=1000, burst=10)
+
+        limiter.record_failure("throttled", retry_after=0.05)
+
+        self.assertGreaterEqual(limiter.acquire(), 0.04)
+
+    def test_limiters_are_shared_per_host(self):
+        registry = ratelimit.RateLimiterRegistry(rate=5)
+
+        self.assertIs(registry.for_url("https://www.mcxindia.com/a"), registry.for_url("https://WWW.mcxindia.com/b"))
+        self.assertIsNot(registry.for_url("https://www.mcxindia.com"), registry.for_url("http://localhost:8000"))
+
+
+class ClientRetryTest(unittest.TestCase):
+    def setUp(self):
+        mcxlib.configure_rate_limit(rate=1000, burst=10, cooldown=0)
+
+    def tearDown(self):
+        mcxlib.configure_rate_limit()
+
+    def _client(self, *outcomes):
+        client = libutil.MCXClient(max_retries=2)
+        client._session = MagicMock()
+        client._session.request.side_effect = outcomes
+        return client
+
+    @patch("mcxlib.libutil.time")
+    def test_retries_5xx_and_timeouts_then_returns_success(self, mock_time):
+        sleep = mock_time.sleep
+        ok = MagicMock(status_code=200)
+        client = self._client(MagicMock(status_code=503, headers={}), requests.Timeout(), ok)
+
+        self.assertIs(client.post("https://www.mcxindia.com/x"), ok)
+
+        self.assertEqual(sleep.call_count, 2)
+        stats = mcxlib.rate_limit_stats()["www.mcxindia.com"]
+        self.assertEqual((stats["server_errors"], stats["timeouts"], stats["successes"]), (1, 1, 1))
+
+    @patch("mcxlib.libutil.time")
+    def test_honours_retry_after_and_returns_last_response(self, mock_time):
+        sleep = mock_time.sleep
+        mcxlib.disable_rate_limit()
+        throttled = MagicMock(status_code=429, headers={"Retry-After": "3"})
+        client = self._client(throttled, throttled, throttled)
+
+        self.assertIs(client.get("https://www.mcxindia.com/x"), throttled)
+
+        self.assertEqual([call.args[0] for call in sleep.call_args_list], [3.0, 3.0])
+
+    @patch("mcxlib.libutil.time")
+    def test_raises_timeout_once_retries_run_out(self, _):
+        client = self._client(requests.Timeout(), requests.ConnectionError(), requests.Timeout())
+
+        with self.assertRaises(requests.Timeout):
+            client.get("https://www.mcxindia.com/x")
+
+    def test_disabled_rate_limit_has_no_stats(self):
+        mcxlib.disable_rate_limit()
+
+        self.assertEqual(mcxlib.rate_limit_stats(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
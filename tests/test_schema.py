@@ -0,0 +1,61 @@
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+import mcxlib.market_data as market_data
+from mcxlib.schema import apply_schema
+
+
+class ApplySchemaTest(unittest.TestCase):
+    def test_bhav_copy_columns_get_compact_dtypes(self):
+        response = {
+            "d": {
+                "Data": [
+                    {"__type": "Bhavcopy", "Symbol": "GOLD", "InstrumentName": "FUTCOM",
+                     "ExpiryDate": "05DEC2023", "Close": 61000.5, "Volume": 120, "OpenInterest": 3000},
+                    {"__type": "Bhavcopy", "Symbol": "GOLD", "InstrumentName": "OPTFUT",
+                     "ExpiryDate": "05DEC2023", "Close": 12.25, "Volume": 7, "OpenInterest": 80},
+                ]
+            }
+        }
+
+        with patch.object(market_data, "post_json", return_value=response):
+            result = market_data.get_bhav_copy(trade_date="20231102")
+
+        self.assertIsInstance(result["Symbol"].dtype, pd.CategoricalDtype)
+        self.assertIsInstance(result["ExpiryDate"].dtype, pd.CategoricalDtype)
+        self.assertEqual(result["Close"].dtype, "float64")
+        self.assertEqual(result["Volume"].dtype, "int64")
+        self.assertEqual(result["OpenInterest"].dtype, "int64")
+
+    def test_counts_keep_one_width_and_do_not_overflow(self):
+        small = apply_schema(pd.DataFrame({"Volume": [100, 7], "OpenInterest": [30000, 1.0]}), "market_watch")
+        large = apply_schema(pd.DataFrame({"Volume": [50000, 1], "OpenInterest": [None, 2]}), "market_watch")
+
+        self.assertEqual(small["Volume"].dtype, large["Volume"].dtype)
+        self.assertEqual(list(small["Volume"] * 2), [200, 14])
+        self.assertEqual((small["OpenInterest"] + small["OpenInterest"])[0], 60000)
+        self.assertEqual(large["OpenInterest"].dtype, "float64")
+        self.assertEqual(pd.concat([small, large])["Volume"].dtype, "int64")
+
+    def test_missing_and_unconvertible_columns_are_left_alone(self):
+        data_df = pd.DataFrame({"Volume": ["n/a", "12"], "Other": [1, 2]})
+
+        result = apply_schema(data_df, "market_watch")
+
+        self.assertEqual(list(result["Volume"]), ["n/a", "12"])
+        self.assertEqual(result["Other"].dtype, "int64")
+
+    def test_contract_filters_work_on_categorical_columns(self):
+        data_df = apply_schema(
+            pd.DataFrame({"Symbol": ["GOLD", None], "InstrumentName": ["FUTCOM", "OPTFUT"]}), "market_watch"
+        )
+
+        result = market_data._select_contracts(data_df, "GOLD", "ALL")
+
+        self.assertEqual(len(result), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
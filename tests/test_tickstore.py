@@ -0,0 +1,78 @@
+import importlib.util
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+import mcxlib.market_data as market_data
+
+
+@unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow is not installed")
+class TickStoreTest(unittest.TestCase):
+    def setUp(self):
+        from mcxlib import tickstore
+
+        self.tickstore = tickstore
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.board = pd.DataFrame({"Symbol": ["GOLD", "SILVER"], "LTP": [61000.0, 72000.0]})
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_snapshots_are_buffered_until_flush(self):
+        writer = self.tickstore.TickStoreWriter(self.tmp_dir.name, "market_watch", buffer_rows=100)
+        writer.append(self.board, snapshot_time="2023-11-02 10:00")
+
+        with self.assertRaises(ValueError):
+            self.tickstore.read_ticks(self.tmp_dir.name, "market_watch")
+        writer.close()
+
+        self.assertEqual(len(self.tickstore.read_ticks(self.tmp_dir.name, "market_watch")), 2)
+
+    def test_flushes_with_different_integer_widths_read_back(self):
+        with self.tickstore.TickStoreWriter(self.tmp_dir.name, "market_watch") as writer:
+            writer.append(self.board.assign(Volume=pd.Series([1, 2], dtype="int8")), snapshot_time="2023-11-02 10:00")
+            writer.flush()
+            writer.append(self.board.assign(Volume=pd.Series([50000, 3], dtype="int32")),
+                          snapshot_time="2023-11-02 10:01")
+
+        result = self.tickstore.read_ticks(self.tmp_dir.name, "market_watch", commodities=["GOLD"])
+
+        self.assertEqual(list(result["Volume"]), [1, 50000])
+        self.assertEqual(result["Volume"].dtype, "int64")
+
+    def test_read_ticks_filters_time_commodity_columns_and_predicates(self):
+        with self.tickstore.TickStoreWriter(self.tmp_dir.name, "market_watch", buffer_rows=3) as writer:
+            for day, ltp in (("2023-11-02", 1.0), ("2023-11-03", 2.0), ("2023-11-04", 3.0)):
+                writer.append(self.board.assign(LTP=[ltp, ltp * 10]), snapshot_time=f"{day} 10:00")
+
+        result = self.tickstore.read_ticks(
+            self.tmp_dir.name, "market_watch", start="2023-11-03", end="2023-11-04",
+            commodities=["SILVER"], columns=["SnapshotTime", "LTP"],
+            filters=self.tickstore.ds.field("LTP") > 25,
+        )
+
+        self.assertEqual(list(result.columns), ["SnapshotTime", "LTP"])
+        self.assertEqual(list(result["LTP"]), [30.0])
+        self.assertEqual(str(result["SnapshotTime"].dt.tz), "IST")
+
+    def test_recorder_tags_option_chain_with_commodity_and_expiry(self):
+        response = {
+            "d": {
+                "Data": [
+                    {"ExtensionData": None, "Symbol": "CRUDEOIL", "LTT": "", "CE_LTT": "", "PE_LTT": "",
+                     "CE_OpenInterest": 10, "PE_OpenInterest": 0, "CE_StrikePrice": 6500.0}
+                ]
+            }
+        }
+        with patch.object(market_data, "post_json", return_value=response):
+            with self.tickstore.TickRecorder(self.tmp_dir.name) as recorder:
+                recorder.record_option_chain("CRUDEOIL", "17NOV2023")
+
+        result = self.tickstore.read_ticks(self.tmp_dir.name, "option_chain", commodities=["CRUDEOIL"])
+        self.assertEqual(list(result["Expiry"]), ["17NOV2023"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+from datetime import datetime
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+import mcxlib.market_data as market_data
+from mcxlib import trading_calendar
+from mcxlib.libutil import MCX_TIMEZONE, CalenderNotFound, MCXdataNotFound
+
+HOLIDAYS_2023 = {"d": {"Data": [
+    {"__type": "Holiday", "Date": "26 Jan 2023", "Description": "Republic Day",
+     "MorningSession": "Closed", "EveningSession": "Closed"},
+    {"__type": "Holiday", "Date": "07 Mar 2023", "Description": "Holi",
+     "MorningSession": "Closed", "EveningSession": "Open"},
+    {"__type": "Holiday", "Date": "/Date(1680805800000)/", "Description": "Good Friday",
+     "MorningSession": "Closed", "EveningSession": "Closed"},
+]}}
+
+
+class TradingCalendarTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "holidays.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        trading_calendar.set_trading_calendar(None)
+
+    def test_trading_days_skip_weekends_and_full_day_holidays(self):
+        calendar = trading_calendar.TradingCalendar(path=self.path, fetch=True)
+        with patch.object(trading_calendar, "post_json", return_value=HOLIDAYS_2023) as post_json:
+            days = calendar.trading_dates("20230101", "20231231")
+            calendar.trading_dates("20230301", "20230331")
+
+        post_json.assert_called_once()
+        expected = pd.bdate_range("2023-01-01", "2023-12-31", freq="C", holidays=["2023-01-26", "2023-04-07"])
+        self.assertEqual(days, list(expected.strftime("%Y%m%d")))
+        # Holi closes the morning session only, MCX trades in the evening
+        self.assertIn("20230307", days)
+
+    def test_holidays_are_persisted_and_reused_offline(self):
+        with patch.object(trading_calendar, "post_json", return_value=HOLIDAYS_2023):
+            trading_calendar.TradingCalendar(path=self.path, fetch=True).holidays(2023, 2023)
+        calendar = trading_calendar.TradingCalendar(path=self.path, fetch=False)
+        calendar.add_holidays(["20231114"])
+
+        self.assertEqual(calendar.holidays(2023, 2023), ["20230126", "20230407", "20231114"])
+        reloaded = trading_calendar.TradingCalendar(path=self.path, fetch=False)
+        self.assertEqual(list(reloaded.is_trading_day(["20231113", "20231114", "20231118"])), [True, False, False])
+        self.assertFalse(reloaded.is_trading_day("20230126"))
+
+    def test_current_year_is_refreshed_and_past_years_are_not(self):
+        current_year = datetime.now(MCX_TIMEZONE).year
+        calendar = trading_calendar.TradingCalendar(path=None, fetch=True, refresh_after=60)
+        with patch.object(trading_calendar, "post_json", return_value=HOLIDAYS_2023) as post_json:
+            calendar.holidays(2023, 2023)
+            calendar.holidays(current_year, current_year)
+            for entry in calendar._years.values():
+                entry["fetched_at"] -= 120
+            calendar.holidays(2023, current_year)
+
+        years = [call.kwargs["payload"] for call in post_json.call_args_list]
+        self.assertEqual(years.count(f'{{"Year": "{current_year}"}}'), 2)
+        self.assertEqual(years.count('{"Year": "2023"}'), 1 if current_year != 2023 else 3)
+
+    def test_default_calendar_uses_the_bundled_list_offline(self):
+        calendar = trading_calendar.TradingCalendar(path=self.path)
+        with patch.object(trading_calendar, "post_json") as post_json:
+            days = calendar.trading_dates("20230801", "20231231")
+
+        post_json.assert_not_called()
+        for holiday in trading_calendar.BUNDLED_HOLIDAYS[2023][2:]:
+            self.assertNotIn(holiday, days)
+        self.assertEqual(len(calendar.trading_days("20190101", "20190107")), 5)
+
+    def test_unavailable_holidays_fall_back_to_the_bundled_list(self):
+        calendar = trading_calendar.TradingCalendar(path=self.path, fetch=True)
+        with patch.object(trading_calendar, "post_json", side_effect=MCXdataNotFound("HTTP 404")) as post_json, \
+                self.assertLogs(trading_calendar.logger, "WARNING"):
+            days = calendar.trading_days("20230123", "20230129")
+            calendar.trading_days("20230123", "20230129")
+
+        # not retried before RETRY_AFTER, and nothing is persisted
+        post_json.assert_called_once()
+        self.assertEqual(len(days), 4)
+        self.assertNotIn(np.datetime64("2023-01-26"), days)
+        self.assertEqual(days.dtype, np.dtype("datetime64[D]"))
+        self.assertFalse(os.path.exists(self.path))
+        with patch.object(trading_calendar, "post_json", side_effect=MCXdataNotFound("HTTP 404")):
+            with self.assertRaises(CalenderNotFound):
+                trading_calendar.trading_holiday_calendar(2023)
+
+    def test_range_fetchers_skip_holidays_before_any_request(self):
+        calendar = trading_calendar.TradingCalendar(path=None, fetch=False)
+        calendar.add_holidays(["20230126"])
+        trading_calendar.set_trading_calendar(calendar)
+        response = {"d": {"Data": [{"__type": "Bhavcopy", "Symbol": "GOLD", "Close": 1.0}]}}
+
+        with patch.object(market_data, "post_json", return_value=response) as post_json:
+            result = market_data.get_bhav_copy_range(start_date="20230125", end_date="20230129")
+            weekend = market_data.get_historical_date_wise_data(start_date="20230128", end_date="20230129")
+
+        self.assertEqual(list(result["TradeDate"].dt.strftime("%Y%m%d")), ["20230125", "20230127"])
+        self.assertEqual(post_json.call_count, 2)
+        self.assertTrue(weekend.empty)
+
+
+if __name__ == "__main__":
+    unittest.main()